@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Benchmark czyszczenia markdown
+Generuje syntetyczne strony w stylu mixinglight.com (od 10 KB do dziesiątek MB)
+z regulowaną gęstością nawigacji, stopki, paywalla i elementów moderacyjnych,
+mierzy clean_markdown_content i każdy etap remove_* ze simple.py
+i zapisuje wyniki w JSON do porównywania między przebiegami
+"""
+
+import argparse
+import difflib
+import json
+import re
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import simple
+from markdown_cleaner import finalize_markdown
+
+# =============================================================================
+# KONFIGURACJA BENCHMARKU
+# =============================================================================
+
+BENCH_SIZES = [10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024, 32 * 1024 * 1024]
+BENCH_BYTES_PER_SIZE = 64 * 1024 * 1024  # Łączny rozmiar stron na jeden rozmiar (wyznacza liczbę stron)
+MIN_PAGES = 3  # Minimalna liczba stron na rozmiar
+MAX_PAGES = 50  # Maksymalna liczba stron na rozmiar
+DENSITIES = {  # Prawdopodobieństwo, że kolejny blok strony jest danym elementem
+    'nav': 0.08,
+    'footer': 0.03,
+    'paywall': 0.03,
+    'moderation': 0.05,
+}
+SEED = 1234
+BENCH_OUTPUT = "bench_cleaning_results.json"
+REGRESSION_THRESHOLD = 0.10  # Spowolnienie p50 powyżej 10% jest oznaczane jako regresja
+EQUIVALENCE_SIZE = 20000  # Rozmiar stron sprawdzanych przez --check-equivalence
+EQUIVALENCE_PAGES = 50  # Liczba stron (kolejne ziarna) sprawdzanych przez --check-equivalence
+
+# =============================================================================
+
+# Etapy potoku czyszczenia w kolejności z clean_markdown_content
+STAGES = [
+    ('navigation', simple.remove_navigation_elements),
+    ('moderation', simple.remove_moderation_elements),
+    ('footer', simple.remove_footer_elements),
+    ('ui', simple.remove_ui_elements),
+    ('finalize', finalize_markdown),
+]
+
+# Fragmenty treści artykułu
+WORDS = (
+    "color grading DaVinci Resolve DCTL transform pixel channel luminance gamma "
+    "contrast saturation curve node shader float3 output input matrix log linear "
+    "highlight shadow midtone pivot exposure tone mapping gamut camera"
+).split()
+
+CODE_BLOCK = """```c
+DEFINE_UI_PARAMS(gain, Gain, DCTLUI_SLIDER_FLOAT, 1.0, 0.0, 4.0, 0.01)
+
+__DEVICE__ float3 transform(int p_Width, int p_Height, int p_X, int p_Y, float p_R, float p_G, float p_B)
+{
+    const float r = _powf(p_R * gain, 1.0f / 2.4f);
+    const float g = _powf(p_G * gain, 1.0f / 2.4f);
+    const float b = _powf(p_B * gain, 1.0f / 2.4f);
+    return make_float3(r, g, b);
+}
+```
+"""
+
+# Szablony elementów do usunięcia - po jednym na każdą kategorię wzorców
+BOILERPLATE = {
+    'nav': [
+        "* [Tutorial Library Index](https://mixinglight.com/tutorial-library/)\n",
+        "* [Focused Flight Paths](https://mixinglight.com/flight-paths/)\n",
+        "* [ Login](https://mixinglight.com/login/)\n",
+        "* [Join Now!](https://mixinglight.com/join/)\n",
+        "[Tutorials](https://mixinglight.com/tutorials/) / [DCTL](https://mixinglight.com/dctl/) / Creative Coding\n",
+        "[ Prev ](https://mixinglight.com/prev/) | [ Next ](https://mixinglight.com/next/)\n",
+        "[ ![Mixing Light](https://mixinglight.com/logo.png) ](https://mixinglight.com/)\n",
+        "* [](https://www.facebook.com/sharer/sharer.php?u=x)\n",
+        "* [](https://x.com/share?url=x)\n",
+    ],
+    'footer': [
+        "##### Our Products\n\n* [Tutorial Library](https://mixinglight.com/library/)\n* [Courses](https://mixinglight.com/courses/)\n",
+        "##### About\n\nAbout Mixing Light and our team of colorists\n",
+        "MixingLight.com Uptime Status\n",
+        "© 2024 Mixing Light, LLC. All rights reserved. Privacy Policy | Terms of Use\n",
+        "* [ (555) 123-4567](tel:5551234567)\n",
+        "\"*\" indicates required fields\n",
+    ],
+    'paywall': [
+        "### Member Content\n\nSorry... the rest of this content is for members only.\n\nNeed more information about our memberships? Click here.\n",
+        "Sorry... the rest of this content is for members only. View Membership options\n",
+        "##### Member Login\n\nUsername\n\nPassword\n\nRemember me\n",
+        "**Bonus**: Get all project files when you Join Today\n",
+    ],
+    'moderation': [
+        "#### Report\n\nThere was a problem reporting this post.\n\nHarassment\nHarassment or bullying behavior\n\nOther\n\nReport note\n\nReport\n",
+        "#### Block Member?\n\nPlease allow a few minutes for this process to complete.\n\nConfirm\n",
+        "You have already reported this .\n",
+        "Inappropriate\nContains mature or sensitive content\n",
+    ],
+}
+
+# Zwykła treść podobna do elementów moderacyjnych - musi zostać (sprawdza --check-equivalence)
+LOOKALIKES = [
+    "## Report\n",
+    "Report\n",
+    "Confirm\n",
+]
+
+def _paragraph(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 90))).capitalize() + ".\n"
+
+def _content_block(rng, index):
+    roll = rng.random()
+    if roll < 0.08:
+        return f"## {index}. " + " ".join(rng.choice(WORDS) for _ in range(4)).title() + "\n"
+    if roll < 0.15:
+        return CODE_BLOCK
+    if roll < 0.22:
+        return "".join(f"* {rng.choice(WORDS)} {rng.choice(WORDS)}\n" for _ in range(rng.randint(2, 6)))
+    if roll < 0.24:
+        return rng.choice(LOOKALIKES)
+    return _paragraph(rng)
+
+def generate_page(size, densities=None, seed=SEED):
+    """Generuje stronę markdown w stylu mixinglight.com o rozmiarze co najmniej `size` znaków
+
+    `densities` określa prawdopodobieństwo wstawienia elementu danej kategorii
+    (nav, footer, paywall, moderation) zamiast kolejnego bloku treści.
+    """
+    densities = DENSITIES if densities is None else densities
+    rng = random.Random(seed)
+    blocks = ["# Creative Coding With DCTL\n"]
+    length = len(blocks[0])
+    index = 0
+
+    while length < size:
+        roll = rng.random()
+        block = None
+        for kind, density in densities.items():
+            if roll < density:
+                block = rng.choice(BOILERPLATE[kind])
+                break
+            roll -= density
+        if block is None:
+            index += 1
+            block = _content_block(rng, index)
+        blocks.append(block)
+        length += len(block) + 1
+
+    return "\n".join(blocks)
+
+def pages_for_size(size):
+    """Liczba stron dla danego rozmiaru - mniej stron dla większych rozmiarów"""
+    return max(MIN_PAGES, min(MAX_PAGES, BENCH_BYTES_PER_SIZE // size))
+
+def percentile(values, fraction):
+    """Percentyl metodą najbliższej pozycji"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def summarize(times, total_bytes):
+    """Zamienia czasy stron (w sekundach) na statystyki etapu"""
+    total = sum(times)
+    return {
+        'mean_ms': total / len(times) * 1000,
+        'p50_ms': percentile(times, 0.50) * 1000,
+        'p99_ms': percentile(times, 0.99) * 1000,
+        'mb_per_s': total_bytes / (1024 * 1024) / total if total else None,
+    }
+
+def bench_page(content, cleaner):
+    """Mierzy czyszczenie jednej strony: całość oraz (dla regex) każdy etap osobno"""
+    timings = {}
+
+    start = time.perf_counter()
+    simple.clean_markdown_content(content, cleaner=cleaner)
+    timings['total'] = time.perf_counter() - start
+
+    if cleaner == "regex":
+        for name, stage in STAGES:
+            start = time.perf_counter()
+            content = stage(content)
+            timings[name] = time.perf_counter() - start
+
+    return timings
+
+def bench_corpus(name, pages, cleaner, repeat=1):
+    """Mierzy zestaw stron i zwraca statystyki dla każdego etapu"""
+    times = {}
+    total_bytes = 0
+    for _ in range(repeat):
+        for content in pages:
+            total_bytes += len(content.encode('utf-8'))
+            for stage, elapsed in bench_page(content, cleaner).items():
+                times.setdefault(stage, []).append(elapsed)
+
+    return {
+        'name': name,
+        'pages': len(pages),
+        'repeat': repeat,
+        'bytes': total_bytes // repeat,
+        'stages': {stage: summarize(values, total_bytes) for stage, values in times.items()},
+    }
+
+def bench_batch(pages, cleaner, workers):
+    """Mierzy czyszczenie całego zestawu przez pulę procesów (simple.clean_markdown_batch)"""
+    total_bytes = sum(len(content.encode('utf-8')) for content in pages)
+    start = time.perf_counter()
+    simple.clean_markdown_batch(pages, cleaner=cleaner, workers=workers)
+    elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'seconds': elapsed,
+        'mb_per_s': total_bytes / (1024 * 1024) / elapsed if elapsed else None,
+    }
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.0f}MB"
+    return f"{size / 1024:.0f}KB"
+
+def print_result(result):
+    print(f"\n📄 {result['name']}: {result['pages']} stron, {format_size(result['bytes'])}")
+    print(f"   {'etap':<12}{'p50 ms':>12}{'p99 ms':>12}{'MB/s':>10}")
+    for stage, stats in result['stages'].items():
+        mb_per_s = f"{stats['mb_per_s']:.1f}" if stats['mb_per_s'] is not None else "-"
+        print(f"   {stage:<12}{stats['p50_ms']:>12.2f}{stats['p99_ms']:>12.2f}{mb_per_s:>10}")
+    batch = result.get('batch')
+    if batch:
+        print(f"   pula {batch['workers']} procesów: {batch['seconds']:.2f} s, {batch['mb_per_s']:.1f} MB/s")
+
+def compare_results(current, baseline_file):
+    """Porównuje p50 z poprzednim przebiegiem i wypisuje zmiany"""
+    try:
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"❌ Nie można wczytać wyników do porównania: {e}")
+        return 0
+
+    previous = {result['name']: result for result in baseline.get('results', [])}
+    regressions = 0
+    print(f"\n📊 Porównanie z {baseline_file} (p50):")
+    for result in current['results']:
+        old = previous.get(result['name'])
+        if old is None:
+            continue
+        for stage, stats in result['stages'].items():
+            old_stats = old['stages'].get(stage)
+            if not old_stats or not old_stats['p50_ms']:
+                continue
+            change = stats['p50_ms'] / old_stats['p50_ms'] - 1
+            marker = "⚠️" if change > REGRESSION_THRESHOLD else "  "
+            regressions += change > REGRESSION_THRESHOLD
+            print(f" {marker} {result['name']:<10}{stage:<12}{old_stats['p50_ms']:>10.2f} → {stats['p50_ms']:>10.2f} ms ({change:+.1%})")
+    return regressions
+
+def run_benchmark(sizes=None, cleaner="regex", repeat=1, files=(), densities=None, seed=SEED, workers=None):
+    """Uruchamia benchmark na stronach syntetycznych i (opcjonalnie) plikach markdown
+
+    Z `workers` każdy zestaw stron jest dodatkowo czyszczony pulą procesów.
+    """
+    # Rozgrzewka - pakiety reguł są wczytywane i kompilowane przy pierwszym użyciu
+    simple.clean_markdown_content(generate_page(10 * 1024, densities, seed), cleaner=cleaner)
+
+    results = []
+    for size in sizes or BENCH_SIZES:
+        pages = [generate_page(size, densities, seed + i) for i in range(pages_for_size(size))]
+        result = bench_corpus(format_size(size), pages, cleaner, repeat)
+        if workers:
+            result['batch'] = bench_batch(pages, cleaner, workers)
+        print_result(result)
+        results.append(result)
+
+    # Prawdziwe strony, np. dctl_tutorial_complete.md używany przez simple.test_cleaning
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            print(f"❌ Nie znaleziono pliku {path}")
+            continue
+        result = bench_corpus(path, [content], cleaner, repeat)
+        print_result(result)
+        results.append(result)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cleaner': cleaner,
+        'repeat': repeat,
+        'seed': seed,
+        'densities': densities or DENSITIES,
+        'results': results,
+    }
+
+# Jedyna zamierzona różnica: regex zostawia puste znaczniki nagłówków ("#### ")
+# po usuniętych oknach dialogowych, a czyściciel blokowy je usuwa
+_IGNORED_LINE_RE = re.compile(r'^[#\s]*$')
+
+def _comparable_lines(content):
+    return [line for line in content.split('\n') if not _IGNORED_LINE_RE.match(line)]
+
+def check_equivalence(size=EQUIVALENCE_SIZE, pages=EQUIVALENCE_PAGES, densities=None, seed=SEED, files=()):
+    """Porównuje wynik czyszczenia regex i blocks na stronach syntetycznych i plikach
+
+    Zwraca liczbę stron, na których wyniki się różnią (poza pustymi liniami
+    i samymi znacznikami nagłówków), i wypisuje pierwsze różnice każdej z nich.
+    """
+    documents = [(f"seed={seed + i}", generate_page(size, densities, seed + i)) for i in range(pages)]
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                documents.append((path, f.read()))
+        except FileNotFoundError:
+            print(f"❌ Nie znaleziono pliku {path}")
+
+    mismatches = 0
+    for name, content in documents:
+        regex_lines = _comparable_lines(simple.clean_markdown_content(content, cleaner="regex"))
+        blocks_lines = _comparable_lines(simple.clean_markdown_content(content, cleaner="blocks"))
+        if regex_lines == blocks_lines:
+            continue
+        mismatches += 1
+        diff = [line for line in difflib.unified_diff(regex_lines, blocks_lines, 'regex', 'blocks', lineterm='', n=0)
+                if line[:1] in '+-' and line[:3] not in ('+++', '---')]
+        print(f"❌ {name}: wyniki regex i blocks różnią się")
+        for line in diff[:10]:
+            print(f"   {line}")
+
+    if mismatches:
+        print(f"⚠️ Różne wyniki na {mismatches} z {len(documents)} stron")
+    else:
+        print(f"✅ Czyszczenie regex i blocks daje ten sam wynik na {len(documents)} stronach")
+    return mismatches
+
+def parse_size(text):
+    """Zamienia rozmiar typu 10KB, 5MB lub liczbę bajtów na int"""
+    text = text.strip().upper()
+    for suffix, factor in (('MB', 1024 * 1024), ('KB', 1024), ('B', 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark czyszczenia markdown")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, help="rozmiary stron, np. 10KB 1MB 20MB")
+    parser.add_argument('--cleaner', choices=["regex", "blocks"], default="regex", help="sposób czyszczenia")
+    parser.add_argument('--repeat', type=int, default=1, help="liczba powtórzeń każdego zestawu")
+    parser.add_argument('--file', dest='files', action='append', default=[], help="dodatkowy plik markdown do pomiaru")
+    parser.add_argument('--density', action='append', default=[], metavar="KIND=P",
+                        help="gęstość elementów, np. nav=0.2 (kategorie: nav, footer, paywall, moderation)")
+    parser.add_argument('--seed', type=int, default=SEED, help="ziarno generatora stron")
+    parser.add_argument('--workers', type=int, help="zmierz też czyszczenie pulą tylu procesów")
+    parser.add_argument('--output', default=BENCH_OUTPUT, help="plik JSON z wynikami")
+    parser.add_argument('--compare', help="plik JSON z poprzednimi wynikami do porównania")
+    parser.add_argument('--check-equivalence', action='store_true',
+                        help="zamiast pomiaru sprawdź, czy czyszczenie regex i blocks daje ten sam wynik")
+    args = parser.parse_args()
+
+    densities = dict(DENSITIES)
+    for item in args.density:
+        kind, _, value = item.partition('=')
+        if kind not in BOILERPLATE:
+            parser.error(f"nieznana kategoria gęstości: {kind}")
+        densities[kind] = float(value)
+
+    if args.check_equivalence:
+        print("🔎 Porównanie czyszczenia regex i blocks...")
+        sys.exit(1 if check_equivalence(densities=densities, seed=args.seed, files=args.files) else 0)
+
+    print(f"🏁 Benchmark czyszczenia markdown ({args.cleaner})...")
+    results = run_benchmark(args.sizes, args.cleaner, args.repeat, args.files, densities, args.seed, args.workers)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Wyniki zapisane do: {args.output}")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare)
+        if regressions:
+            print(f"⚠️ Wykryto {regressions} regresji powyżej {REGRESSION_THRESHOLD:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Równoległe czyszczenie markdown w puli procesów
+Czyszczenie to czysta praca CPU (regex), więc większe partie stron są
+rozdzielane między procesy, a małe czyszczone od razu w bieżącym procesie
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import markdown_cleaner
+from crawl_metrics import CLEAN
+
+MIN_POOL_PAGES = 2  # Mniej stron w partii - czyszczenie w bieżącym procesie
+MIN_POOL_CHARS = 256 * 1024  # Mniej znaków w partii - przesyłanie do procesów nie opłaca się
+CHUNKS_PER_WORKER = 4  # Na ile porcji dzielić partię na każdy proces (równoważenie obciążenia)
+
+def _clean_one(clean, content, url=None):
+    """Czyści jedną stronę, przekazując jej URL, jeśli jest znany"""
+    if url is None:
+        return clean(content)
+    return clean(content, url=url)
+
+def _clean_with_stats(clean, content, url=None):
+    """Czyści stronę w procesie roboczym, zwracając też statystyki reguł"""
+    stats = markdown_cleaner.enable_rule_stats()
+    try:
+        return _clean_one(clean, content, url), stats.rules
+    finally:
+        markdown_cleaner.disable_rule_stats()
+
+def _clean_measured(clean, content, url=None, with_stats=False):
+    """Czyści stronę w procesie roboczym, zwracając też statystyki reguł (lub None) i czas"""
+    start = time.perf_counter()
+    if with_stats:
+        cleaned, rules = _clean_with_stats(clean, content, url)
+    else:
+        cleaned, rules = _clean_one(clean, content, url), None
+    return cleaned, rules, time.perf_counter() - start
+
+class CleaningPool:
+    """Pula procesów do czyszczenia partii stron z zachowaniem kolejności
+
+    `clean` to funkcja czyszcząca (musi dać się zapiklować - funkcja
+    z modułu lub functools.partial); jeśli podano URL-e stron, dostaje
+    je jako argument `url`. Procesy są uruchamiane leniwie przy
+    pierwszej dużej partii. `workers=0` wyłącza pulę - wszystko jest
+    czyszczone w bieżącym procesie. Jeśli w bieżącym procesie włączono
+    statystyki reguł (markdown_cleaner.enable_rule_stats), wyniki
+    z procesów roboczych są do nich dołączane. Z `metrics`
+    (crawl_metrics.CrawlMetrics) czas czyszczenia każdej strony - mierzony
+    w procesie, który ją czyścił - trafia do etapu "clean".
+    """
+
+    def __init__(self, clean, workers=None, metrics=None):
+        self.clean = clean
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.metrics = metrics
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _use_pool(self, contents):
+        if self.workers < 2 or len(contents) < MIN_POOL_PAGES:
+            return False
+        return sum(len(content or '') for content in contents) >= MIN_POOL_CHARS
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _map(self, contents, urls):
+        """Czyści partię w puli; zwraca wyniki w kolejności wejściowej i czasy stron (lub None)"""
+        chunksize = max(1, len(contents) // (self.workers * CHUNKS_PER_WORKER))
+        cleans = [self.clean] * len(contents)
+        stats = markdown_cleaner.rule_stats()
+        if stats is None and self.metrics is None:
+            return list(self._pool().map(_clean_one, cleans, contents, urls, chunksize=chunksize)), None
+
+        results = []
+        timings = []
+        with_stats = [stats is not None] * len(contents)
+        measured = self._pool().map(_clean_measured, cleans, contents, urls, with_stats, chunksize=chunksize)
+        for cleaned, rules, seconds in measured:
+            if stats is not None:
+                stats.merge(rules)
+            results.append(cleaned)
+            timings.append(seconds)
+        return results, timings
+
+    def _inline(self, contents, urls):
+        if self.metrics is None:
+            return [_clean_one(self.clean, content, url) for content, url in zip(contents, urls)]
+        results = []
+        for content, url in zip(contents, urls):
+            start = time.perf_counter()
+            cleaned = _clean_one(self.clean, content, url)
+            self._record(url, content, cleaned, time.perf_counter() - start)
+            results.append(cleaned)
+        return results
+
+    def _record(self, url, content, cleaned, seconds):
+        if self.metrics is not None:
+            self.metrics.record(CLEAN, seconds, len(content or ''), len(cleaned or ''), url=url)
+
+    def _record_batch(self, contents, urls, results, timings):
+        """Zapisuje czasy stron z puli - w wątku pętli zdarzeń, nie w wątku wykonawcy"""
+        if timings is not None:
+            for content, url, cleaned, seconds in zip(contents, urls, results, timings):
+                self._record(url, content, cleaned, seconds)
+        return results
+
+    def clean_batch(self, contents, urls=None):
+        """Czyści listę stron i zwraca listę wyników w tej samej kolejności"""
+        contents = list(contents)
+        urls = list(urls) if urls is not None else [None] * len(contents)
+        if not self._use_pool(contents):
+            return self._inline(contents, urls)
+        return self._record_batch(contents, urls, *self._map(contents, urls))
+
+    async def clean_batch_async(self, contents, urls=None):
+        """Jak clean_batch, ale duże partie nie blokują pętli zdarzeń"""
+        contents = list(contents)
+        urls = list(urls) if urls is not None else [None] * len(contents)
+        if not self._use_pool(contents):
+            return self._inline(contents, urls)
+        results, timings = await asyncio.get_running_loop().run_in_executor(None, self._map, contents, urls)
+        return self._record_batch(contents, urls, results, timings)
+
+    def clean_pages(self, pages, sections=None):
+        """Czyści strony podane jako pary (url, surowy markdown)
+
+        Z `sections` (crawl_sections.SectionStore) niezmienione strony dostają
+        sekcje z poprzedniego przebiegu, a do puli trafiają tylko pozostałe.
+        """
+        contents, todo = _reuse_sections(pages, sections)
+        cleaned = self.clean_batch([pages[i][1] for i in todo], [pages[i][0] for i in todo])
+        return _store_sections(pages, sections, contents, todo, cleaned)
+
+    async def clean_pages_async(self, pages, sections=None):
+        """Jak clean_pages, ale duże partie nie blokują pętli zdarzeń"""
+        contents, todo = _reuse_sections(pages, sections)
+        cleaned = await self.clean_batch_async([pages[i][1] for i in todo], [pages[i][0] for i in todo])
+        return _store_sections(pages, sections, contents, todo, cleaned)
+
+def _reuse_sections(pages, sections):
+    """Zwraca sekcje z magazynu (None dla stron do wyczyszczenia) i indeksy tych stron"""
+    if sections is None:
+        return [None] * len(pages), range(len(pages))
+    contents = [sections.reuse(url, raw) for url, raw in pages]
+    return contents, [i for i, content in enumerate(contents) if content is None]
+
+def _store_sections(pages, sections, contents, todo, cleaned):
+    for i, content in zip(todo, cleaned):
+        contents[i] = content
+        if sections is not None:
+            sections.put(pages[i][0], content)
+    return contents
+
+def clean_batch(contents, clean, workers=None):
+    """Czyści listę stron jednorazową pulą procesów (wyniki w kolejności wejściowej)"""
+    with CleaningPool(clean, workers) as pool:
+        return pool.clean_batch(contents)
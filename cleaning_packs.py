@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pakiety reguł czyszczenia markdown dobierane do strony
+Każdy pakiet (plik JSON w rule_packs/) opisuje, dla jakich hostów i języków
+treści ma zastosowanie; do strony są kompilowane i stosowane tylko pasujące
+pakiety, a skompilowane reguły są trzymane w pamięci do końca przebiegu
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+
+from markdown_cleaner import DEFAULT_FLAGS, apply_rules, compile_rules
+
+RULE_PACKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rule_packs")
+
+# Etapy czyszczenia w kolejności stosowania
+NAVIGATION = 'navigation'
+MODERATION = 'moderation'
+FOOTER = 'footer'
+UI = 'ui'
+STAGES = (NAVIGATION, MODERATION, FOOTER, UI)
+
+# Flagi wzorców dla etapów (elementy moderacyjne bez względu na wielkość liter)
+STAGE_FLAGS = {MODERATION: DEFAULT_FLAGS | re.IGNORECASE}
+
+LANGUAGE_SAMPLE_CHARS = 20000  # Fragment strony, na podstawie którego rozpoznawany jest język
+POLISH_CHARS = frozenset('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ')
+POLISH_MIN_SHARE = 0.005  # Minimalny udział polskich znaków wśród znaków innych niż spacje
+CJK_MIN_SHARE = 0.10  # Minimalny udział znaków CJK wśród znaków innych niż spacje
+
+_KANA_RE = re.compile(r'[\u3040-\u30ff]')
+_HAN_RE = re.compile(r'[\u4e00-\u9fff]')
+
+class RulePack:
+    """Pakiet reguł wczytany z pliku JSON
+
+    Pola pliku: `name`, `hosts` (wzorce fnmatch, brak = każdy host),
+    `languages` (brak = każdy język), `fallback` (pakiet używany tylko,
+    gdy żaden pakiet z `hosts` nie pasuje) i `rules` - dla każdego etapu
+    lista wzorców albo słownik {kategoria: lista wzorców}.
+    """
+
+    def __init__(self, data):
+        self.name = data['name']
+        self.hosts = data.get('hosts')
+        self.languages = data.get('languages')
+        self.fallback = data.get('fallback', False)
+        self._patterns = data.get('rules', {})
+        self._compiled = {}
+
+    def matches_host(self, host):
+        return any(fnmatch(host, pattern) for pattern in self.hosts)
+
+    def matches_language(self, language):
+        return self.languages is None or language in self.languages
+
+    def patterns(self, stage):
+        """Zwraca wzorce etapu w kolejności z pliku"""
+        patterns = self._patterns.get(stage) or []
+        if isinstance(patterns, dict):
+            return [pattern for group in patterns.values() for pattern in group]
+        return list(patterns)
+
+    def rules(self, stage):
+        """Zwraca skompilowane reguły etapu (kompilowane przy pierwszym użyciu)"""
+        rules = self._compiled.get(stage)
+        if rules is None:
+            rules = compile_rules(
+                self.patterns(stage), STAGE_FLAGS.get(stage, DEFAULT_FLAGS), name=f"{self.name}.{stage}"
+            )
+            self._compiled[stage] = rules
+        return rules
+
+class RulePackRegistry:
+    """Wczytuje pakiety z katalogu przy pierwszym użyciu i dobiera je do stron
+
+    Wynik doboru (lista reguł etapu dla zestawu pakietów) jest zapamiętywany,
+    więc kolejne strony tego samego serwisu nie płacą za dobór ani kompilację.
+    """
+
+    def __init__(self, directory=RULE_PACKS_DIR):
+        self.directory = directory
+        self._packs = None
+        self._stage_rules = {}
+        self._fingerprint = None
+
+    @property
+    def packs(self):
+        if self._packs is None:
+            self._packs = []
+            for path in sorted(glob.glob(os.path.join(self.directory, '*.json'))):
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._packs.append(RulePack(json.load(f)))
+        return self._packs
+
+    def fingerprint(self):
+        """Skrót plików pakietów (nazwy i treść) - zmienia się po edycji dowolnego pakietu"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for path in sorted(glob.glob(os.path.join(self.directory, '*.json'))):
+                digest.update(os.path.basename(path).encode('utf-8') + b'\0')
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+                digest.update(b'\0')
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def select(self, url, content):
+        """Zwraca krotkę pakietów pasujących do hosta URL i języka treści"""
+        host = (urlparse(url).hostname or '') if url else ''
+        language = detect_language(content)
+
+        site_packs = [pack for pack in self.packs if pack.hosts and pack.matches_host(host)]
+        selected = []
+        for pack in self.packs:
+            if pack.hosts:
+                if pack not in site_packs:
+                    continue
+            elif pack.fallback and site_packs:
+                continue
+            if pack.matches_language(language):
+                selected.append(pack)
+        return tuple(selected)
+
+    def stage_rules(self, packs, stage):
+        """Zwraca reguły etapu ze wszystkich pakietów (w kolejności pakietów)"""
+        key = (tuple(pack.name for pack in packs), stage)
+        rules = self._stage_rules.get(key)
+        if rules is None:
+            rules = [rule for pack in packs for rule in pack.rules(stage)]
+            self._stage_rules[key] = rules
+        return rules
+
+    def apply(self, content, url=None, stages=STAGES, packs=None):
+        """Stosuje do treści etapy czyszczenia z pakietów pasujących do strony"""
+        if not content:
+            return content
+        if packs is None:
+            packs = self.select(url, content)
+        for stage in stages:
+            content = apply_rules(content, self.stage_rules(packs, stage))
+        return content
+
+def detect_language(content):
+    """Rozpoznaje język treści na podstawie znaków: "pl", "ja", "zh", "en" lub None
+
+    Heurystyka wystarczająca do doboru pakietów: udział polskich znaków
+    diakrytycznych albo znaków CJK (z kaną dla japońskiego) wśród znaków
+    innych niż spacje. Tekst czysto ASCII jest od razu uznawany za angielski.
+    """
+    sample = (content or '')[:LANGUAGE_SAMPLE_CHARS]
+    chars = len(sample) - sample.count(' ') - sample.count('\n')
+    if chars <= 0:
+        return None
+    if sample.isascii():
+        return "en"
+
+    kana = len(_KANA_RE.findall(sample))
+    cjk = kana + len(_HAN_RE.findall(sample))
+    if cjk / chars >= CJK_MIN_SHARE:
+        return "ja" if kana else "zh"
+
+    polish = sum(sample.count(ch) for ch in POLISH_CHARS)
+    if polish / chars >= POLISH_MIN_SHARE:
+        return "pl"
+    return "en"
+
+# Wspólny rejestr pakietów z katalogu rule_packs/
+RULE_PACKS = RulePackRegistry()
+
+def apply_rule_packs(content, url=None, stages=STAGES):
+    """Czyści treść pakietami reguł dobranymi do hosta `url` i języka treści"""
+    return RULE_PACKS.apply(content, url, stages)
+
+def rule_packs_fingerprint():
+    """Skrót pakietów reguł z rule_packs/ - klucz ważności wyczyszczonych sekcji"""
+    return RULE_PACKS.fingerprint()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Automatyczne usuwanie powtarzalnych bloków (boilerplate) między stronami
+Każdy blok markdown jest normalizowany i skracany do skrótu; bloki, które
+występują na więcej niż zadanym ułamku stron serwisu (menu, stopki, przyciski
+udostępniania), są usuwane bez ręcznie pisanych wzorców. Tabela częstości
+jest zapisywana per domena, więc kolejne przebiegi czyszczą już pierwszą stronę
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from markdown_blocks import CODE, split_blocks
+
+DEFAULT_BOILERPLATE_DIR = ".crawl_boilerplate"
+
+DEFAULT_THRESHOLD = 0.5  # Blok jest boilerplate, jeśli występuje na więcej niż tylu stronach (ułamek)
+DEFAULT_MIN_PAGES = 5  # Poniżej tej liczby stron w tabeli nic nie jest usuwane
+DEFAULT_HISTORY_PAGES = 1000  # Powyżej tej liczby stron liczniki są przy zapisie połowione
+
+_LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+_SPACES_RE = re.compile(r'\s+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+def block_key(text):
+    """Skrót znormalizowanego bloku
+
+    Normalizacja pomija wielkość liter, białe znaki i cele linków, więc np.
+    menu z linkami zawierającymi adres bieżącej strony ma na każdej stronie
+    ten sam skrót. Liczby są zachowywane - "Part 1" i "Part 2" to różne bloki.
+    """
+    text = _LINK_TARGET_RE.sub('](', text.lower())
+    text = _SPACES_RE.sub(' ', text).strip()
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+class BoilerplateFilter:
+    """Tabela częstości bloków serwisu i filtr usuwający najczęstsze z nich
+
+    `filter()` w jednym przebiegu po stronie liczy jej bloki (każdy raz na
+    stronę) i usuwa te, które występują na więcej niż `threshold` stron
+    widzianych dotąd - w tym przebiegu i w poprzednich zapisanych w `path`.
+    Bloki kodu nigdy nie są usuwane. Przy `save()` zapisywane są tylko bloki
+    widziane na co najmniej dwóch stronach, a po przekroczeniu `history_pages`
+    liczniki są połowione, by tabela odzwierciedlała nowsze przebiegi.
+    """
+
+    def __init__(self, path, threshold=DEFAULT_THRESHOLD, min_pages=DEFAULT_MIN_PAGES,
+                 history_pages=DEFAULT_HISTORY_PAGES):
+        self.path = path
+        self.threshold = threshold
+        self.min_pages = min_pages
+        self.history_pages = history_pages
+        self.pages = 0
+        self.counts = {}
+        self.removed_blocks = 0
+        self.removed_chars = 0
+        self.filtered_pages = 0
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.pages = data['pages']
+            self.counts = data['counts']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+
+    def is_boilerplate(self, key):
+        """Sprawdza, czy blok o danym skrócie przekracza próg częstości"""
+        if self.pages < self.min_pages:
+            return False
+        return self.counts.get(key, 0) > self.threshold * self.pages
+
+    def filter(self, content):
+        """Dolicza bloki strony do tabeli i zwraca treść bez bloków boilerplate"""
+        if not content:
+            return content
+
+        lines = content.split('\n')
+        blocks = split_blocks(content)
+        seen = set()
+        removed = []
+
+        for block in blocks:
+            if block.kind == CODE:
+                continue
+            key = block_key(block.text)
+            if key in seen:
+                # Powtórzenie bloku na tej samej stronie - liczymy raz, decyzja jak dla pierwszego
+                if self.is_boilerplate(key):
+                    removed.append(block)
+                continue
+            seen.add(key)
+            if self.is_boilerplate(key):
+                removed.append(block)
+
+        self.pages += 1
+        for key in seen:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+        if not removed:
+            return content
+
+        self.filtered_pages += 1
+        for block in removed:
+            self.removed_blocks += 1
+            self.removed_chars += len(block.text)
+            lines[block.start:block.start + len(block.lines)] = [None] * len(block.lines)
+        content = '\n'.join(line for line in lines if line is not None)
+        return _BLANK_LINES_RE.sub('\n\n', content).strip()
+
+    def save(self):
+        """Zapisuje tabelę częstości (atomowo), pomijając bloki jednorazowe"""
+        if self.pages > self.history_pages:
+            self.pages //= 2
+            self.counts = {key: count // 2 for key, count in self.counts.items()}
+        counts = {key: count for key, count in self.counts.items() if count >= 2}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pages': self.pages, 'counts': counts}, f)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        """Zwraca podsumowanie usuniętych bloków i stanu tabeli"""
+        frequent = sum(1 for key in self.counts if self.is_boilerplate(key))
+        return (
+            f"🧱 Boilerplate: usunięto {self.removed_blocks} bloków ({self.removed_chars} znaków) "
+            f"z {self.filtered_pages} stron; tabela: {self.pages} stron, {frequent} częstych bloków"
+        )
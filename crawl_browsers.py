@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Pula przeglądarek dla długich przebiegów crawlera
+Kilka instancji AsyncWebCrawler obsługuje strony na zmianę; instancja jest
+restartowana po zadanej liczbie stron, po przekroczeniu limitu pamięci (RSS
+procesów przeglądarki) albo gdy strona się zawiesi, dzięki czemu pamięć
+nie rośnie przez godziny, a jedna zablokowana przeglądarka nie wstrzymuje
+pozostałych
+"""
+
+import asyncio
+import os
+import signal
+import time
+
+from crawl_metrics import RENDER
+
+DEFAULT_POOL_SIZE = 2  # Liczba instancji przeglądarki
+DEFAULT_TABS = 4  # Maksymalna liczba stron pobieranych jednocześnie przez jedną instancję
+DEFAULT_MAX_PAGES = 200  # Po tylu stronach instancja jest restartowana (None = bez limitu)
+DEFAULT_MAX_RSS_BYTES = 1536 * 1024 * 1024  # Limit pamięci procesów jednej instancji (None = bez limitu)
+DEFAULT_PAGE_TIMEOUT = 120  # Strona pobierana dłużej (sekundy) uznawana jest za zawieszoną
+DEFAULT_MAX_FAILURES = 3  # Po tylu błędach z rzędu instancja jest restartowana
+CLOSE_TIMEOUT = 15  # Czas na zamknięcie instancji, potem procesy są zabijane
+RSS_CHECK_EVERY = 10  # Co ile stron sprawdzać pamięć instancji
+START_RETRIES = 3  # Próby uruchomienia instancji, zanim zostanie uznana za uszkodzoną
+START_RETRY_DELAY = 5  # Odstęp między próbami uruchomienia (sekundy)
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def _process_children():
+    """Mapa pid → lista pidów dzieci z /proc (pusta poza Linuksem)"""
+    children = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Nazwa procesu w nawiasach może zawierać spacje - pola liczymy od ostatniego ')'
+        ppid = int(stat.rsplit(b')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+def _descendants(pid, children):
+    result = []
+    stack = list(children.get(pid, ()))
+    while stack:
+        child = stack.pop()
+        result.append(child)
+        stack.extend(children.get(child, ()))
+    return result
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def process_tree_rss(pids):
+    """Łączny RSS (bajty) procesów `pids` i wszystkich ich potomków; None poza Linuksem"""
+    if not os.path.isdir('/proc'):
+        return None
+    children = _process_children()
+    tree = set(pids)
+    for pid in pids:
+        tree.update(_descendants(pid, children))
+    return sum(_rss_bytes(pid) for pid in tree)
+
+def _kill_tree(pids):
+    """Zabija procesy `pids` wraz z potomkami (przeglądarka, która nie chce się zamknąć)"""
+    children = _process_children()
+    for pid in [p for root in pids for p in _descendants(root, children)] + list(pids):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+# Procesy uruchamiane przez instancję crawl4ai: przeglądarka zarządzana (CDP)
+# i sterownik Playwright, którego potomkami są procesy Chromium
+_PROCESS_PATHS = (
+    ('crawler_strategy', 'browser_manager', 'managed_browser', 'browser_process'),
+    ('crawler_strategy', 'browser_manager', 'playwright', '_impl_obj', '_connection', '_transport', '_proc'),
+)
+
+def _crawler_pids(crawler):
+    """Pidy procesów uruchomionych przez tę instancję crawlera (korzenie jej drzewa procesów)
+
+    Pidy pochodzą z obiektów procesów samej instancji, a nie z różnicy
+    drzewa procesów przed i po starcie - procesy innych instancji
+    uruchomione w tym czasie nie są jej przypisywane. Brane są tylko
+    potomkowie bieżącego procesu.
+    """
+    ours = set(_descendants(os.getpid(), _process_children()))
+    pids = []
+    for path in _PROCESS_PATHS:
+        target = crawler
+        for name in path:
+            target = getattr(target, name, None)
+            if target is None:
+                break
+        pid = getattr(target, 'pid', None)
+        if isinstance(pid, int) and pid in ours and pid not in pids:
+            pids.append(pid)
+    return tuple(pids)
+
+class _Browser:
+    """Jedna instancja przeglądarki w puli i jej liczniki"""
+
+    def __init__(self, index):
+        self.index = index
+        self.crawler = None
+        self.pids = ()  # Procesy uruchomione razem z instancją (przeglądarka, sterownik)
+        self.ready = False
+        self.broken = False
+        self.retiring = None  # Powód zaplanowanego restartu
+        self.active = 0
+        self.pages = 0
+        self.failures = 0
+
+class BrowserPool:
+    """Pula instancji crawlera z restartami - zamiennik AsyncWebCrawler dla fetch_many
+
+    `factory` tworzy instancję (np. functools.partial(AsyncWebCrawler,
+    verbose=True)); pula jest asynchronicznym menedżerem kontekstu i ma
+    metodę `arun()` o tym samym interfejsie. Strona trafia do najmniej
+    obciążonej gotowej instancji z wolnym miejscem (`tabs`). Instancja jest
+    wycofywana po `max_pages` stronach, po przekroczeniu `max_rss_bytes`,
+    po `max_failures` błędach z rzędu albo po przekroczeniu `page_timeout`
+    przez stronę; gdy jej ostatnie strony się zakończą, jest zamykana
+    (w razie potrzeby zabijana) i uruchamiana od nowa. Pozostałe instancje
+    w tym czasie pracują dalej. Z `metrics` czas renderowania każdej strony
+    trafia do etapu "render".
+    """
+
+    def __init__(self, factory, size=DEFAULT_POOL_SIZE, tabs=DEFAULT_TABS, max_pages=DEFAULT_MAX_PAGES,
+                 max_rss_bytes=DEFAULT_MAX_RSS_BYTES, page_timeout=DEFAULT_PAGE_TIMEOUT,
+                 max_failures=DEFAULT_MAX_FAILURES, metrics=None):
+        self.factory = factory
+        self.metrics = metrics
+        self.tabs = max(1, tabs)
+        self.max_pages = max_pages
+        self.max_rss_bytes = max_rss_bytes
+        self.page_timeout = page_timeout
+        self.max_failures = max_failures
+        self._browsers = [_Browser(i) for i in range(max(1, size))]
+        self._changed = asyncio.Condition()
+        self._restarts = set()
+        self.stats = {'pages': 0, 'timeouts': 0, 'restarts': 0, 'max_pages': 0, 'memory': 0, 'failures': 0}
+
+    async def __aenter__(self):
+        for browser in self._browsers:
+            await self._start(browser)
+        if all(browser.broken for browser in self._browsers):
+            raise RuntimeError("Nie udało się uruchomić żadnej przeglądarki")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for task in list(self._restarts):
+            task.cancel()
+        await asyncio.gather(*self._restarts, return_exceptions=True)
+        await asyncio.gather(*(self._close(browser) for browser in self._browsers))
+
+    async def _start(self, browser):
+        """Uruchamia instancję i zapamiętuje jej procesy (do pomiaru pamięci i zabicia)"""
+        for attempt in range(START_RETRIES):
+            try:
+                crawler = self.factory()
+                await crawler.__aenter__()
+            except Exception as e:
+                print(f"⚠️ Nie udało się uruchomić przeglądarki #{browser.index}: {e}")
+            else:
+                # Korzenie drzewa procesów instancji - potomkowie są doliczani przy pomiarze
+                browser.pids = _crawler_pids(crawler)
+                browser.crawler = crawler
+                browser.ready = True
+                browser.broken = False
+                browser.retiring = None
+                browser.pages = 0
+                browser.failures = 0
+                return
+            if attempt + 1 < START_RETRIES:
+                await asyncio.sleep(START_RETRY_DELAY)
+        browser.broken = True
+
+    async def _close(self, browser):
+        """Zamyka instancję; jeśli zamykanie się zawiesi lub nie powiedzie, zabija jej procesy"""
+        crawler, browser.crawler, browser.ready = browser.crawler, None, False
+        if crawler is None:
+            return
+        try:
+            await asyncio.wait_for(crawler.__aexit__(None, None, None), CLOSE_TIMEOUT)
+        except (Exception, asyncio.TimeoutError):
+            _kill_tree(browser.pids)
+        browser.pids = ()
+
+    async def _restart(self, browser):
+        await self._close(browser)
+        await self._start(browser)
+        self.stats['restarts'] += 1
+        async with self._changed:
+            self._changed.notify_all()
+
+    def _retire(self, browser, reason):
+        """Wycofuje instancję - nie dostaje nowych stron i po ostatniej jest restartowana"""
+        if browser.retiring is None:
+            browser.retiring = reason
+            self.stats[reason] += 1
+
+    async def _acquire(self):
+        async with self._changed:
+            while True:
+                free = [b for b in self._browsers if b.ready and b.retiring is None and b.active < self.tabs]
+                if free:
+                    browser = min(free, key=lambda b: b.active)
+                    browser.active += 1
+                    return browser
+                if all(b.broken for b in self._browsers):
+                    raise RuntimeError("Wszystkie przeglądarki w puli są uszkodzone")
+                await self._changed.wait()
+
+    async def _release(self, browser):
+        async with self._changed:
+            browser.active -= 1
+            browser.pages += 1
+            self.stats['pages'] += 1
+            if self.max_pages and browser.pages >= self.max_pages:
+                self._retire(browser, 'max_pages')
+            elif self.max_rss_bytes and browser.pids and browser.pages % RSS_CHECK_EVERY == 0:
+                rss = process_tree_rss(browser.pids)
+                if rss is not None and rss > self.max_rss_bytes:
+                    self._retire(browser, 'memory')
+
+            if browser.retiring is not None and browser.active == 0 and browser.ready:
+                browser.ready = False
+                task = asyncio.create_task(self._restart(browser))
+                self._restarts.add(task)
+                task.add_done_callback(self._restarts.discard)
+            self._changed.notify_all()
+
+    async def arun(self, url, config=None, **kwargs):
+        """Pobiera stronę w wolnej instancji (jak AsyncWebCrawler.arun)"""
+        browser = await self._acquire()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                browser.crawler.arun(url=url, config=config, **kwargs), self.page_timeout
+            )
+            if self.metrics is not None:
+                self.metrics.record(
+                    RENDER, time.perf_counter() - start, bytes_out=len(getattr(result, 'html', '') or ''), url=url
+                )
+        except asyncio.TimeoutError:
+            # Zawieszona strona - kontekst przeglądarki może być zablokowany
+            self.stats['timeouts'] += 1
+            self._retire(browser, 'failures')
+            raise TimeoutError(f"Przekroczono limit {self.page_timeout} s dla {url}") from None
+        except Exception:
+            browser.failures += 1
+            if browser.failures >= self.max_failures:
+                self._retire(browser, 'failures')
+            raise
+        else:
+            # Nieudana strona (np. 404) to błąd serwisu, nie przeglądarki
+            browser.failures = 0
+            return result
+        finally:
+            await self._release(browser)
+
+    def memory(self):
+        """RSS (bajty) procesów każdej instancji - do diagnostyki"""
+        return [process_tree_rss(b.pids) if b.pids else None for b in self._browsers]
+
+    def summary(self):
+        stats = self.stats
+        return (
+            f"🌐 Przeglądarki: {len(self._browsers)} instancji, {stats['pages']} stron, "
+            f"{stats['restarts']} restartów (limit stron: {stats['max_pages']}, pamięć: {stats['memory']}, "
+            f"błędy: {stats['failures']}, w tym {stats['timeouts']} zawieszonych stron)"
+        )
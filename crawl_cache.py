@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Trwały cache stron na dysku dla crawlerów
+Przechowuje wyrenderowany HTML/markdown wraz z ETag/Last-Modified,
+dzięki czemu niezmienione strony nie są ponownie renderowane w przeglądarce
+"""
+
+import hashlib
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_CACHE_DIR = ".crawl_cache"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60  # Strona młodsza niż doba jest używana bez sprawdzania
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # Limit rozmiaru cache (LRU)
+REVALIDATE_TIMEOUT = 10  # Limit czasu zapytania warunkowego w sekundach
+
+INDEX_FILE = "index.json"
+
+class CachedMarkdown(str):
+    """Markdown z cache zachowujący interfejs wyniku crawl4ai (str + raw_markdown)"""
+
+    @property
+    def raw_markdown(self):
+        return str(self)
+
+class CachedResult:
+    """Wynik pobrania odtworzony z cache, zgodny z polami używanymi przez crawlery"""
+
+    success = True
+    error_message = ""
+    from_cache = True
+
+    def __init__(self, url, data):
+        self.url = url
+        self.html = data.get('html', '')
+        self.cleaned_html = data.get('cleaned_html', '')
+        self.markdown = CachedMarkdown(data.get('markdown', ''))
+        self.links = data.get('links') or {}
+        self.media = data.get('media') or {}
+        self.metadata = data.get('metadata') or {}
+        self.status_code = data.get('status_code')
+        self.response_headers = data.get('response_headers') or {}
+
+def cache_key(url):
+    """Tworzy klucz cache z kanonicznej postaci URL (małe litery hosta, bez fragmentu)"""
+    parts = urlsplit(url.strip())
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+def _get_header(headers, name):
+    """Zwraca nagłówek HTTP bez względu na wielkość liter"""
+    if not headers:
+        return None
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+def _markdown_text(markdown):
+    """Zwraca surowy markdown z wyniku crawl4ai (obiekt lub str)"""
+    if markdown is None:
+        return ''
+    return getattr(markdown, 'raw_markdown', None) or str(markdown)
+
+class PageCache:
+    """Cache stron na dysku z polityką TTL, rewalidacją warunkową i usuwaniem LRU
+
+    Indeks (URL → metadane) jest trzymany w pamięci jako OrderedDict w kolejności
+    ostatniego użycia i zapisywany do `index.json` przy `save()`. Treść każdej strony
+    leży w osobnym pliku JSON nazwanym skrótem SHA-256 klucza.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._index = OrderedDict()
+        self._total_bytes = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        # Przywracamy kolejność LRU według czasu ostatniego użycia
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get('last_access', 0)):
+            if os.path.exists(self._path(entry['file'])):
+                self._index[key] = entry
+                self._total_bytes += entry.get('size', 0)
+
+    def _path(self, filename):
+        return os.path.join(self.cache_dir, filename)
+
+    def save(self):
+        """Zapisuje indeks cache na dysk"""
+        path = os.path.join(self.cache_dir, INDEX_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _is_fresh(self, entry):
+        return self.ttl_seconds is not None and time.time() - entry['fetched_at'] < self.ttl_seconds
+
+    def _touch(self, key):
+        self._index.move_to_end(key)
+        self._index[key]['last_access'] = time.time()
+
+    def _read(self, key):
+        entry = self._index[key]
+        try:
+            with open(self._path(entry['file']), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._remove(key)
+            return None
+
+    def _remove(self, key):
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.get('size', 0)
+        try:
+            os.remove(self._path(entry['file']))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Usuwa najdawniej używane strony, dopóki cache przekracza limit rozmiaru"""
+        while self.max_bytes is not None and self._total_bytes > self.max_bytes and len(self._index) > 1:
+            oldest_key = next(iter(self._index))
+            self._remove(oldest_key)
+            self.stats['evicted'] += 1
+
+    def is_unchanged(self, url):
+        """Wysyła zapytanie warunkowe (HEAD z If-None-Match/If-Modified-Since)
+
+        Zwraca True, jeśli serwer potwierdza, że strona się nie zmieniła.
+        Funkcja blokująca - wywoływać przez asyncio.to_thread.
+        """
+        entry = self._index.get(cache_key(url))
+        if not entry or not (entry.get('etag') or entry.get('last_modified')):
+            return False
+
+        request = urllib.request.Request(url, method='HEAD')
+        if entry.get('etag'):
+            request.add_header('If-None-Match', entry['etag'])
+        if entry.get('last_modified'):
+            request.add_header('If-Modified-Since', entry['last_modified'])
+
+        try:
+            with urllib.request.urlopen(request, timeout=REVALIDATE_TIMEOUT) as response:
+                # Część serwerów ignoruje nagłówki warunkowe przy HEAD - porównujemy walidatory
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+                if etag and etag == entry.get('etag'):
+                    return True
+                return bool(last_modified and last_modified == entry.get('last_modified'))
+        except urllib.error.HTTPError as e:
+            return e.code == 304
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+    def get(self, url, allow_stale=False):
+        """Zwraca CachedResult dla URL lub None
+
+        Świeże wpisy (w ramach TTL) są zwracane zawsze, przeterminowane tylko
+        z `allow_stale=True` (np. po pozytywnej rewalidacji).
+        """
+        key = cache_key(url)
+        entry = self._index.get(key)
+        if entry is None or not (allow_stale or self._is_fresh(entry)):
+            return None
+
+        data = self._read(key)
+        if data is None:
+            return None
+
+        self._touch(key)
+        return CachedResult(url, data)
+
+    def needs_revalidation(self, url):
+        """Sprawdza, czy URL ma przeterminowany wpis z walidatorami ETag/Last-Modified"""
+        entry = self._index.get(cache_key(url))
+        return bool(entry and not self._is_fresh(entry) and (entry.get('etag') or entry.get('last_modified')))
+
+    def mark_revalidated(self, url):
+        """Odnawia TTL wpisu po potwierdzeniu przez serwer, że strona się nie zmieniła"""
+        key = cache_key(url)
+        if key in self._index:
+            self._index[key]['fetched_at'] = time.time()
+
+    def put(self, url, result):
+        """Zapisuje udany wynik crawl4ai w cache"""
+        if not getattr(result, 'success', False):
+            return
+
+        key = cache_key(url)
+        headers = getattr(result, 'response_headers', None) or {}
+        data = {
+            'url': url,
+            'html': result.html or '',
+            'cleaned_html': getattr(result, 'cleaned_html', '') or '',
+            'markdown': _markdown_text(result.markdown),
+            'links': result.links or {},
+            'media': getattr(result, 'media', None) or {},
+            'metadata': getattr(result, 'metadata', None) or {},
+            'status_code': getattr(result, 'status_code', None),
+            'response_headers': dict(headers),
+        }
+        payload = json.dumps(data, ensure_ascii=False)
+        filename = hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json'
+
+        self._remove(key)
+        tmp_path = self._path(filename + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(filename))
+
+        now = time.time()
+        self._index[key] = {
+            'file': filename,
+            'size': len(payload.encode('utf-8')),
+            'fetched_at': now,
+            'last_access': now,
+            'etag': _get_header(headers, 'ETag'),
+            'last_modified': _get_header(headers, 'Last-Modified'),
+        }
+        self._total_bytes += self._index[key]['size']
+        self.stats['stored'] += 1
+        self._evict()
+
+    def summary(self):
+        """Zwraca podsumowanie trafień cache do wyświetlenia na końcu przebiegu"""
+        s = self.stats
+        lookups = s['hits'] + s['revalidated'] + s['misses']
+        hit_rate = (s['hits'] + s['revalidated']) / lookups * 100 if lookups else 0.0
+        return (
+            f"💾 Cache: {s['hits']} trafień, {s['revalidated']} zrewalidowanych, "
+            f"{s['misses']} chybień ({hit_rate:.1f}% trafień), "
+            f"{s['evicted']} usuniętych, {len(self._index)} stron / {self._total_bytes} bajtów"
+        )
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Wykrywanie niemal identycznych stron (SimHash)
+Ten sam artykuł bywa dostępny pod wieloma adresami (paginacja komentarzy,
+?replytocom=, widok do druku); odcisk SimHash wyczyszczonej treści pozwala
+pominąć takie strony w raporcie, a wzorce adresów, które dają duplikaty,
+przesunąć na koniec kolejki
+"""
+
+import hashlib
+import re
+from collections import Counter
+from urllib.parse import parse_qsl, urlparse
+
+SIMHASH_BITS = 64
+SHINGLE_WORDS = 3  # Długość fragmentu (w słowach), z którego liczony jest odcisk
+MIN_WORDS = 50  # Krótsze strony nie są porównywane (zbyt mało treści na wiarygodny odcisk)
+DEFAULT_MAX_DISTANCE = 3  # Maksymalna odległość Hamminga odcisków niemal identycznych stron
+DEFAULT_PATTERN_HITS = 3  # Po tylu duplikatach wzorzec adresu jest uznawany za źródło duplikatów
+
+_WORD_RE = re.compile(r'\w+')
+_DIGITS_RE = re.compile(r'\d+')
+
+# Każdy bit skrótu ma osobne pole w jednej dużej liczbie całkowitej, dzięki
+# czemu jedynki na wszystkich 64 pozycjach są zliczane zwykłym dodawaniem
+_FIELD_BITS = 24
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+_SPREAD = [
+    [sum(1 << ((position * 8 + bit) * _FIELD_BITS) for bit in range(8) if value >> bit & 1) for value in range(256)]
+    for position in range(SIMHASH_BITS // 8)
+]
+
+def simhash(text):
+    """Zwraca 64-bitowy odcisk SimHash tekstu lub None dla zbyt krótkiej treści
+
+    Odcisk powstaje z unikalnych fragmentów po SHINGLE_WORDS słów (bez
+    względu na wielkość liter), więc drobne zmiany - licznik komentarzy,
+    data, jeden dodatkowy akapit - zmieniają tylko kilka bitów.
+    """
+    words = _WORD_RE.findall(text.lower()) if text else []
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    digests = [hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles]
+
+    # Histogram wartości każdego bajtu skrótu zamiast bit po bicie dla każdego fragmentu
+    totals = 0
+    for spread, column in zip(_SPREAD, zip(*digests)):
+        totals += sum(spread[value] * count for value, count in Counter(column).items())
+
+    half = len(shingles) / 2
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        if (totals >> (bit * _FIELD_BITS)) & _FIELD_MASK > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+class SimHashIndex:
+    """Indeks odcisków z wyszukiwaniem niemal identycznych w czasie ~O(1)
+
+    Odcisk jest dzielony na `max_distance + 1` pasm; dwa odciski różniące
+    się o najwyżej `max_distance` bitów muszą mieć identyczne co najmniej
+    jedno pasmo, więc porównywane są tylko odciski z tych samych kubełków.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-SIMHASH_BITS // self.bands)
+        self._buckets = {}
+
+    def _keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (fingerprint >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def find(self, fingerprint):
+        """Zwraca klucz pierwszego zapisanego odcisku w odległości ≤ max_distance lub None"""
+        for key in self._keys(fingerprint):
+            for other, value in self._buckets.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return value
+        return None
+
+    def add(self, fingerprint, value):
+        for key in self._keys(fingerprint):
+            self._buckets.setdefault(key, []).append((fingerprint, value))
+
+def duplicate_pattern(url, original_url):
+    """Zwraca wzorzec adresu, który odróżnia duplikat od oryginału, lub None
+
+    Wzorzec to albo zestaw parametrów zapytania, których oryginał nie ma
+    (np. `replytocom`), albo ostatni segment ścieżki z cyframi zamienionymi
+    na 0 (np. `comment-page-0`, `print`, `amp`) - tylko gdy ścieżka duplikatu
+    to ścieżka oryginału z dopisanymi segmentami. Duplikat pod zupełnie inną
+    ścieżką (np. `...-part-4` powtarzający `...-part-3`) nie daje wzorca,
+    bo zamiana cyfr objęłaby całą serię artykułów.
+    """
+    parsed, original = urlparse(url), urlparse(original_url)
+    host = parsed.netloc.lower()
+
+    extra_params = {key for key, _ in parse_qsl(parsed.query)} - {key for key, _ in parse_qsl(original.query)}
+    if extra_params:
+        return ('query', host, frozenset(extra_params))
+
+    segments = [s for s in parsed.path.split('/') if s]
+    original_segments = [s for s in original.path.split('/') if s]
+    if len(segments) > len(original_segments) and segments[:len(original_segments)] == original_segments:
+        return ('segment', host, _DIGITS_RE.sub('0', segments[-1]))
+    return None
+
+def _url_parts(url):
+    """Host, parametry zapytania i ostatni segment ścieżki URL (jak w duplicate_pattern)"""
+    parsed = urlparse(url)
+    segments = [s for s in parsed.path.split('/') if s]
+    last = _DIGITS_RE.sub('0', segments[-1]) if segments else None
+    return parsed.netloc.lower(), frozenset(key for key, _ in parse_qsl(parsed.query)), last
+
+class DuplicateDetector:
+    """Pomija strony niemal identyczne z już zapisanymi i uczy się wzorców adresów duplikatów
+
+    `check()` zwraca URL oryginału dla duplikatu albo None (wtedy strona jest
+    zapamiętywana). Wzorce adresów, które dały co najmniej `pattern_hits`
+    duplikatów, są rozpoznawane przez `is_suspect()` - kolejka przesuwa
+    takie adresy na koniec.
+    """
+
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, pattern_hits=DEFAULT_PATTERN_HITS):
+        self.index = SimHashIndex(max_distance)
+        self.pattern_hits = pattern_hits
+        self.duplicates = 0
+        self._pattern_counts = {}
+        self._query_patterns = {}  # host → lista zestawów parametrów
+        self._segment_patterns = set()  # (host, segment)
+
+    def check(self, url, content=None, fingerprint=None):
+        """Zwraca URL strony, której `content` jest niemal kopią, albo None
+
+        Zamiast treści można podać jej odcisk policzony wcześniej (simhash),
+        np. zapisany w dzienniku przebiegu.
+        """
+        if fingerprint is None:
+            fingerprint = simhash(content)
+        if fingerprint is None:
+            return None
+
+        original = self.index.find(fingerprint)
+        if original is None:
+            self.index.add(fingerprint, url)
+            return None
+
+        self.duplicates += 1
+        pattern = duplicate_pattern(url, original)
+        if pattern is not None:
+            hits = self._pattern_counts.get(pattern, 0) + 1
+            self._pattern_counts[pattern] = hits
+            if hits == self.pattern_hits:
+                kind, host, value = pattern
+                if kind == 'query':
+                    self._query_patterns.setdefault(host, []).append(value)
+                else:
+                    self._segment_patterns.add((host, value))
+        return original
+
+    def is_suspect(self, url):
+        """Sprawdza, czy URL pasuje do wzorca, który wcześniej dawał duplikaty"""
+        if not self._query_patterns and not self._segment_patterns:
+            return False
+        host, params, last = _url_parts(url)
+        if any(pattern <= params for pattern in self._query_patterns.get(host, ())):
+            return True
+        return (host, last) in self._segment_patterns
+
+    @property
+    def patterns(self):
+        """Liczba wzorców adresów uznanych za źródło duplikatów"""
+        return sum(len(p) for p in self._query_patterns.values()) + len(self._segment_patterns)
+
+    def summary(self):
+        return (
+            f"♊ Duplikaty: pominięto {self.duplicates} stron, "
+            f"{self.patterns} wzorców adresów przesuniętych na koniec kolejki"
+        )
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Wspólne funkcje pobierania stron dla crawlerów
+Pozwala pobierać wiele stron równolegle przez jeden AsyncWebCrawler
+lub pulę przeglądarek (crawl_browsers.BrowserPool)
+"""
+
+import asyncio
+import time
+from contextlib import nullcontext
+
+from crawl_metrics import CACHE, FETCH
+
+# Domyślna maksymalna liczba stron pobieranych jednocześnie
+DEFAULT_MAX_CONCURRENCY = 5
+
+async def fetch_many(crawler, urls, config, max_concurrency=DEFAULT_MAX_CONCURRENCY, cache=None, semaphore=None,
+                     metrics=None):
+    """Pobiera wiele stron równolegle z limitem jednoczesnych zapytań
+
+    Zwraca listę wyników w tej samej kolejności co `urls`. Jeśli pobieranie
+    strony rzuci wyjątek, na jej miejscu znajduje się obiekt wyjątku, dzięki
+    czemu jedna błędna strona nie przerywa pobierania pozostałych.
+
+    Jeśli podano `cache` (crawl_cache.PageCache), świeże strony są zwracane
+    z dysku bez renderowania, a przeterminowane są najpierw rewalidowane
+    zapytaniem warunkowym.
+
+    `semaphore` to opcjonalny wspólny limit dla wielu równoległych wywołań
+    (np. crawl kilku seedów przez jedną przeglądarkę) - obowiązuje razem
+    z `max_concurrency` tego wywołania.
+
+    Z `metrics` (crawl_metrics.CrawlMetrics) czas każdej strony trafia do
+    etapu "cache" (strona z dysku) albo "fetch" (od zajęcia miejsca w limicie
+    do wyniku, z ponowieniami).
+    """
+    local_limit = asyncio.Semaphore(max(1, max_concurrency))
+    shared_limit = semaphore if semaphore is not None else nullcontext()
+
+    def measure(stage, url, start, result):
+        if metrics is not None:
+            metrics.record(stage, time.perf_counter() - start, bytes_out=len(getattr(result, 'html', '') or ''), url=url)
+
+    async def fetch_one(url):
+        start = time.perf_counter()
+        if cache is not None:
+            cached = cache.get(url)
+            if cached is not None:
+                cache.stats['hits'] += 1
+                measure(CACHE, url, start, cached)
+                return cached
+
+        async with local_limit, shared_limit:
+            start = time.perf_counter()
+            if cache is not None and cache.needs_revalidation(url):
+                if await asyncio.to_thread(cache.is_unchanged, url):
+                    cache.mark_revalidated(url)
+                    cached = cache.get(url, allow_stale=True)
+                    if cached is not None:
+                        cache.stats['revalidated'] += 1
+                        measure(CACHE, url, start, cached)
+                        return cached
+
+            result = await crawler.arun(url=url, config=config)
+            measure(FETCH, url, start, result)
+
+        if cache is not None:
+            cache.stats['misses'] += 1
+            cache.put(url, result)
+        return result
+
+    # gather zachowuje kolejność wejściową niezależnie od kolejności ukończenia
+    return await asyncio.gather(*(fetch_one(url) for url in urls), return_exceptions=True)
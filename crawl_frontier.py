@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Kolejka stron do pobrania (frontier) dla crawlerów
+Przechodzi strony wszerz (BFS) albo w kolejności oceny trafności (PriorityFrontier)
+z limitami głębokości, liczby stron i stron na host
+"""
+
+import heapq
+from collections import deque
+from itertools import count
+from urllib.parse import urlparse
+
+from crawl_urls import VisitedSet
+
+class CrawlFrontier:
+    """Kolejka FIFO adresów do pobrania z zbiorem odwiedzonych URL-i
+
+    Wszystkie operacje (dodanie, pobranie, sprawdzenie duplikatu) mają koszt O(1),
+    więc kolejka skaluje się do dziesiątek tysięcy stron. Budżety są liczone
+    w chwili dodania do kolejki, dzięki czemu nigdy nie zaplanujemy więcej stron,
+    niż pozwalają limity.
+
+    Odwiedzone adresy są porównywane po kluczu crawl_urls.url_key (bez
+    fragmentu, parametrów śledzących i końcowego ukośnika) i trzymane jako
+    skróty; `visited_capacity` przełącza zbiór na filtr Blooma o stałej
+    pamięci dla crawli z milionami linków.
+
+    `deprioritize` to opcjonalna funkcja URL → bool; wskazane przez nią adresy
+    (np. wzorce dające duplikaty) trafiają do kolejki odłożonych i są
+    pobierane dopiero po wyczerpaniu zwykłej kolejki. Gdy globalny budżet
+    stron jest wyczerpany, zwykły URL zajmuje miejsce ostatnio odłożonego.
+    """
+
+    def __init__(self, max_depth=1, max_pages=None, max_pages_per_host=None, deprioritize=None,
+                 visited_capacity=None):
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_pages_per_host = max_pages_per_host
+        self.deprioritize = deprioritize
+        self._queue = deque()
+        self._deferred = deque()
+        self._seen = VisitedSet(bloom_capacity=visited_capacity)
+        self._scheduled = 0
+        self._host_counts = {}
+
+    def __len__(self):
+        return len(self._queue) + len(self._deferred)
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    @property
+    def scheduled(self):
+        """Liczba wszystkich stron zaplanowanych do pobrania"""
+        return self._scheduled
+
+    def add(self, url, depth=0, **info):
+        """Dodaje URL do kolejki, jeśli mieści się w limitach i nie był jeszcze widziany
+
+        Dodatkowe argumenty (np. text, title) są przekazywane dalej razem z wpisem.
+        Zwraca True, jeśli URL został dodany.
+        """
+        if not url or (self.max_depth is not None and depth > self.max_depth):
+            return False
+        fingerprint = self._seen.fingerprint(url)
+        if self._seen.has(fingerprint):
+            return False
+
+        deferred = self.deprioritize is not None and self.deprioritize(url)
+        if self.is_full() and (deferred or not self._deferred):
+            return False
+
+        host = urlparse(url).netloc.lower()
+        if self.max_pages_per_host is not None and self._host_counts.get(host, 0) >= self.max_pages_per_host:
+            return False
+
+        if self.is_full():
+            # Odłożony URL zwalnia miejsce w budżecie (pozostaje oznaczony jako widziany)
+            evicted = self._deferred.pop()
+            evicted_host = urlparse(evicted['url']).netloc.lower()
+            self._host_counts[evicted_host] -= 1
+            self._scheduled -= 1
+
+        self._seen.add_fingerprint(fingerprint)
+        self._scheduled += 1
+        self._host_counts[host] = self._host_counts.get(host, 0) + 1
+        entry = {'url': url, 'depth': depth, **info}
+        if deferred:
+            self._deferred.append(entry)
+        else:
+            self._queue.append(entry)
+        return True
+
+    def defer_matching(self):
+        """Przenosi do odłożonych wpisy z kolejki wskazane teraz przez `deprioritize`
+
+        Wywoływane, gdy zmieniło się to, co `deprioritize` uznaje za mniej ważne
+        (np. wykryto nowy wzorzec duplikatów). Zwraca liczbę przeniesionych wpisów.
+        """
+        if self.deprioritize is None:
+            return 0
+        kept = deque()
+        moved = 0
+        for entry in self._queue:
+            if self.deprioritize(entry['url']):
+                self._deferred.append(entry)
+                moved += 1
+            else:
+                kept.append(entry)
+        self._queue = kept
+        return moved
+
+    def mark_seen(self, url):
+        """Oznacza URL jako już obsłużony (np. przy wznawianiu) bez dodawania do kolejki
+
+        URL liczy się do budżetów tak samo jak strona pobrana w tym przebiegu.
+        """
+        if not url or not self._seen.add(url):
+            return
+        host = urlparse(url).netloc.lower()
+        self._scheduled += 1
+        self._host_counts[host] = self._host_counts.get(host, 0) + 1
+
+    def pop(self):
+        """Zwraca następny wpis z kolejki lub None, gdy kolejka jest pusta"""
+        if self._queue:
+            return self._queue.popleft()
+        return self._deferred.popleft() if self._deferred else None
+
+    def pop_batch(self, size):
+        """Zwraca do `size` kolejnych wpisów w kolejności FIFO (odłożone na końcu)"""
+        batch = []
+        while self._queue and len(batch) < size:
+            batch.append(self._queue.popleft())
+        while self._deferred and len(batch) < size:
+            batch.append(self._deferred.popleft())
+        return batch
+
+    def is_full(self):
+        """Sprawdza, czy wyczerpano globalny budżet stron"""
+        return self.max_pages is not None and self._scheduled >= self.max_pages
+
+DEFERRED_PENALTY = 1000.0  # Kara w ocenie dla adresów wskazanych przez `deprioritize`
+
+class PriorityFrontier:
+    """Kolejka priorytetowa adresów - najpierw pobierane są najwyżej ocenione
+
+    `score(url, depth, info)` ocenia wpis przy dodaniu (np.
+    crawl_relevance.LinkScorer). W przeciwieństwie do CrawlFrontier budżety
+    stron są liczone przy pobraniu z kolejki, więc kolejka może trzymać
+    więcej kandydatów niż budżet, a limit stron trafia do najlepszych z nich.
+    Ten sam URL znaleziony ponownie z wyższą oceną (np. w treści innej
+    strony zamiast w menu) dostaje nową, wyższą pozycję.
+
+    Wpisy z oceną poniżej `min_score` są odrzucane. Gdy kolejka przekroczy
+    `max_queue` wpisów, najsłabsze są usuwane (pozostają oznaczone jako
+    widziane). `deprioritize` i `visited_capacity` działają jak w CrawlFrontier;
+    wskazane adresy dostają karę DEFERRED_PENALTY.
+    """
+
+    def __init__(self, score, max_depth=1, max_pages=None, max_pages_per_host=None, deprioritize=None,
+                 visited_capacity=None, min_score=None, max_queue=100000):
+        self.score = score
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_pages_per_host = max_pages_per_host
+        self.deprioritize = deprioritize
+        self.min_score = min_score
+        self.max_queue = max_queue
+        self._heap = []  # (-ocena, kolejność, odcisk, wpis)
+        self._pending = {}  # odcisk → ocena aktualnego wpisu w kolejce
+        self._order = count()
+        self._seen = VisitedSet(bloom_capacity=visited_capacity)
+        self._scheduled = 0
+        self._host_counts = {}
+
+    def __len__(self):
+        return 0 if self.is_full() else len(self._pending)
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    @property
+    def scheduled(self):
+        """Liczba stron wydanych do pobrania (i oznaczonych jako ukończone)"""
+        return self._scheduled
+
+    def _rank(self, url, depth, info):
+        """Zwraca ocenę wpisu i informację, czy naliczono karę `deprioritize`"""
+        score = self.score(url, depth, info)
+        if self.deprioritize is not None and self.deprioritize(url):
+            return score - DEFERRED_PENALTY, True
+        return score, False
+
+    def add(self, url, depth=0, **info):
+        """Dodaje URL z oceną do kolejki; zwraca True, jeśli URL jest nowy
+
+        Dodatkowe argumenty (np. text, context) trafiają do wpisu i do funkcji
+        oceniającej. Już zakolejkowany URL z wyższą oceną jest przesuwany wyżej
+        (zwraca wtedy False - nie jest to nowy wpis).
+        """
+        if not url or (self.max_depth is not None and depth > self.max_depth):
+            return False
+        if self.is_full():
+            return False
+
+        fingerprint = self._seen.fingerprint(url)
+        queued = fingerprint in self._pending
+        if self._seen.has(fingerprint) and not queued:
+            return False
+
+        score, deferred = self._rank(url, depth, info)
+        if self.min_score is not None and score < self.min_score:
+            return False
+        if queued and score <= self._pending[fingerprint]:
+            return False
+
+        self._pending[fingerprint] = score
+        entry = {'url': url, 'depth': depth, **info, 'score': score, 'deferred': deferred}
+        heapq.heappush(self._heap, (-score, next(self._order), fingerprint, entry))
+        if len(self._heap) > 2 * self.max_queue:
+            self._trim()
+        if queued:
+            return False
+        self._seen.add_fingerprint(fingerprint)
+        return True
+
+    def _trim(self):
+        """Zostawia w kolejce `max_queue` najwyżej ocenionych aktualnych wpisów"""
+        current = [item for item in self._heap if self._pending.get(item[2]) == -item[0]]
+        self._heap = heapq.nsmallest(self.max_queue, current)
+        heapq.heapify(self._heap)
+        self._pending = {item[2]: -item[0] for item in self._heap}
+
+    def defer_matching(self):
+        """Nalicza karę wpisom z kolejki wskazanym teraz przez `deprioritize`
+
+        Zwraca liczbę przesuniętych wpisów.
+        """
+        if self.deprioritize is None:
+            return 0
+        moved = 0
+        heap = []
+        for neg_score, order, fingerprint, entry in self._heap:
+            if self._pending.get(fingerprint) != -neg_score:
+                continue
+            if not entry['deferred'] and self.deprioritize(entry['url']):
+                entry['score'] -= DEFERRED_PENALTY
+                entry['deferred'] = True
+                self._pending[fingerprint] = entry['score']
+                neg_score = -entry['score']
+                moved += 1
+            heap.append((neg_score, order, fingerprint, entry))
+        heapq.heapify(heap)
+        self._heap = heap
+        return moved
+
+    def mark_seen(self, url):
+        """Oznacza URL jako już obsłużony (np. przy wznawianiu) - liczy się do budżetów"""
+        if not url or not self._seen.add(url):
+            return
+        host = urlparse(url).netloc.lower()
+        self._scheduled += 1
+        self._host_counts[host] = self._host_counts.get(host, 0) + 1
+
+    def pop(self):
+        """Zwraca najwyżej oceniony wpis lub None, gdy kolejka jest pusta lub budżet wyczerpany"""
+        while self._heap and not self.is_full():
+            neg_score, _, fingerprint, entry = heapq.heappop(self._heap)
+            if self._pending.get(fingerprint) != -neg_score:
+                continue  # Wpis zastąpiony wyżej ocenionym
+            del self._pending[fingerprint]
+
+            host = urlparse(entry['url']).netloc.lower()
+            if self.max_pages_per_host is not None and self._host_counts.get(host, 0) >= self.max_pages_per_host:
+                continue
+            self._scheduled += 1
+            self._host_counts[host] = self._host_counts.get(host, 0) + 1
+            return entry
+        return None
+
+    def pop_batch(self, size):
+        """Zwraca do `size` najwyżej ocenionych wpisów (w ramach budżetu)"""
+        batch = []
+        while len(batch) < size:
+            entry = self.pop()
+            if entry is None:
+                break
+            batch.append(entry)
+        return batch
+
+    def is_full(self):
+        """Sprawdza, czy wyczerpano globalny budżet stron"""
+        return self.max_pages is not None and self._scheduled >= self.max_pages
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Szybka ścieżka pobierania bez renderowania w przeglądarce
+Statyczne strony (np. artykuły WordPress) mają całą treść w pierwszym HTML,
+więc wystarczy zwykłe zapytanie HTTP i zamiana HTML na markdown. Dla każdej
+domeny na pierwszych stronach porównywana jest ilość tekstu z obu ścieżek;
+domeny, na których szybka ścieżka daje tyle samo treści, dalej pobierane są
+bez przeglądarki, a przy zbyt małej ilości tekstu strona jest pobierana
+przeglądarką
+"""
+
+import asyncio
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from crawl_cache import CachedMarkdown
+from crawl_metrics import EXTRACT, HTTP
+from crawl_politeness import RETRY_STATUSES
+from crawl_urls import same_site
+
+DEFAULT_FASTPATH_FILE = ".crawl_fastpath.json"
+
+DEFAULT_TRIAL_PAGES = 3  # Strony domeny pobierane obiema ścieżkami przed decyzją
+DEFAULT_MIN_YIELD = 0.8  # Minimalny stosunek liczby słów szybkiej ścieżki do przeglądarki
+DEFAULT_MIN_WORDS = 50  # Strona z mniejszą liczbą słów z szybkiej ścieżki jest pobierana przeglądarką
+DEFAULT_MAX_MISSES = 3  # Po tylu stronach ze zbyt małą ilością tekstu domena wraca do przeglądarki
+DEFAULT_TIMEOUT = 15  # Limit czasu zapytania HTTP (sekundy)
+MAX_HTML_BYTES = 5 * 1024 * 1024  # Większe odpowiedzi są pobierane przeglądarką
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+STATIC = 'static'
+BROWSER = 'browser'
+
+_SKIP_TAGS = frozenset(('script', 'style', 'noscript', 'template', 'svg', 'iframe', 'canvas'))
+_BLOCK_TAGS = frozenset((
+    'p', 'div', 'section', 'article', 'header', 'footer', 'nav', 'main', 'aside', 'figure',
+    'figcaption', 'table', 'dl', 'dt', 'dd', 'address', 'details', 'summary', 'form',
+))
+_HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+_VOID_TAGS = frozenset(('br', 'hr', 'img', 'meta', 'link', 'input', 'source', 'wbr', 'area', 'base', 'col', 'embed'))
+_SPACES_RE = re.compile(r'\s+')
+_TRAILING_SPACES_RE = re.compile(r'[ \t]+\n')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+_LINK_TARGET_RE = re.compile(r'\]\([^)]*\)')
+_WORD_RE = re.compile(r'[^\W\d_]{2,}')
+
+class _MarkdownParser(HTMLParser):
+    """Zamienia HTML na markdown w stylu crawl4ai i zbiera linki, obrazy oraz tytuł"""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.base_host = urlsplit(base_url).hostname or ''
+        self.out = []
+        self.links = {'internal': [], 'external': []}
+        self.images = []
+        self.title = ''
+        self.description = ''
+        self._seen_links = set()
+        self._skip = 0
+        self._in_title = False
+        self._pre = 0
+        self._lists = []  # Stos list: [znacznik, numer kolejnego elementu]
+        self._anchors = []  # Stos otwartych linków: (href, indeks początku tekstu w out)
+        self._item_start = False  # Zaraz po znaczniku elementu listy - bez nowej linii
+
+    # -- wyjście -----------------------------------------------------------
+
+    def _tail(self):
+        return ''.join(self.out[-2:])
+
+    def _block(self):
+        """Zaczyna nowy akapit (pusta linia), jeśli nie jesteśmy już na jego początku"""
+        if self._lists:
+            self._line()  # Akapity w elementach listy to kolejne linie
+        elif self.out and not self._tail().endswith('\n\n'):
+            self.out.append('\n' if self._tail().endswith('\n') else '\n\n')
+
+    def _line(self):
+        if self.out and not self._item_start and not self._tail().endswith('\n'):
+            self.out.append('\n')
+
+    def _marker(self, text):
+        self.out.append(text)
+        self._item_start = True
+
+    def _write(self, text):
+        if not text:
+            return
+        # Spacja na początku linii nie ma znaczenia w markdown
+        if text[0] == ' ' and (not self.out or self._tail().endswith((' ', '\n'))):
+            text = text[1:]
+        if text:
+            self.out.append(text)
+            self._item_start = False
+
+    # -- znaczniki ---------------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+        if tag == 'meta':
+            attrs = dict(attrs)
+            if (attrs.get('name') or '').lower() == 'description':
+                self.description = attrs.get('content') or ''
+            return
+        if tag == 'base':
+            href = dict(attrs).get('href')
+            if href:
+                self.base_url = urljoin(self.base_url, href)
+            return
+        if tag in _SKIP_TAGS:
+            if tag not in _VOID_TAGS:
+                self._skip += 1
+            return
+        if self._skip:
+            return
+
+        attrs = dict(attrs)
+        if tag in _HEADINGS:
+            self._block()
+            self.out.append('#' * _HEADINGS[tag] + ' ')
+        elif tag in _BLOCK_TAGS:
+            self._block()
+        elif tag in ('ul', 'ol'):
+            self._block()
+            self._lists.append([tag, 1])
+        elif tag == 'li':
+            self._item_start = False
+            self._line()
+            indent = '  ' * max(0, len(self._lists) - 1)
+            if self._lists and self._lists[-1][0] == 'ol':
+                self._marker(f"{indent}{self._lists[-1][1]}. ")
+                self._lists[-1][1] += 1
+            else:
+                self._marker(f"{indent}* ")
+        elif tag == 'pre':
+            self._block()
+            self.out.append('```\n')
+            self._pre += 1
+        elif tag == 'code' and not self._pre:
+            self.out.append('`')
+        elif tag == 'blockquote':
+            self._block()
+            self.out.append('> ')
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('_')
+        elif tag == 'br':
+            self.out.append('  \n')
+        elif tag == 'hr':
+            self._block()
+            self.out.append('---\n\n')
+        elif tag == 'tr':
+            self._line()
+        elif tag in ('td', 'th'):
+            self.out.append(' | ')
+        elif tag == 'img':
+            src = attrs.get('src') or attrs.get('data-src')
+            if src and not src.startswith('data:'):
+                src = urljoin(self.base_url, src)
+                alt = (attrs.get('alt') or '').strip()
+                self.images.append({'src': src, 'alt': alt})
+                self.out.append(f"![{alt}]({src})")
+        elif tag == 'a':
+            self._anchors.append((attrs.get('href'), len(self.out)))
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip:
+            return
+
+        if tag in _HEADINGS or tag in _BLOCK_TAGS or tag == 'blockquote':
+            self._block()
+        elif tag in ('ul', 'ol'):
+            if self._lists:
+                self._lists.pop()
+            self._item_start = False
+            self._block()
+        elif tag == 'pre':
+            self._pre = max(0, self._pre - 1)
+            self._line()
+            self.out.append('```\n\n')
+        elif tag == 'code' and not self._pre:
+            self.out.append('`')
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('_')
+        elif tag == 'a' and self._anchors:
+            self._close_anchor()
+
+    def _close_anchor(self):
+        href, start = self._anchors.pop()
+        raw = ''.join(self.out[start:])
+        text = _SPACES_RE.sub(' ', raw).strip()
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            return
+        url = urljoin(self.base_url, href.strip())
+        del self.out[start:]
+        if text:
+            # Spacje z brzegów tekstu linku zostają poza nawiasami
+            lead = ' ' if raw[:1].isspace() else ''
+            trail = ' ' if raw[-1:].isspace() else ''
+            self._write(f"{lead}[{text}]({url}){trail}")
+
+        if url not in self._seen_links:
+            self._seen_links.add(url)
+            kind = 'internal' if same_site(urlsplit(url).hostname, self.base_host) else 'external'
+            self.links[kind].append({'href': url, 'text': text, 'title': ''})
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip:
+            return
+        if self._pre:
+            self.out.append(data)
+        else:
+            self._write(_SPACES_RE.sub(' ', data))
+
+    def markdown(self):
+        while self._anchors:
+            self._close_anchor()
+        text = _TRAILING_SPACES_RE.sub('\n', ''.join(self.out))
+        return _BLANK_LINES_RE.sub('\n\n', text).strip() + '\n'
+
+def html_to_markdown(html, base_url):
+    """Zwraca (markdown, linki {'internal', 'external'}, obrazy, metadane) dla HTML strony"""
+    parser = _MarkdownParser(base_url)
+    parser.feed(html)
+    parser.close()
+    metadata = {'title': parser.title.strip(), 'description': parser.description}
+    return parser.markdown(), parser.links, parser.images, metadata
+
+def text_yield(markdown):
+    """Liczba słów treści (bez adresów linków i obrazów) - miara porównywana między ścieżkami"""
+    text = getattr(markdown, 'raw_markdown', markdown) or ''
+    return len(_WORD_RE.findall(_LINK_TARGET_RE.sub(']', str(text))))
+
+class HttpResult:
+    """Wynik szybkiej ścieżki zgodny z polami wyniku crawl4ai używanymi przez crawlery"""
+
+    success = True
+    error_message = ""
+    from_fast_path = True
+
+    def __init__(self, url, html, status_code, headers):
+        start = time.perf_counter()
+        markdown, links, images, metadata = html_to_markdown(html, url)
+        self.extract_seconds = time.perf_counter() - start
+        self.url = url
+        self.html = html
+        self.cleaned_html = ''
+        self.markdown = CachedMarkdown(markdown)
+        self.links = links
+        self.media = {'images': images}
+        self.metadata = metadata
+        self.status_code = status_code
+        self.response_headers = headers
+
+class HttpStatusResult:
+    """Odmowa serwera (429, 503 itp.) z szybkiej ścieżki - kod i nagłówki trafiają do HostScheduler"""
+
+    success = False
+    from_fast_path = True
+    html = ''
+    cleaned_html = ''
+    extract_seconds = 0.0
+
+    def __init__(self, url, status_code, headers):
+        self.url = url
+        self.status_code = status_code
+        self.response_headers = headers
+        self.error_message = f"HTTP {status_code}"
+        self.markdown = CachedMarkdown('')
+        self.links = {'internal': [], 'external': []}
+        self.media = {'images': []}
+        self.metadata = {}
+
+def throttled(result):
+    """Czy wynik to odmowa serwera, którą trzeba ponowić, a nie pobierać przeglądarką"""
+    return isinstance(result, HttpStatusResult)
+
+def _decode(body, content_type):
+    match = re.search(r'charset=([\w-]+)', content_type or '', re.I)
+    charset = match.group(1) if match else None
+    if charset is None:
+        meta = _CHARSET_RE.search(body[:4096])
+        charset = meta.group(1).decode('ascii') if meta else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+def fetch_static(url, timeout=DEFAULT_TIMEOUT):
+    """Pobiera stronę zwykłym zapytaniem HTTP; zwraca HttpResult, HttpStatusResult albo None
+
+    HttpStatusResult to odpowiedź z kodem do ponowienia (RETRY_STATUSES) -
+    z nagłówkami, żeby HostScheduler mógł zwolnić i uwzględnić Retry-After.
+    None oznacza, że strony nie da się obsłużyć bez przeglądarki: inny błąd
+    HTTP, odpowiedź inna niż HTML, zbyt duża odpowiedź albo przekierowanie
+    na inny serwis. Funkcja blokująca - wywoływać przez asyncio.to_thread.
+    """
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT, 'Accept': 'text/html,*/*;q=0.5'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            content_type = response.headers.get('Content-Type', '')
+            if 'html' not in content_type.lower():
+                return None
+            final_url = response.geturl()
+            if not same_site(urlsplit(final_url).hostname, urlsplit(url).hostname):
+                return None
+            body = response.read(MAX_HTML_BYTES + 1)
+            if len(body) > MAX_HTML_BYTES:
+                return None
+            return HttpResult(final_url, _decode(body, content_type), response.status, dict(response.headers))
+    except urllib.error.HTTPError as e:
+        with e:
+            if e.code in RETRY_STATUSES:
+                return HttpStatusResult(url, e.code, dict(e.headers or {}))
+        return None
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+class FastPathCrawler:
+    """Crawler, który dla statycznych domen omija przeglądarkę - zamiennik crawlera dla fetch_many
+
+    Pierwsze `trial_pages` stron domeny jest pobierane obiema ścieżkami
+    po kolei (zwracany jest wynik przeglądarki); jeśli na każdej z nich szybka
+    ścieżka dała co najmniej `min_yield` słów przeglądarki, domena jest
+    uznawana za statyczną, w przeciwnym razie za wymagającą przeglądarki.
+    Na statycznej domenie strona z mniej niż `min_words` słowami (lub
+    nieudane zapytanie) jest pobierana przeglądarką, a gdy ta rzeczywiście
+    daje więcej treści, liczona jest pomyłka - po `max_misses` domena wraca
+    do przeglądarki. Decyzje są zapisywane w `path` (jeśli podano).
+    Odmowa serwera (429, 503 itp.) jest zwracana od razu, bez przeglądarki,
+    żeby HostScheduler wstrzymał host i ponowił próbę. Drugie zapytanie tej
+    samej strony (przeglądarka po szybkiej ścieżce) zabiera limit hosta
+    przez `gate` - ustawia go HostScheduler opakowujący ten crawler.
+    Z `metrics` zapytania trafiają do etapu "http", a zamiana HTML na
+    markdown do "extract".
+    """
+
+    def __init__(self, crawler, path=None, trial_pages=DEFAULT_TRIAL_PAGES, min_yield=DEFAULT_MIN_YIELD,
+                 min_words=DEFAULT_MIN_WORDS, max_misses=DEFAULT_MAX_MISSES, timeout=DEFAULT_TIMEOUT,
+                 metrics=None):
+        self.crawler = crawler
+        self.metrics = metrics
+        self.path = path
+        self.trial_pages = trial_pages
+        self.min_yield = min_yield
+        self.min_words = min_words
+        self.max_misses = max_misses
+        self.timeout = timeout
+        self.gate = None  # HostScheduler - limity hosta dla drugiego zapytania strony
+        self.domains = {}  # host → {'mode', 'trials', 'misses'}
+        self.stats = {'fast': 0, 'browser': 0, 'trials': 0, 'fallbacks': 0}
+
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.domains = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+
+    def _domain(self, url):
+        host = (urlsplit(url).hostname or '').removeprefix('www.')
+        return self.domains.setdefault(host, {'mode': None, 'trials': [], 'misses': 0})
+
+    def mode(self, url):
+        """STATIC, BROWSER albo None (domena w trakcie uczenia)"""
+        return self._domain(url)['mode']
+
+    def _fits(self, fast, browser_words):
+        """Czy szybka ścieżka dała wystarczająco dużo tekstu w porównaniu z przeglądarką"""
+        return fast is not None and fast.success and text_yield(fast.markdown) >= self.min_yield * browser_words
+
+    async def _fetch(self, url):
+        start = time.perf_counter()
+        result = await asyncio.to_thread(fetch_static, url, self.timeout)
+        if self.metrics is not None:
+            seconds = time.perf_counter() - start
+            if result is None or not result.success:
+                self.metrics.record(HTTP, seconds, url=url)
+            else:
+                # Zamiana na markdown odbywa się w tym samym wątku - odejmujemy ją od czasu zapytania
+                self.metrics.record(HTTP, seconds - result.extract_seconds, bytes_out=len(result.html), url=url)
+                self.metrics.record(
+                    EXTRACT, result.extract_seconds, len(result.html), len(result.markdown), url=url
+                )
+        return result
+
+    async def _browser(self, url, config, kwargs, extra=False):
+        """Pobiera stronę przeglądarką; `extra` - drugie zapytanie strony, liczone osobno w limitach hosta"""
+        self.stats['browser'] += 1
+        if extra and self.gate is not None:
+            async with self.gate.request(url):
+                return await self.crawler.arun(url=url, config=config, **kwargs)
+        return await self.crawler.arun(url=url, config=config, **kwargs)
+
+    async def arun(self, url, config=None, **kwargs):
+        """Pobiera stronę szybką ścieżką lub przeglądarką (jak AsyncWebCrawler.arun)"""
+        domain = self._domain(url)
+
+        if domain['mode'] == BROWSER:
+            return await self._browser(url, config, kwargs)
+
+        if domain['mode'] == STATIC:
+            fast = await self._fetch(url)
+            if throttled(fast):
+                return fast
+            if fast is not None and text_yield(fast.markdown) >= self.min_words:
+                self.stats['fast'] += 1
+                return fast
+            # Za mało tekstu - strona może potrzebować JS; przeglądarka rozstrzyga
+            self.stats['fallbacks'] += 1
+            result = await self._browser(url, config, kwargs, extra=True)
+            if getattr(result, 'success', False) and not self._fits(fast, text_yield(result.markdown)):
+                domain['misses'] += 1
+                if domain['misses'] >= self.max_misses and domain['mode'] == STATIC:
+                    domain['mode'] = BROWSER
+                    print(f"🐢 Domena {urlsplit(url).hostname} wymaga przeglądarki - wyłączono szybką ścieżkę")
+            return result
+
+        # Uczenie: obie ścieżki po kolei, wynik przeglądarki jest wiążący
+        self.stats['trials'] += 1
+        fast = await self._fetch(url)
+        if throttled(fast):
+            return fast
+        result = await self._browser(url, config, kwargs, extra=True)
+        if getattr(result, 'success', False) and domain['mode'] is None:
+            browser_words = text_yield(result.markdown)
+            if browser_words >= self.min_words:  # Prawie pusta strona niczego nie rozstrzyga
+                domain['trials'].append(round(text_yield(fast.markdown) / browser_words, 3) if fast else 0.0)
+                if not self._fits(fast, browser_words):
+                    domain['mode'] = BROWSER
+                elif len(domain['trials']) >= self.trial_pages:
+                    domain['mode'] = STATIC
+                    print(f"⚡ Domena {urlsplit(url).hostname} jest statyczna - dalsze strony bez przeglądarki")
+        return result
+
+    def save(self):
+        """Zapisuje decyzje dla domen (atomowo)"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.domains, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        stats = self.stats
+        static = sum(1 for domain in self.domains.values() if domain['mode'] == STATIC)
+        return (
+            f"⚡ Szybka ścieżka HTTP: {stats['fast']} stron bez przeglądarki, {stats['browser']} przeglądarką "
+            f"({stats['trials']} próbnych, {stats['fallbacks']} powrotów); statyczne domeny: {static}/{len(self.domains)}"
+        )
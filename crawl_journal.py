@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Dziennik przebiegu crawlowania (append-only JSONL)
+Każda zaplanowana i każda ukończona strona jest dopisywana jako jedna linia,
+dzięki czemu przerwany przebieg można wznowić bez ponownego renderowania
+"""
+
+import json
+import os
+
+DEFAULT_JOURNAL_DIR = ".crawl_journal"
+
+def _ends_mid_line(path):
+    """Sprawdza, czy plik kończy się bez znaku nowej linii"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b'\n'
+    except FileNotFoundError:
+        return False
+
+class JournalState:
+    """Stan odtworzony z dziennika: zaplanowane wpisy kolejki i ukończone strony"""
+
+    def __init__(self):
+        self.start_url = None
+        self.queued = []  # Wpisy kolejki w kolejności planowania
+        self.pages = {}  # URL → zapisana strona (None = pominięta), w kolejności ukończenia
+
+    def restore_frontier(self, frontier):
+        """Odtwarza kolejkę: ukończone URL-e są oznaczane jako widziane, reszta wraca do kolejki
+
+        Strony, które wcześniej się nie powiodły, nie mają wpisu `done`, więc
+        zostaną pobrane ponownie.
+        """
+        # Najpierw ukończone strony, by to one, a nie reszta kolejki, zajęły budżet stron
+        for entry in self.queued:
+            if entry['url'] in self.pages:
+                frontier.mark_seen(entry['url'])
+        for entry in self.queued:
+            if entry['url'] not in self.pages:
+                frontier.add(entry['url'], depth=entry['depth'], **entry.get('info', {}))
+
+class CrawlJournal:
+    """Dziennik JSONL z wpisami `start`, `queued` i `done`
+
+    Wpisy są tylko dopisywane i zrzucane na dysk po każdej linii, więc po
+    przerwaniu procesu w pliku zostaje wszystko, co zdążyło się zakończyć.
+    Uszkodzona (niedokończona) ostatnia linia jest przy odczycie pomijana.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def load(self):
+        """Odczytuje dziennik i zwraca JournalState (pusty, jeśli pliku nie ma)"""
+        state = JournalState()
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return state
+
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                event = record.get('event')
+                if event == 'start':
+                    state.start_url = record['url']
+                elif event == 'queued':
+                    state.queued.append(record)
+                elif event == 'done':
+                    state.pages[record['url']] = record['page']
+        return state
+
+    def open(self, start_url, resume=False):
+        """Otwiera dziennik do dopisywania; bez `resume` zaczyna nowy plik"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if resume and _ends_mid_line(self.path):
+            # Przerwany zapis zostawił niedokończoną linię - zaczynamy od nowej
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        if not resume:
+            self._write({'event': 'start', 'url': start_url})
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def queued(self, url, depth, **info):
+        """Zapisuje URL dodany do kolejki (z danymi wpisu, np. tekstem linku)"""
+        self._write({'event': 'queued', 'url': url, 'depth': depth, 'info': info})
+
+    def done(self, url, page):
+        """Zapisuje ukończoną stronę wraz z danymi potrzebnymi do raportu
+
+        `page=None` oznacza stronę pobraną, ale pominiętą w raporcie (np. duplikat).
+        """
+        self._write({'event': 'done', 'url': url, 'page': page})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Metryki etapów crawla i profilowanie przebiegu
+Dla każdej strony mierzony jest czas i liczba bajtów na kolejnych etapach
+(oczekiwanie w kolejce, pobieranie, zapytanie HTTP, renderowanie,
+ekstrakcja, czyszczenie, filtrowanie, linki, kod, zapis); zbiorcze histogramy można
+zapisać jako JSON lub w formacie tekstowym Prometheusa. `run_profiled`
+uruchamia przebieg pod cProfile albo prostym profilerem próbkującym
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+QUEUE_WAIT = 'queue_wait'  # Od dodania do kolejki do rozpoczęcia pobierania
+FETCH = 'fetch'  # Całe pobranie strony (z oczekiwaniem na limity hosta i ponowieniami)
+CACHE = 'cache'  # Strona z lokalnego cache
+HTTP = 'http'  # Zapytanie szybkiej ścieżki (sieć)
+RENDER = 'render'  # Renderowanie w przeglądarce (sieć + przeglądarka + markdown crawl4ai)
+EXTRACT = 'extract'  # Markdown, obrazy i linki z wyniku (HTML → markdown w szybkiej ścieżce)
+CLEAN = 'clean'  # clean_markdown_content
+FILTER = 'filter'  # Usuwanie boilerplate i wykrywanie duplikatów
+LINKS = 'links'  # Wybór i ocena linków strony oraz dodanie ich do kolejki
+CODE = 'code'  # Wyciąganie kodu DCTL ze strony do indeksu symboli
+WRITE = 'write'  # Zapis sekcji raportu i dziennika
+
+STAGES = (QUEUE_WAIT, FETCH, CACHE, HTTP, RENDER, EXTRACT, CLEAN, FILTER, LINKS, CODE, WRITE)
+
+# Granice kubełków histogramów (górne, włącznie) - jak w klientach Prometheusa
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB ... 64 MiB
+
+SAMPLE_INTERVAL = 0.005  # Odstęp próbek profilera próbkującego (sekundy)
+PROFILE_TOP = 25  # Liczba funkcji w podsumowaniu profilu
+
+class Histogram:
+    """Histogram o stałych kubełkach z sumą, liczbą próbek i minimum/maksimum"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Ostatni kubełek: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Przybliżony kwantyl - górna granica kubełka, w którym wypada"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+class StageStats:
+    """Czasy, rozmiary i bajty wejścia/wyjścia jednego etapu"""
+
+    def __init__(self):
+        self.seconds = Histogram(SECONDS_BUCKETS)
+        self.sizes = Histogram(BYTES_BUCKETS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+class CrawlMetrics:
+    """Metryki etapów przebiegu - zbiorcze histogramy i czasy każdego URL-a
+
+    `record()` dopisuje pomiar etapu (czas w sekundach oraz bajty wejścia
+    i wyjścia), a `timer()` mierzy blok `with`. Dla każdego URL-a sumowany
+    jest czas etapów, więc w eksporcie JSON widać, która strona i który
+    etap zajęły najwięcej czasu.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.pages = {}
+        self.started = time.time()
+
+    def record(self, stage, seconds, bytes_in=0, bytes_out=0, url=None):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.seconds.observe(seconds)
+        if bytes_out:
+            stats.sizes.observe(bytes_out)
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        if url is not None:
+            page = self.pages.setdefault(url, {})
+            page[stage] = page.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, stage, url=None, bytes_in=0):
+        """Mierzy czas bloku; bajty wyjścia można ustawić przez zwrócony słownik (`['bytes_out']`)"""
+        sizes = {'bytes_out': 0}
+        start = time.perf_counter()
+        try:
+            yield sizes
+        finally:
+            self.record(stage, time.perf_counter() - start, bytes_in, sizes['bytes_out'], url)
+
+    def _ordered(self):
+        """Etapy w kolejności przetwarzania strony (STAGES), nieznane na końcu"""
+        return sorted(self.stages.items(), key=lambda item: STAGES.index(item[0]) if item[0] in STAGES else len(STAGES))
+
+    def to_dict(self):
+        return {
+            'started': self.started,
+            'seconds': time.time() - self.started,
+            'stages': {
+                stage: {
+                    'seconds': stats.seconds.to_dict(),
+                    'bytes_in': stats.bytes_in,
+                    'bytes_out': stats.bytes_out,
+                    'sizes': stats.sizes.to_dict(),
+                }
+                for stage, stats in self._ordered()
+            },
+            'pages': self.pages,
+        }
+
+    def save_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+    def prometheus(self, prefix='crawl'):
+        """Metryki w formacie tekstowym Prometheusa (np. dla node_exporter textfile)"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Czas etapu crawla na stronę",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, stats in self.stages.items():
+            lines.extend(_histogram_lines(f"{prefix}_stage_seconds", stage, stats.seconds))
+        lines += [
+            f"# HELP {prefix}_stage_output_bytes Rozmiar wyniku etapu na stronę",
+            f"# TYPE {prefix}_stage_output_bytes histogram",
+        ]
+        for stage, stats in self.stages.items():
+            if stats.sizes.count:
+                lines.extend(_histogram_lines(f"{prefix}_stage_output_bytes", stage, stats.sizes))
+        lines += [
+            f"# HELP {prefix}_stage_bytes_total Bajty przetworzone przez etap",
+            f"# TYPE {prefix}_stage_bytes_total counter",
+        ]
+        for stage, stats in self.stages.items():
+            lines.append(f'{prefix}_stage_bytes_total{{stage="{stage}",direction="in"}} {stats.bytes_in}')
+            lines.append(f'{prefix}_stage_bytes_total{{stage="{stage}",direction="out"}} {stats.bytes_out}')
+        return "\n".join(lines) + "\n"
+
+    def save_prometheus(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(tmp_path, path)  # Atomowo - eksporter może czytać plik w trakcie zapisu
+
+    def table(self):
+        """Tabela etapów: liczba pomiarów, suma, średnia, p50/p95, maksimum i bajty"""
+        lines = [
+            "⏱️ Etapy crawla:",
+            f"   {'etap':<12}{'liczba':>8}{'suma s':>10}{'śr. ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'maks ms':>10}"
+            f"{'we KiB':>10}{'wy KiB':>10}",
+        ]
+        for stage, stats in self._ordered():
+            h = stats.seconds
+            lines.append(
+                f"   {stage:<12}{h.count:>8}{h.sum:>10.2f}{h.sum / h.count * 1000:>10.1f}"
+                f"{h.quantile(0.5) * 1000:>10.1f}{h.quantile(0.95) * 1000:>10.1f}{h.max * 1000:>10.1f}"
+                f"{stats.bytes_in / 1024:>10.0f}{stats.bytes_out / 1024:>10.0f}"
+            )
+        return "\n".join(lines)
+
+def _histogram_lines(name, stage, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum}')
+    lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+    return lines
+
+class SamplingProfiler:
+    """Profiler próbkujący stos wątku głównego co `interval` sekund
+
+    W odróżnieniu od cProfile nie spowalnia mierzonego kodu i dobrze
+    pokazuje korutyny czekające na sieć. Wynik to zliczone stosy w formacie
+    "collapsed" (funkcja;funkcja;... liczba) - wejście dla flamegraph.pl
+    i speedscope.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def table(self, top=PROFILE_TOP):
+        """Funkcje z największą liczbą próbek na szczycie stosu i w całym stosie"""
+        total = sum(self.stacks.values()) or 1
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                inclusive[name] += count
+        lines = [f"🔬 Profil próbkujący: {total} próbek co {self.interval * 1000:.0f} ms", "   własne %   łącznie %  funkcja"]
+        for name, count in own.most_common(top):
+            lines.append(f"   {count / total * 100:>8.1f}  {inclusive[name] / total * 100:>9.1f}  {name}")
+        return "\n".join(lines)
+
+def run_profiled(main, mode, output):
+    """Uruchamia `main()` pod profilerem `mode` ("cprofile" lub "sample") i zapisuje wynik do `output`
+
+    cProfile zapisuje plik pstats (np. dla snakeviz), profiler próbkujący -
+    stosy w formacie collapsed. Podsumowanie trafia na standardowe wyjście.
+    """
+    if mode == 'sample':
+        with SamplingProfiler() as profiler:
+            result = main()
+        profiler.save(output)
+        print(profiler.table())
+    else:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(main)
+        profiler.dump_stats(output)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        print(text.getvalue())
+    print(f"🔬 Profil zapisany do: {output}")
+    return result
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Lekkie rekordy pobranych stron
+W pamięci zostaje tylko to, czego potrzebuje raport (URL, tytuł, markdown,
+głębokość, obrazy, linki zewnętrzne); surowy i oczyszczony HTML trafia do
+katalogu roboczego na dysku i jest wczytywany dopiero na żądanie
+"""
+
+import hashlib
+import os
+import shutil
+import time
+
+DEFAULT_SPOOL_DIR = ".crawl_spool"
+
+HTML_SUFFIX = ".html"
+CLEANED_HTML_SUFFIX = ".cleaned.html"
+
+class HtmlSpool:
+    """Katalog roboczy jednego przebiegu na HTML stron
+
+    Każdy przebieg dostaje własny podkatalog, więc równoległe uruchomienia
+    nie nadpisują sobie plików. `cleanup()` usuwa katalog przebiegu.
+    """
+
+    def __init__(self, base_dir=DEFAULT_SPOOL_DIR):
+        run_name = time.strftime('%Y%m%d_%H%M%S') + f"_{os.getpid()}"
+        self.path = os.path.join(base_dir, run_name)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key, suffix):
+        return os.path.join(self.path, key + suffix)
+
+    def store(self, url, html, cleaned_html):
+        """Zapisuje HTML strony i zwraca klucz do późniejszego odczytu"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        for suffix, text in ((HTML_SUFFIX, html), (CLEANED_HTML_SUFFIX, cleaned_html)):
+            with open(self._file(key, suffix), 'w', encoding='utf-8') as f:
+                f.write(text or '')
+        return key
+
+    def load(self, key, suffix=HTML_SUFFIX):
+        """Wczytuje zapisany HTML (pusty tekst, jeśli pliku nie ma)"""
+        try:
+            with open(self._file(key, suffix), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return ''
+
+    def cleanup(self):
+        """Usuwa katalog przebiegu razem z zapisanym HTML"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+class PageRecord:
+    """Zwięzły rekord pobranej strony
+
+    `__slots__` usuwa słownik atrybutów z każdego rekordu, a z wyniku
+    crawl4ai kopiowane są tylko pola używane przez raport: `src`/`alt`
+    obrazów i `href`/`text` linków zewnętrznych. HTML jest dostępny przez
+    właściwości `html` i `cleaned_html`, które czytają go z katalogu roboczego.
+    """
+
+    __slots__ = ('url', 'title', 'markdown', 'depth', 'images', 'external_links', '_spool', '_spool_key')
+
+    def __init__(self, url, title, markdown, depth, images=(), external_links=(), spool=None, spool_key=None):
+        self.url = url
+        self.title = title
+        self.markdown = markdown
+        self.depth = depth
+        self.images = images
+        self.external_links = external_links
+        self._spool = spool
+        self._spool_key = spool_key
+
+    @classmethod
+    def from_result(cls, url, title, depth, result, spool=None):
+        """Buduje rekord z wyniku crawl4ai, zapisując HTML do `spool` (jeśli podano)"""
+        markdown = result.markdown.raw_markdown if result.markdown else ''
+
+        media = result.media or {}
+        images = tuple(
+            {'src': img.get('src', ''), 'alt': img.get('alt', 'Obraz')}
+            for img in media.get('images') or []
+        )
+
+        links = result.links or {}
+        external_links = tuple(
+            {'href': link.get('href', ''), 'text': link.get('text', link.get('href', ''))}
+            for link in links.get('external') or []
+        )
+
+        spool_key = None
+        if spool is not None:
+            spool_key = spool.store(url, result.html, getattr(result, 'cleaned_html', '') or '')
+
+        return cls(url, title, markdown, depth, images, external_links, spool, spool_key)
+
+    @property
+    def html(self):
+        """Surowy HTML strony wczytywany z dysku przy każdym odwołaniu"""
+        if self._spool is None:
+            return ''
+        return self._spool.load(self._spool_key, HTML_SUFFIX)
+
+    @property
+    def cleaned_html(self):
+        """Oczyszczony HTML strony wczytywany z dysku przy każdym odwołaniu"""
+        if self._spool is None:
+            return ''
+        return self._spool.load(self._spool_key, CLEANED_HTML_SUFFIX)
+
+    def __repr__(self):
+        return f"PageRecord({self.url!r}, depth={self.depth})"
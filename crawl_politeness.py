@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Uprzejme pobieranie: limit zapytań i adaptacyjna współbieżność per host
+Każdy host ma kubełek żetonów (stałe tempo zapytań) i okno współbieżności
+sterowane AIMD - rośnie o 1 na okno udanych, szybkich odpowiedzi i maleje
+o połowę po 429, błędach 5xx i przekroczonych limitach czasu. Nieudane
+pobrania są ponawiane z wykładniczym opóźnieniem z losowym rozrzutem,
+z uwzględnieniem nagłówka Retry-After
+"""
+
+import asyncio
+import contextlib
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 4.0  # Zapytania na sekundę do jednego hosta (None = bez limitu)
+DEFAULT_BURST = 4  # Pojemność kubełka - tyle zapytań może pójść naraz po przerwie
+DEFAULT_INITIAL_CONCURRENCY = 2  # Początkowe okno współbieżności hosta
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RETRIES = 3  # Ponowienia nieudanego pobrania (0 = bez ponowień)
+DEFAULT_BACKOFF_BASE = 1.0  # Opóźnienie przed pierwszym ponowieniem (sekundy, przed losowaniem)
+DEFAULT_BACKOFF_MAX = 60.0  # Maksymalne opóźnienie ponowienia
+DEFAULT_RETRY_AFTER_MAX = 300.0  # Dłuższe Retry-After są przycinane
+LATENCY_FACTOR = 3.0  # Odpowiedź wolniejsza niż tyle razy średnia to oznaka przeciążenia hosta
+LATENCY_DECREASE = 0.8  # Mnożnik okna przy wolnych odpowiedziach
+ERROR_DECREASE = 0.5  # Mnożnik okna i tempa po 429/5xx/przekroczeniu czasu
+EWMA_WEIGHT = 0.2  # Waga nowej próbki w średnim czasie odpowiedzi
+
+RETRY_STATUSES = frozenset((408, 425, 429, 500, 502, 503, 504))
+THROTTLE_STATUSES = frozenset((429, 503))
+
+def retry_after_seconds(headers, now=None):
+    """Czas z nagłówka Retry-After (liczba sekund lub data HTTP) albo None"""
+    if not headers:
+        return None
+    value = next((v for k, v in headers.items() if k.lower() == 'retry-after'), None)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - (now if now is not None else time.time()))
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_MAX):
+    """Opóźnienie przed ponowieniem nr `attempt` (od 0): losowe z [0, min(cap, base·2^attempt)]"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class TokenBucket:
+    """Kubełek żetonów: średnio `rate` zapytań na sekundę, do `burst` naraz"""
+
+    def __init__(self, rate, burst=DEFAULT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostState:
+    """Okno współbieżności, kubełek i statystyki jednego hosta"""
+
+    def __init__(self, rate, burst, initial, minimum, maximum):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.active = 0
+        self.blocked_until = 0.0  # Po 429 z Retry-After - host wstrzymany do tej chwili
+        self.latency = None  # Średni czas odpowiedzi (EWMA)
+        self.last_decrease = 0.0
+        self.changed = asyncio.Condition()
+        self.requests = 0
+        self.errors = 0
+
+    def on_success(self, latency):
+        typical = self.latency
+        self.latency = latency if typical is None else (1 - EWMA_WEIGHT) * typical + EWMA_WEIGHT * latency
+        if typical is not None and latency > LATENCY_FACTOR * typical:
+            self.decrease(LATENCY_DECREASE)
+            return
+        # Wzrost addytywny: +1 do okna po mniej więcej jednym pełnym oknie udanych odpowiedzi
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        if self.bucket is not None and self.bucket.rate < self.bucket.max_rate:
+            self.bucket.rate = min(self.bucket.max_rate, self.bucket.rate + self.bucket.max_rate / 10 / self.limit)
+
+    def decrease(self, factor, throttled=False):
+        """Spadek multiplikatywny - najwyżej raz na średni czas odpowiedzi (jedna seria błędów = jeden spadek)"""
+        now = time.monotonic()
+        if now - self.last_decrease < (self.latency or 0):
+            return
+        self.last_decrease = now
+        self.limit = max(self.minimum, self.limit * factor)
+        if throttled and self.bucket is not None:
+            self.bucket.rate = max(self.bucket.max_rate / 16, self.bucket.rate * factor)
+
+class HostScheduler:
+    """Crawler z limitami per host i ponowieniami - zamiennik crawlera dla fetch_many
+
+    `arun()` czeka na wolne miejsce w oknie współbieżności hosta i żeton
+    z jego kubełka, po czym pobiera stronę przez `crawler`. Odpowiedzi
+    429/408/425/5xx, wyjątki (w tym przekroczenie czasu) i nieudane pobrania
+    bez kodu HTTP są ponawiane do `retries` razy z opóźnieniem backoff_delay
+    lub dłuższym Retry-After (429/503 z Retry-After wstrzymują cały host).
+    Zwracany jest ostatni wynik, a gdy ostatnia próba rzuciła wyjątek - jest
+    on rzucany dalej. `timeout` (sekundy) ogranicza pojedynczą próbę.
+    Crawler z polem `gate` (FastPathCrawler) dostaje ten harmonogram, żeby
+    drugie zapytanie tej samej strony też szło przez limity hosta.
+    """
+
+    def __init__(self, crawler, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 initial_concurrency=DEFAULT_INITIAL_CONCURRENCY, min_concurrency=DEFAULT_MIN_CONCURRENCY,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, retries=DEFAULT_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX, timeout=None):
+        self.crawler = crawler
+        self.rate = rate
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.hosts = {}
+        if hasattr(crawler, 'gate'):
+            crawler.gate = self
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'timeouts': 0, 'failed': 0}
+
+    def host(self, url):
+        name = (urlsplit(url).hostname or '').lower()
+        state = self.hosts.get(name)
+        if state is None:
+            state = self.hosts[name] = HostState(
+                self.rate, self.burst, self.initial_concurrency, self.min_concurrency, self.max_concurrency
+            )
+        return state
+
+    async def _acquire(self, state):
+        async with state.changed:
+            while state.active >= max(1, int(state.limit)):
+                await state.changed.wait()
+            state.active += 1
+        try:
+            wait = state.blocked_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if state.bucket is not None:
+                await state.bucket.acquire()
+        except BaseException:
+            await self._release(state)
+            raise
+
+    async def _release(self, state):
+        async with state.changed:
+            state.active -= 1
+            state.changed.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def request(self, url):
+        """Dodatkowe zapytanie w ramach trwającej próby (np. przeglądarka po szybkiej ścieżce)
+
+        Zabiera żeton z kubełka hosta i zajmuje miejsce w jego oknie, ale nie
+        czeka na wolne miejsce - próba już trzyma jedno, więc przy oknie 1
+        czekanie by się zakleszczyło.
+        """
+        state = self.host(url)
+        async with state.changed:
+            state.active += 1
+        try:
+            if state.bucket is not None:
+                await state.bucket.acquire()
+            state.requests += 1
+            self.stats['requests'] += 1
+            yield
+        finally:
+            await self._release(state)
+
+    async def _attempt(self, state, url, config, kwargs):
+        """Jedna próba pobrania; zwraca (wynik, wyjątek, opóźnienie Retry-After albo None)"""
+        await self._acquire(state)
+        started = time.monotonic()
+        state.requests += 1
+        self.stats['requests'] += 1
+        try:
+            call = self.crawler.arun(url=url, config=config, **kwargs)
+            result = await (asyncio.wait_for(call, self.timeout) if self.timeout else call)
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            self.stats['timeouts'] += 1
+            state.errors += 1
+            state.decrease(ERROR_DECREASE, throttled=True)
+            return None, e, None
+        except Exception as e:
+            state.errors += 1
+            state.decrease(ERROR_DECREASE)
+            return None, e, None
+        finally:
+            await self._release(state)
+
+        status = getattr(result, 'status_code', None)
+        if status in RETRY_STATUSES:
+            state.errors += 1
+            retry_after = retry_after_seconds(getattr(result, 'response_headers', None))
+            if status in THROTTLE_STATUSES:
+                self.stats['throttled'] += 1
+                state.decrease(ERROR_DECREASE, throttled=True)
+                if retry_after:
+                    retry_after = min(retry_after, DEFAULT_RETRY_AFTER_MAX)
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+            else:
+                state.decrease(ERROR_DECREASE)
+            return result, None, retry_after
+        if getattr(result, 'success', True):
+            state.on_success(time.monotonic() - started)
+        return result, None, None
+
+    def _retryable(self, result, error):
+        if error is not None:
+            return True
+        if getattr(result, 'status_code', None) in RETRY_STATUSES:
+            return True
+        # Błąd nawigacji przeglądarki (brak odpowiedzi HTTP) - zwykle przejściowy
+        return not getattr(result, 'success', True) and getattr(result, 'status_code', None) is None
+
+    async def arun(self, url, config=None, **kwargs):
+        """Pobiera stronę z limitami hosta i ponowieniami (jak AsyncWebCrawler.arun)"""
+        state = self.host(url)
+        attempt = 0
+        while True:
+            result, error, retry_after = await self._attempt(state, url, config, kwargs)
+            if attempt >= self.retries or not self._retryable(result, error):
+                break
+            delay = max(backoff_delay(attempt, self.backoff_base, self.backoff_max), retry_after or 0)
+            attempt += 1
+            self.stats['retries'] += 1
+            reason = error.__class__.__name__ if error is not None else f"HTTP {getattr(result, 'status_code', None)}"
+            print(f"🔁 Ponowienie {attempt}/{self.retries} za {delay:.1f} s ({reason}): {url}")
+            await asyncio.sleep(delay)
+
+        if error is not None or not getattr(result, 'success', True):
+            self.stats['failed'] += 1
+        if error is not None:
+            raise error
+        return result
+
+    def summary(self):
+        stats = self.stats
+        limits = ', '.join(
+            f"{name}: okno {state.limit:.1f}" + (f", {state.bucket.rate:.1f}/s" if state.bucket else '')
+            for name, state in sorted(self.hosts.items(), key=lambda item: -item[1].requests)[:5]
+        )
+        return (
+            f"🚦 Hosty: {stats['requests']} zapytań, {stats['retries']} ponowień, {stats['throttled']} odmów (429/503), "
+            f"{stats['timeouts']} przekroczeń czasu, {stats['failed']} nieudanych" + (f" [{limits}]" if limits else '')
+        )
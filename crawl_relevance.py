@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Ocena trafności linków dla kolejki priorytetowej crawlera
+Łączy tekst linku, słowa ze ścieżki URL, kontekst linku w treści strony
+i podobieństwo do tytułu oraz słów kluczowych strony startowej, dzięki czemu
+budżet stron trafia do stron związanych z tematem, a nie do linków menu
+"""
+
+import re
+from collections import Counter
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_WEIGHTS = {
+    'text': 1.0,  # Udział słów kluczowych w tekście linku
+    'path': 0.5,  # Udział słów kluczowych w ścieżce URL
+    'context': 0.5,  # Udział słów kluczowych w linii treści, w której stoi link
+    'title': 1.5,  # Część słów tytułu strony startowej obecna w tekście lub ścieżce linku
+    'nav': -2.0,  # Link wygląda na element nawigacji/konta (logowanie, członkostwo, regulamin...)
+    'depth': -0.25,  # Za każdy poziom głębokości
+}
+
+CONTENT_KEYWORDS = 20  # Ile najczęstszych słów treści strony startowej dołączyć do słów kluczowych
+CONTENT_KEYWORD_MIN_COUNT = 2  # Słowo treści musi wystąpić co najmniej tyle razy
+CONTEXT_CHARS = 200  # Maksymalna długość zapamiętanego kontekstu linku
+
+STOPWORDS = frozenset('''
+a an and are as at be by for from has have how in into is it its of on or our that the this to was
+we what when where which who why will with you your i w z na do się że jak to od po dla oraz jest
+https http www com html php
+'''.split())
+
+NAV_TERMS = frozenset('''
+login logout signin signup sign register account membership member members join subscribe
+subscription cart checkout basket privacy terms cookie cookies policy contact about careers faq
+help support search feed rss tag tags category categories author wp admin share advertise shop
+pricing newsletter logowanie rejestracja konto koszyk regulamin prywatność kontakt
+'''.split())
+
+_TOKEN_RE = re.compile(r'[^\W\d_]{2,}')
+_MD_LINK_RE = re.compile(r'\[([^\]]*)\]\(\s*<?([^)\s>]+)')
+_MD_LINK_FULL_RE = re.compile(r'!?\[[^\]]*\]\([^)]*\)')
+
+def tokenize(text):
+    """Słowa (min. 2 litery) bez słów pomijalnych, małymi literami"""
+    return {token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS} if text else set()
+
+def link_contexts(markdown):
+    """Zwraca {href: tekst linii wokół linków} dla linków markdown - jeden przebieg po treści
+
+    Kontekst to linia bez samych linków, więc element menu ("* [Log In](...)")
+    nie ma kontekstu, a link w zdaniu artykułu ma jego pozostałe słowa.
+    Przy wielu wystąpieniach zostaje pierwsze.
+    """
+    contexts = {}
+    if not markdown:
+        return contexts
+    for line in markdown.split('\n'):
+        if '](' not in line:
+            continue
+        context = None
+        for match in _MD_LINK_RE.finditer(line):
+            href = match.group(2)
+            if href not in contexts:
+                if context is None:
+                    context = _MD_LINK_FULL_RE.sub(' ', line)[:CONTEXT_CHARS]
+                contexts[href] = context
+    return contexts
+
+def parse_weights(spec):
+    """Zamienia "text=1,nav=-3" na słownik wag (do opcji wiersza poleceń)"""
+    weights = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"Nieznana waga: {name} (dostępne: {', '.join(DEFAULT_WEIGHTS)})")
+        weights[name] = float(value)
+    return weights
+
+class LinkScorer:
+    """Ocenia linki względem strony startowej - do użycia jako `score` w PriorityFrontier
+
+    Słowa kluczowe to słowa tytułu strony startowej, podane `keywords` oraz
+    najczęstsze słowa jej treści (po `set_seed`). Ocena to ważona suma cech
+    z `weights` (brakujące wagi z DEFAULT_WEIGHTS); wpisy kolejki mogą mieć
+    pola `text`, `title` i `context`.
+    """
+
+    def __init__(self, title='', keywords=(), weights=None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.extra_keywords = tokenize(' '.join(keywords))
+        self.set_seed(title)
+
+    def set_seed(self, title, content=None):
+        """Ustawia tytuł i (opcjonalnie) treść strony startowej jako wzorzec trafności
+
+        Słowa kluczowe z treści pochodzą z tekstu poza linkami - menu i listy
+        linków nie wpływają na to, co uznajemy za temat strony.
+        """
+        self.title_terms = tokenize(title)
+        self.keywords = self.title_terms | self.extra_keywords
+        if content:
+            counts = Counter(
+                token for token in _TOKEN_RE.findall(_MD_LINK_FULL_RE.sub(' ', content).lower())
+                if token not in STOPWORDS and token not in NAV_TERMS
+            )
+            self.keywords |= {
+                token for token, n in counts.most_common(CONTENT_KEYWORDS) if n >= CONTENT_KEYWORD_MIN_COUNT
+            }
+
+    def features(self, url, text='', context=''):
+        """Cechy linku w skali 0-1 (bez głębokości)"""
+        path = unquote(urlsplit(url).path).replace('-', ' ').replace('_', ' ')
+        path_terms = tokenize(path)
+        section_terms = tokenize(path.lstrip('/').split('/', 1)[0])  # /login/, /tag/..., /membership/...
+        text_terms = tokenize(text)
+        context_terms = tokenize(context)
+        link_terms = text_terms | path_terms
+        keywords = self.keywords
+
+        return {
+            'text': len(text_terms & keywords) / len(text_terms) if text_terms else 0.0,
+            'path': len(path_terms & keywords) / len(path_terms) if path_terms else 0.0,
+            'context': len(context_terms & keywords) / len(context_terms) if context_terms else 0.0,
+            'title': len(link_terms & self.title_terms) / len(self.title_terms) if self.title_terms else 0.0,
+            'nav': 1.0 if (text_terms and text_terms <= NAV_TERMS) or section_terms & NAV_TERMS else 0.0,
+        }
+
+    def score(self, url, depth=0, text='', context=''):
+        weights = self.weights
+        total = sum(weights[name] * value for name, value in self.features(url, text, context).items())
+        return total + weights['depth'] * depth
+
+    def __call__(self, url, depth, info):
+        text = ' '.join(filter(None, (info.get('text'), info.get('title'))))
+        return self.score(url, depth, text, info.get('context', ''))
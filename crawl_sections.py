@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Trwały magazyn wyczyszczonych sekcji raportu
+Dla każdego URL zapisuje skrót surowego markdown i wyczyszczoną sekcję
+(w bazie SQLite, wiersz na URL), dzięki czemu kolejny przebieg czyści tylko
+strony, które się zmieniły, a w pamięci nie są trzymane sekcje całego serwisu
+"""
+
+import hashlib
+import os
+import sqlite3
+
+DEFAULT_SECTIONS_DIR = ".crawl_sections"
+DEFAULT_BATCH_SIZE = 100  # Tyle zmian trafia do bazy w jednej transakcji
+
+NEW = 'new'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    url TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    cleaner TEXT NOT NULL,
+    content TEXT,
+    run INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY);
+"""
+
+_PUT = """
+INSERT INTO sections (url, hash, cleaner, content, run) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    hash = excluded.hash, cleaner = excluded.cleaner, content = excluded.content, run = excluded.run
+"""
+_TOUCH = "UPDATE sections SET run = ? WHERE url = ?"
+
+def content_hash(text):
+    """Skrót SHA-256 surowego markdown strony"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+class SectionStore:
+    """Wyczyszczone sekcje stron z poprzedniego przebiegu, kluczowane URL-em
+
+    `cleaner` identyfikuje sposób czyszczenia razem z odciskiem aktywnych
+    reguł (np. "regex:3f2a..." - zob. `cleaner_fingerprint` w crawlerach) -
+    sekcje wyczyszczone innym sposobem albo innymi regułami nie są używane
+    ponownie, choć status zmiany strony nadal wynika z porównania skrótów.
+    Sekcje są czytane z bazy dopiero przy sprawdzaniu danego URL-a, a zmiany
+    zapisywane partiami po `batch_size`. URL-e z poprzedniego przebiegu,
+    których nie odwiedzono w bieżącym, są przy `save()` usuwane i liczone
+    jako usunięte.
+    """
+
+    def __init__(self, path, cleaner='', batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.cleaner = cleaner
+        self.batch_size = max(1, batch_size)
+        self.stats = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Transakcje otwieramy sami - jedna na partię zmian
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(SCHEMA)
+        self.run = self._db.execute("INSERT INTO runs DEFAULT VALUES").lastrowid
+        self._pending = []
+        self._hashes = {}  # URL → skrót strony czekającej na `put()`
+        self._removed = None
+
+    def clean(self, url, raw_markdown, clean):
+        """Zwraca wyczyszczoną sekcję strony, wywołując `clean` tylko dla zmienionej treści"""
+        content = self.reuse(url, raw_markdown)
+        if content is None:
+            content = clean(raw_markdown)
+            self.put(url, content)
+        return content
+
+    def reuse(self, url, raw_markdown):
+        """Sprawdza stronę względem poprzedniego przebiegu i zwraca zapisaną sekcję
+
+        Zwraca None, jeśli stronę trzeba wyczyścić - wynik należy wtedy
+        przekazać do `put()`. Pozwala czyścić zmienione strony partiami.
+        """
+        digest = content_hash(raw_markdown)
+        previous = self._db.execute(
+            "SELECT hash, cleaner, content FROM sections WHERE url = ?", (url,)
+        ).fetchone()
+
+        if previous is None:
+            status = NEW
+        elif previous[0] == digest:
+            status = UNCHANGED
+        else:
+            status = CHANGED
+        self.stats[status] += 1
+
+        if status == UNCHANGED and previous[1] == self.cleaner and previous[2] is not None:
+            self._write(_TOUCH, (self.run, url))
+            return previous[2]
+
+        self._hashes[url] = digest
+        return None
+
+    def put(self, url, content):
+        """Zapisuje wyczyszczoną sekcję strony sprawdzonej przez `reuse()`"""
+        self._write(_PUT, (url, self._hashes.pop(url), self.cleaner, content, self.run))
+
+    def keep(self, url):
+        """Zachowuje zapisaną sekcję URL-a bez liczenia jej w statystykach (np. przy wznawianiu)"""
+        self._write(_TOUCH, (self.run, url))
+
+    def _write(self, statement, row):
+        self._pending.append((statement, row))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Zapisuje zbuforowane zmiany w jednej transakcji"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._db.execute("BEGIN")
+        try:
+            for statement, row in pending:
+                self._db.execute(statement, row)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def close(self):
+        """Zapisuje zbuforowane zmiany bez kończenia przebiegu (np. po przerwaniu crawla)"""
+        self.flush()
+        self._db.close()
+
+    @property
+    def removed(self):
+        """Liczba URL-i z poprzedniego przebiegu, których nie odwiedzono w bieżącym"""
+        if self._removed is not None:
+            return self._removed
+        self.flush()
+        return self._db.execute("SELECT count(*) FROM sections WHERE run < ?", (self.run,)).fetchone()[0]
+
+    def save(self):
+        """Kończy przebieg: zapisuje zmiany i usuwa sekcje nieodwiedzonych URL-i (w jednej transakcji)"""
+        self._removed = self.removed
+        self._db.execute("BEGIN")
+        try:
+            self._db.execute("DELETE FROM sections WHERE run < ?", (self.run,))
+            self._db.execute("DELETE FROM runs WHERE id < ?", (self.run,))
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.close()
+
+    def summary(self):
+        """Zwraca podsumowanie zmian względem poprzedniego przebiegu"""
+        s = self.stats
+        return (
+            f"🔁 Zmiany: {s[CHANGED]} zmienionych, {s[UNCHANGED]} bez zmian, "
+            f"{s[NEW]} nowych, {self.removed} usuniętych"
+        )
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Baza SQLite z pobranymi stronami i indeksem pełnotekstowym FTS5
+Każda strona to jeden wiersz (kanoniczny URL, tytuł, głębokość, czas
+pobrania, skrót treści, surowy i oczyszczony markdown); wiersze są
+zapisywane partiami w jednej transakcji, a raport markdown można z bazy
+wygenerować w dowolnej chwili
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+from crawl_sections import content_hash
+
+DEFAULT_STORE_FILE = "crawl_pages.db"
+DEFAULT_BATCH_SIZE = 100  # Tyle stron trafia do bazy w jednej transakcji
+SNIPPET_TOKENS = 16  # Długość fragmentu wyniku wyszukiwania (w słowach)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    name TEXT PRIMARY KEY,
+    start_url TEXT NOT NULL,
+    run INTEGER NOT NULL DEFAULT 1,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    site TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    content_hash TEXT NOT NULL,
+    raw_markdown TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (site, url)
+);
+CREATE INDEX IF NOT EXISTS pages_site_order ON pages (site, run, position);
+"""
+
+# Indeks z zewnętrzną treścią - tekst nie jest przechowywany drugi raz,
+# a wyzwalacze odświeżają go tylko przy zmianie tytułu lub treści
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+    title, markdown, content='pages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS pages_fts_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO pages_fts (rowid, title, markdown) VALUES (new.id, new.title, new.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, title, markdown) VALUES ('delete', old.id, old.title, old.markdown);
+END;
+CREATE TRIGGER IF NOT EXISTS pages_fts_update AFTER UPDATE ON pages
+WHEN old.content_hash IS NOT new.content_hash OR old.title IS NOT new.title BEGIN
+    INSERT INTO pages_fts (pages_fts, rowid, title, markdown) VALUES ('delete', old.id, old.title, old.markdown);
+    INSERT INTO pages_fts (rowid, title, markdown) VALUES (new.id, new.title, new.markdown);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO pages (url, site, run, position, title, depth, fetched_at, content_hash, raw_markdown, markdown, meta)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (site, url) DO UPDATE SET
+    run = excluded.run, position = excluded.position, title = excluded.title,
+    depth = excluded.depth, fetched_at = excluded.fetched_at, content_hash = excluded.content_hash,
+    raw_markdown = excluded.raw_markdown, markdown = excluded.markdown, meta = excluded.meta
+"""
+
+# Strona odtworzona z dziennika - treść w bazie zostaje, zmienia się tylko miejsce w raporcie
+_PLACE = """
+INSERT INTO pages (url, site, run, position, title, depth, fetched_at, content_hash, raw_markdown, markdown, meta)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (site, url) DO UPDATE SET run = excluded.run, position = excluded.position
+"""
+
+def _quote_query(query):
+    """Zamienia dowolny tekst na zapytanie FTS5 z samych fraz (bez operatorów)"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+class PageStore:
+    """Strony crawla w bazie SQLite z indeksem FTS5 - alternatywa dla jednego pliku markdown
+
+    Strony serwisu `site` (nazwa raportu, np. "zenn_dev") należą do
+    przebiegów: `begin()` bez `resume` zaczyna nowy przebieg, a `add()`
+    nadaje stronom kolejne pozycje w raporcie. `pages()` zwraca strony
+    ostatniego przebiegu w kolejności raportu; strony starszych przebiegów
+    zostają w bazie i w wyszukiwaniu (`search()`). Wiersze są buforowane
+    i zapisywane po `batch_size` w jednej transakcji - niezapisane trafiają
+    do bazy przy `flush()`/`close()`, a po przerwaniu odtwarza je dziennik
+    przebiegu (razem z surowym markdown i czasem pobrania). Bez FTS5 w SQLite wyszukiwanie przechodzi na LIKE.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_FILE, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Transakcje otwieramy sami - jedna na partię stron
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(SCHEMA)
+        try:
+            self._db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            print("⚠️ SQLite bez FTS5 - wyszukiwanie stron przez LIKE")
+            self.fts = False
+        self._pending = []
+        self._runs = {}
+        self._positions = {}
+        self.stats = {'pages': 0, 'transactions': 0}
+
+    def begin(self, site, start_url, resume=False):
+        """Rozpoczyna (albo z `resume` - kontynuuje) przebieg serwisu `site`"""
+        row = self._db.execute("SELECT run FROM sites WHERE name = ?", (site,)).fetchone()
+        run = 1 if row is None else row['run'] + (0 if resume else 1)
+        self._db.execute(
+            "INSERT INTO sites (name, start_url, run, updated) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET start_url = excluded.start_url, run = excluded.run, updated = excluded.updated",
+            (site, start_url, run, time.time())
+        )
+        self._runs[site] = run
+        self._positions[site] = 0
+
+    def add(self, site, url, title, depth, raw_markdown, markdown, meta=None, fetched_at=None, restored=False):
+        """Dodaje stronę na kolejnej pozycji raportu serwisu (zapis partiami)
+
+        `fetched_at` - czas pobrania (domyślnie teraz; przy wznawianiu z dziennika).
+        `restored=True` oznacza stronę odtworzoną z dziennika bez surowego
+        markdown (dziennik starszej wersji): jeśli jest już w bazie, zmienia
+        się tylko jej miejsce w raporcie.
+        """
+        position = self._positions[site]
+        self._positions[site] = position + 1
+        self._pending.append((_PLACE if restored else _UPSERT, (
+            url, site, self._runs[site], position, title or '', depth, fetched_at or time.time(),
+            content_hash(markdown), raw_markdown or '', markdown or '',
+            json.dumps(meta or {}, ensure_ascii=False)
+        )))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Zapisuje zbuforowane strony w jednej transakcji"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._db.execute("BEGIN")
+        try:
+            for statement in (_UPSERT, _PLACE):
+                rows = [row for s, row in pending if s is statement]
+                if rows:
+                    self._db.executemany(statement, rows)
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self.stats['pages'] += len(pending)
+        self.stats['transactions'] += 1
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start_url(self, site):
+        """URL startowy ostatniego przebiegu serwisu albo None"""
+        row = self._db.execute("SELECT start_url FROM sites WHERE name = ?", (site,)).fetchone()
+        return row['start_url'] if row is not None else None
+
+    def pages(self, site):
+        """Strony ostatniego przebiegu serwisu w kolejności raportu (strumieniowo, jako słowniki)"""
+        self.flush()
+        rows = self._db.execute(
+            "SELECT p.url, p.title, p.depth, p.fetched_at, p.content_hash, p.raw_markdown, p.markdown, p.meta "
+            "FROM pages p JOIN sites s ON s.name = p.site AND s.run = p.run "
+            "WHERE p.site = ? ORDER BY p.position",
+            (site,)
+        )
+        for row in rows:
+            page = dict(row)
+            page['meta'] = json.loads(page['meta'])
+            yield page
+
+    def search(self, query, limit=20, site=None):
+        """Wyszukiwanie pełnotekstowe: lista {url, title, site, snippet} od najtrafniejszych
+
+        `query` może używać składni FTS5 (AND/OR/NOT, "frazy", prefiks*);
+        tekst, który nie jest poprawnym zapytaniem, jest szukany jako zwykłe słowa.
+        """
+        self.flush()
+        if not self.fts:
+            return self._search_like(query, limit, site)
+        sql = (
+            f"SELECT p.url, p.title, p.site, snippet(pages_fts, -1, '**', '**', '…', {SNIPPET_TOKENS}) AS snippet "
+            "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid "
+            "WHERE pages_fts MATCH ?" + (" AND p.site = ?" if site else "") +
+            " ORDER BY bm25(pages_fts, 5.0, 1.0) LIMIT ?"
+        )
+        args = (site,) if site else ()
+        try:
+            rows = self._db.execute(sql, (query, *args, limit)).fetchall()
+        except sqlite3.OperationalError:
+            rows = self._db.execute(sql, (_quote_query(query), *args, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def _search_like(self, query, limit, site):
+        terms = query.split()
+        sql = (
+            "SELECT url, title, site, substr(markdown, 1, 200) AS snippet FROM pages WHERE " +
+            ' AND '.join(["(title LIKE ? OR markdown LIKE ?)"] * len(terms) or ['1']) +
+            (" AND site = ?" if site else "") + " LIMIT ?"
+        )
+        args = [f"%{term}%" for term in terms for _ in range(2)] + ([site] if site else []) + [limit]
+        return [dict(row) for row in self._db.execute(sql, args)]
+
+    def summary(self):
+        self.flush()
+        count = self._db.execute("SELECT count(*) FROM pages").fetchone()[0]
+        return (
+            f"🗄️ Baza stron: zapisano {self.stats['pages']} stron w {self.stats['transactions']} transakcjach, "
+            f"łącznie {count} stron w {self.path}"
+        )
+
+def print_search_results(results):
+    """Wypisuje wyniki PageStore.search()"""
+    if not results:
+        print("🔍 Brak wyników")
+        return
+    for i, result in enumerate(results, 1):
+        print(f"{i}. {result['title']} [{result['site']}]")
+        print(f"   {result['url']}")
+        print(f"   {' '.join(result['snippet'].split())}")
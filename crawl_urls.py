@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Kanonizacja adresów URL i zbiór odwiedzonych adresów dla crawlerów
+Różne zapisy tej samej strony (wielkość liter hosta, domyślny port, fragment,
+parametry śledzące, końcowy ukośnik) dają ten sam klucz, a zbiór odwiedzonych
+trzyma tylko skróty kluczy - opcjonalnie w filtrze Blooma o stałym rozmiarze
+"""
+
+import hashlib
+import math
+import re
+from fnmatch import translate
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+# Parametry zapytania, które nie zmieniają treści strony (śledzenie, odpowiedzi na komentarze)
+DEFAULT_DROP_PARAMS = (
+    'utm_*', 'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', 'ref', 'replytocom',
+)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+DEFAULT_BLOOM_ERROR_RATE = 0.001  # Dopuszczalny odsetek fałszywie "widzianych" adresów
+CANONICAL_CACHE_SIZE = 65536  # Zapamiętane postacie kanoniczne (menu i stopki powtarzają te same linki)
+
+@lru_cache(maxsize=64)
+def _params_regex(patterns):
+    """Jedno wyrażenie dla listy wzorców fnmatch parametrów"""
+    return re.compile('|'.join(translate(pattern) for pattern in patterns))
+
+def canonicalize_url(url, base_url=None, keep_params=None, drop_params=DEFAULT_DROP_PARAMS):
+    """Zwraca kanoniczną postać adresu http(s) albo None dla innych adresów
+
+    Względne adresy są rozwiązywane względem `base_url`. Schemat i host są
+    zamieniane na małe litery, domyślny port i fragment są usuwane, a pusta
+    ścieżka staje się "/". Z zapytania usuwane są parametry z `drop_params`
+    (wzorce fnmatch), a jeśli podano `keep_params`, zostają tylko pasujące do
+    nich; pozostałe są sortowane. Końcowy ukośnik jest zachowany, bo część
+    serwisów przekierowuje bez niego - ignoruje go dopiero `url_key()`.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if base_url and not url.startswith(('http://', 'https://')):
+        try:
+            url = urljoin(base_url, url)
+        except ValueError:
+            return None
+    keep_params = tuple(keep_params) if keep_params is not None else None
+    return _canonicalize_absolute(url, keep_params, tuple(drop_params))
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _canonicalize_absolute(url, keep_params, drop_params):
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"  # Adres IPv6
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    query = parts.query
+    if query:
+        drop = _params_regex(drop_params).match if drop_params else None
+        keep = _params_regex(keep_params).match if keep_params else None
+        params = [
+            (name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+            if not (drop and drop(name)) and (keep_params is None or (keep and keep(name)))
+        ]
+        query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def url_key(url, canonical=False):
+    """Klucz adresu do porównań: kanoniczny URL bez końcowego ukośnika w ścieżce
+
+    `canonical=True` oznacza, że `url` pochodzi już z canonicalize_url.
+    """
+    if not canonical:
+        url = canonicalize_url(url) or url
+    path_end = url.find('?')
+    if path_end < 0:
+        path_end = len(url)
+    # Ukośnik zaraz po "scheme://host" (ścieżka "/") zostaje
+    if path_end > 0 and url[path_end - 1] == '/' and url.count('/', 0, path_end) > 3:
+        return url[:path_end].rstrip('/') + url[path_end:]
+    return url
+
+def canonical_host(url):
+    """Host (bez portu) adresu zwróconego przez canonicalize_url - bez ponownego parsowania"""
+    start = url.index('//') + 2
+    host = url[start:url.index('/', start)]
+    if host.startswith('['):
+        return host[1:host.index(']')]  # Adres IPv6
+    return host.split(':', 1)[0]
+
+def same_site(host, base_host):
+    """Sprawdza, czy host należy do serwisu `base_host` (ten sam host lub jego subdomena, bez "www.")"""
+    host = (host or '').lower().removeprefix('www.')
+    base_host = (base_host or '').lower().removeprefix('www.')
+    return bool(base_host) and (host == base_host or host.endswith('.' + base_host))
+
+def _digest(key):
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+class BloomFilter:
+    """Filtr Blooma o rozmiarze dobranym do liczby elementów i odsetka błędów
+
+    Nigdy nie zgłasza brakującego elementu, który został dodany; z
+    prawdopodobieństwem `error_rate` uznaje za obecny element niedodany.
+    Pamięć jest stała (ok. 1,8 B na element przy 0,1% błędów).
+    """
+
+    def __init__(self, capacity, error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest):
+        # Podwójne haszowanie: k pozycji z dwóch połówek jednego skrótu
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, digest):
+        """Dodaje skrót; zwraca True, jeśli wcześniej go nie było"""
+        added = False
+        bits = self._bits
+        for position in self._positions(digest):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                added = True
+        return added
+
+    def __contains__(self, digest):
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(digest))
+
+class VisitedSet:
+    """Zbiór odwiedzonych adresów kluczowany `url_key()`
+
+    Przechowuje 64-bitowe skróty kluczy zamiast napisów. Z `bloom_capacity`
+    używa filtra Blooma o stałej pamięci - przy większej liczbie adresów niż
+    `bloom_capacity` rośnie tylko odsetek adresów błędnie uznanych za widziane.
+    """
+
+    def __init__(self, bloom_capacity=None, error_rate=DEFAULT_BLOOM_ERROR_RATE):
+        self._bloom = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else None
+        self._hashes = set() if self._bloom is None else None
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, url):
+        return self.has(self.fingerprint(url))
+
+    @staticmethod
+    def fingerprint(url):
+        """Skrót klucza adresu - pozwala policzyć go raz przy sprawdzeniu i dodaniu"""
+        return _digest(url_key(url))
+
+    def has(self, fingerprint):
+        if self._bloom is not None:
+            return fingerprint in self._bloom
+        return int.from_bytes(fingerprint[:8], 'little') in self._hashes
+
+    def add(self, url):
+        """Dodaje adres; zwraca True, jeśli nie był jeszcze widziany"""
+        return self.add_fingerprint(self.fingerprint(url))
+
+    def add_fingerprint(self, fingerprint):
+        if self._bloom is not None:
+            added = self._bloom.add(fingerprint)
+        else:
+            value = int.from_bytes(fingerprint[:8], 'little')
+            added = value not in self._hashes
+            if added:
+                self._hashes.add(value)
+        if added:
+            self.count += 1
+        return added
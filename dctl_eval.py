@@ -0,0 +1,1279 @@
+#!/usr/bin/env python3
+"""
+Wektorowy interpreter DCTL na NumPy - pieczenie LUT-ów 3D i podgląd bez Resolve
+Funkcja `transform(...)` z plików .dctl (podzbiór: funkcje __DEVICE__,
+float/int/bool/float3, if/else, ?:, switch, pętle, _powf, _expf, _tanhf,
+_fabs i inne funkcje wbudowane) jest wykonywana naraz dla całych tablic
+pikseli. Parametry DEFINE_UI_PARAMS mają wartości domyślne z pliku (albo
+podane), a wynik to LUT .cube (33³ lub 65³) lub przetworzony obraz testowy
+"""
+
+import argparse
+import math
+import re
+import time
+
+import numpy as np
+
+DEFAULT_LUT_SIZE = 33  # Rozmiar LUT-a (33 lub 65 węzłów na kanał)
+DEFAULT_IMAGE_SIZE = (1920, 1080)  # Obraz testowy (szerokość, wysokość)
+MAX_LOOP_WORK = 10**8  # Limit kosztu pętli: suma aktywnych pikseli po wszystkich iteracjach (kilka sekund pracy NumPy)
+MAX_LOOP_ITERATIONS = 10**6  # Zabezpieczenie przed pętlą nieskończoną przy niewielu pikselach (koszt ogranicza MAX_LOOP_WORK)
+MAX_CALL_DEPTH = 64  # Limit zagłębienia wywołań funkcji __DEVICE__
+CHECK_TOLERANCE = 1e-4  # Dopuszczalna różnica względem LUT-a wzorcowego (--check)
+
+class DctlError(ValueError):
+    """Konstrukcja DCTL spoza obsługiwanego podzbioru albo błąd składni"""
+
+    def __init__(self, message, line=None):
+        super().__init__(f"linia {line}: {message}" if line else message)
+        self.line = line
+
+# =============================================================================
+# Leksykalnie: tokeny, parametry UI i proste makra
+# =============================================================================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<number>0[xX][0-9a-fA-F]+[uU]?|(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?[fFuU]?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\+\+|--|\+=|-=|\*=|/=|%=|&=|\|=|\^=|<<=|>>=|==|!=|<=|>=|&&|\|\||<<|>>|->|[-+*/%<>=!?:;,.(){}\[\]&|^~])
+""", re.S | re.X)
+
+_UI_PARAMS_RE = re.compile(r'\bDEFINE_UI_PARAMS\s*\(')
+_DEFINE_RE = re.compile(r'^[ \t]*#[ \t]*define[ \t]+(\w+)(\([^)]*\))?[ \t]*(.*)$', re.M)
+_DIRECTIVE_RE = re.compile(r'^[ \t]*#.*$', re.M)
+
+TYPES = {
+    'float': 'float', 'double': 'float', 'half': 'float', 'int': 'int', 'uint': 'int', 'unsigned': 'int',
+    'short': 'int', 'long': 'int', 'char': 'int', 'bool': 'bool', 'float2': 'float2', 'float3': 'float3',
+    'float4': 'float4', 'void': 'void',
+}
+_QUALIFIERS = frozenset(('const', 'static', 'inline', '__CONSTANT__', '__DEVICE__', 'signed', 'unsigned'))
+_VECTOR_SIZES = {'float2': 2, 'float3': 3, 'float4': 4}
+_COMPONENTS = {'x': 0, 'y': 1, 'z': 2, 'w': 3}
+
+class UiParam:
+    """Parametr z DEFINE_UI_PARAMS: nazwa, etykieta, rodzaj kontrolki i wartość domyślna"""
+
+    __slots__ = ('name', 'label', 'widget', 'default', 'minimum', 'maximum', 'step', 'options')
+
+    def __init__(self, name, label, widget, default, minimum=None, maximum=None, step=None, options=()):
+        self.name = name
+        self.label = label
+        self.widget = widget
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.options = options  # Nazwy wartości listy wyboru (DCTLUI_COMBO_BOX)
+
+    @property
+    def is_int(self):
+        return 'INT' in self.widget or self.widget in ('DCTLUI_COMBO_BOX', 'DCTLUI_CHECK_BOX')
+
+    def value(self, value):
+        """Wartość parametru w typie kontrolki; nazwa opcji listy wyboru zamieniana jest na jej numer"""
+        if isinstance(value, str):
+            if value in self.options:
+                return self.options.index(value)
+            value = float(value)
+        return int(value) if self.is_int else np.float32(value)
+
+    def __repr__(self):
+        return f"UiParam({self.name!r}, {self.widget}, default={self.default!r})"
+
+def _split_args(text):
+    """Dzieli argumenty po przecinkach najwyższego poziomu (poza nawiasami i klamrami)"""
+    args = []
+    depth = 0
+    current = []
+    for char in text:
+        if char in '({[':
+            depth += 1
+        elif char in ')}]':
+            depth -= 1
+        if char == ',' and depth == 0:
+            args.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    args.append(''.join(current).strip())
+    return args
+
+def _number(text):
+    text = text.strip().rstrip('fFuU')
+    return float(text) if any(c in text for c in '.eE') and not text.lower().startswith('0x') else int(text, 0)
+
+def parse_ui_params(source):
+    """Wyciąga DEFINE_UI_PARAMS ze źródła: (źródło bez nich, lista UiParam)
+
+    Wycięte wywołania są zastępowane pustymi liniami, więc numery linii
+    w komunikatach błędów zgadzają się z plikiem.
+    """
+    params = []
+    pieces = []
+    position = 0
+    for match in _UI_PARAMS_RE.finditer(source):
+        if match.start() < position:
+            continue
+        depth = 1
+        end = match.end()
+        while depth and end < len(source):
+            depth += {'(': 1, ')': -1}.get(source[end], 0)
+            end += 1
+        line = source.count('\n', 0, match.start()) + 1
+        args = _split_args(source[match.end():end - 1])
+        if len(args) < 4:
+            raise DctlError("DEFINE_UI_PARAMS wymaga co najmniej 4 argumentów", line)
+        name, label, widget = args[0], args[1], args[2]
+        try:
+            if widget == 'DCTLUI_COMBO_BOX':
+                options = tuple(option.strip() for option in args[4].strip('{} ').split(',')) if len(args) > 4 else ()
+                param = UiParam(name, label, widget, int(_number(args[3])), options=options)
+            else:
+                numbers = [_number(arg) for arg in args[3:7]]
+                param = UiParam(name, label, widget, *numbers)
+        except (ValueError, IndexError):
+            raise DctlError(f"nieprawidłowe DEFINE_UI_PARAMS({', '.join(args)})", line) from None
+        param.default = param.value(param.default)
+        params.append(param)
+        pieces.append(source[position:match.start()])
+        pieces.append('\n' * source.count('\n', match.start(), end))
+        position = end
+    pieces.append(source[position:])
+    return ''.join(pieces), params
+
+def tokenize(source):
+    """Tokeny (rodzaj, tekst, linia) z rozwiniętymi makrami obiektowymi #define"""
+    macros = {}
+    for match in _DEFINE_RE.finditer(source):
+        if match.group(2):
+            line = source.count('\n', 0, match.start()) + 1
+            raise DctlError(f"makra z argumentami nie są obsługiwane ({match.group(1)})", line)
+        macros[match.group(1)] = match.group(3)
+    source = _DIRECTIVE_RE.sub('', source)
+
+    tokens = []
+    line = 1
+    position = 0
+    while position < len(source):
+        match = _TOKEN_RE.match(source, position)
+        if match is None:
+            raise DctlError(f"nieoczekiwany znak {source[position]!r}", line)
+        kind = match.lastgroup
+        text = match.group()
+        if kind != 'space':
+            if kind == 'name' and text in macros:
+                tokens.extend((k, t, line) for k, t, _ in tokenize(macros[text]))
+            else:
+                tokens.append((kind, text, line))
+        line += text.count('\n')
+        position = match.end()
+    return tokens
+
+# =============================================================================
+# Składnia: drzewo z krotek
+# =============================================================================
+
+_BINARY_PRECEDENCE = [
+    ('||',), ('&&',), ('|',), ('^',), ('&',), ('==', '!='), ('<', '>', '<=', '>='), ('<<', '>>'), ('+', '-'),
+    ('*', '/', '%'),
+]
+_ASSIGN_OPS = frozenset(('=', '+=', '-=', '*=', '/=', '%=', '&=', '|=', '^=', '<<=', '>>='))
+
+class Function:
+    """Funkcja __DEVICE__: typ wyniku, parametry [(typ, nazwa)] i ciało"""
+
+    __slots__ = ('name', 'rtype', 'params', 'body', 'line')
+
+    def __init__(self, name, rtype, params, body, line):
+        self.name = name
+        self.rtype = rtype
+        self.params = params
+        self.body = body
+        self.line = line
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.functions = {}
+        self.constants = []  # Deklaracje __CONSTANT__ i zmiennych globalnych: ('decl', ...)
+
+    # --- tokeny
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else ('eof', '', self.tokens[-1][2] if self.tokens else 0)
+
+    @property
+    def line(self):
+        return self.peek()[2]
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def accept(self, text):
+        if self.peek()[1] == text and self.peek()[0] != 'eof':
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, text):
+        token = self.next()
+        if token[1] != text:
+            raise DctlError(f"oczekiwano {text!r}, jest {token[1]!r}", token[2])
+        return token
+
+    def name(self):
+        token = self.next()
+        if token[0] != 'name':
+            raise DctlError(f"oczekiwano nazwy, jest {token[1]!r}", token[2])
+        return token[1]
+
+    def at_type(self, offset=0):
+        """Czy od tokenu zaczyna się typ (z kwalifikatorami)"""
+        while self.peek(offset)[1] in _QUALIFIERS:
+            offset += 1
+        return self.peek(offset)[1] in TYPES
+
+    def type(self):
+        while self.peek()[1] in _QUALIFIERS:
+            qualifier = self.next()[1]
+            if qualifier == 'unsigned' and self.peek()[1] not in TYPES:
+                return 'int'  # "unsigned" bez typu
+        token = self.next()
+        if token[1] not in TYPES:
+            raise DctlError(f"nieobsługiwany typ {token[1]!r}", token[2])
+        while self.peek()[1] in ('int', 'long'):  # long int, long long...
+            self.next()
+        return TYPES[token[1]]
+
+    # --- poziom pliku
+
+    def program(self):
+        while self.peek()[0] != 'eof':
+            line = self.line
+            if self.peek()[1] in ('typedef', 'struct', 'enum', 'union'):
+                raise DctlError("struktury i typedef nie są obsługiwane", line)
+            if self.peek()[1] in ('DEFINE_LUT', 'DEFINE_CUBE_LUT'):
+                raise DctlError("LUT-y w DCTL (DEFINE_LUT) nie są obsługiwane", line)
+            if self.accept(';'):
+                continue
+            device = self.peek()[1] == '__DEVICE__'
+            rtype = self.type()
+            name = self.name()
+            if self.peek()[1] == '(' and device:
+                self.next()
+                params = self.params()
+                if self.accept(';'):
+                    continue  # Deklaracja zapowiadająca
+                self.functions[name] = Function(name, rtype, params, self.block(), line)
+            else:
+                self.constants.append(self.declarators(rtype, name, line))
+        if 'transform' not in self.functions:
+            raise DctlError("brak funkcji transform(...)")
+        return self.functions, self.constants
+
+    def params(self):
+        params = []
+        if self.accept(')'):
+            return params
+        while True:
+            if self.peek()[1] == '__TEXTURE__':
+                raise DctlError("transform z teksturami (__TEXTURE__) nie jest obsługiwany - tylko przekształcenia "
+                                "piksel po pikselu", self.line)
+            ptype = self.type()
+            self.accept('&')
+            params.append((ptype, self.name()))
+            if self.accept(')'):
+                return params
+            self.expect(',')
+
+    # --- instrukcje
+
+    def block(self):
+        self.expect('{')
+        statements = []
+        while not self.accept('}'):
+            if self.peek()[0] == 'eof':
+                raise DctlError("niedomknięty blok", self.line)
+            statements.append(self.statement())
+        return ('block', statements)
+
+    def declarators(self, dtype, name, line):
+        """Deklaracja po typie i pierwszej nazwie: ('decl', typ, [(nazwa, rozmiar tablicy, inicjalizator)])"""
+        items = []
+        while True:
+            size = None
+            if self.accept('['):
+                size = None if self.peek()[1] == ']' else self.expression()
+                self.expect(']')
+            init = None
+            if self.accept('='):
+                init = self.initializer()
+            items.append((name, size, init))
+            if self.accept(';'):
+                return ('decl', dtype, items, line)
+            self.expect(',')
+            name = self.name()
+
+    def initializer(self):
+        if self.peek()[1] == '{':
+            line = self.next()[2]
+            values = []
+            while not self.accept('}'):
+                values.append(self.initializer())
+                if not self.accept(','):
+                    self.expect('}')
+                    break
+            return ('init', values, line)
+        return self.assignment()
+
+    def statement(self):
+        token = self.peek()
+        word, line = token[1], token[2]
+        if token[0] == 'eof':
+            raise DctlError("nieoczekiwany koniec pliku", line)
+        if word == '{' and token[0] == 'op':
+            return self.block()
+        if word == ';':
+            self.next()
+            return ('block', [])
+        if word == 'if':
+            self.next()
+            self.expect('(')
+            condition = self.expression()
+            self.expect(')')
+            then = self.statement()
+            other = self.statement() if self.accept('else') else None
+            return ('if', condition, then, other, line)
+        if word == 'for':
+            self.next()
+            self.expect('(')
+            if self.accept(';'):
+                init = None
+            elif self.at_type():
+                dtype = self.type()
+                init = self.declarators(dtype, self.name(), line)
+            else:
+                init = ('expr', self.expression(), line)
+                self.expect(';')
+            condition = None if self.peek()[1] == ';' else self.expression()
+            self.expect(';')
+            step = None if self.peek()[1] == ')' else self.expression()
+            self.expect(')')
+            return ('for', init, condition, step, self.statement(), line)
+        if word == 'while':
+            self.next()
+            self.expect('(')
+            condition = self.expression()
+            self.expect(')')
+            return ('for', None, condition, None, self.statement(), line)
+        if word == 'do':
+            self.next()
+            body = self.statement()
+            self.expect('while')
+            self.expect('(')
+            condition = self.expression()
+            self.expect(')')
+            self.expect(';')
+            return ('do', body, condition, line)
+        if word == 'switch':
+            self.next()
+            self.expect('(')
+            value = self.expression()
+            self.expect(')')
+            self.expect('{')
+            items = []
+            while not self.accept('}'):
+                if self.accept('case'):
+                    items.append(('case', self.ternary()))
+                    self.expect(':')
+                elif self.accept('default'):
+                    self.expect(':')
+                    items.append(('default',))
+                else:
+                    items.append(self.statement())
+            return ('switch', value, items, line)
+        if word in ('break', 'continue'):
+            self.next()
+            self.expect(';')
+            return (word, line)
+        if word == 'return':
+            self.next()
+            value = None if self.peek()[1] == ';' else self.expression()
+            self.expect(';')
+            return ('return', value, line)
+        if self.at_type() and not (self.peek(1)[1] == '(' and word in TYPES):
+            dtype = self.type()
+            return self.declarators(dtype, self.name(), line)
+        expression = self.expression()
+        self.expect(';')
+        return ('expr', expression, line)
+
+    # --- wyrażenia
+
+    def expression(self):
+        expression = self.assignment()
+        while self.accept(','):
+            expression = ('comma', expression, self.assignment())
+        return expression
+
+    def assignment(self):
+        target = self.ternary()
+        token = self.peek()
+        if token[0] == 'op' and token[1] in _ASSIGN_OPS:
+            self.next()
+            if target[0] not in ('var', 'member', 'index'):
+                raise DctlError("przypisanie do wyrażenia", token[2])
+            return ('assign', token[1], target, self.assignment(), token[2])
+        return target
+
+    def ternary(self):
+        condition = self.binary(0)
+        if self.accept('?'):
+            then = self.assignment()
+            self.expect(':')
+            return ('ternary', condition, then, self.assignment())
+        return condition
+
+    def binary(self, level):
+        if level == len(_BINARY_PRECEDENCE):
+            return self.unary()
+        left = self.binary(level + 1)
+        while self.peek()[0] == 'op' and self.peek()[1] in _BINARY_PRECEDENCE[level]:
+            op = self.next()[1]
+            left = ('binary', op, left, self.binary(level + 1))
+        return left
+
+    def unary(self):
+        token = self.peek()
+        if token[0] == 'op' and token[1] in ('-', '+', '!', '~'):
+            self.next()
+            return ('unary', token[1], self.unary())
+        if token[0] == 'op' and token[1] in ('++', '--'):
+            self.next()
+            return ('incdec', token[1], self.unary(), True, token[2])
+        if token[1] == '(' and self.at_type(1):
+            # Rzutowanie (float)x albo (float3){...}
+            self.next()
+            ctype = self.type()
+            self.expect(')')
+            if self.peek()[1] == '{':
+                return ('cast', ctype, self.initializer())
+            return ('cast', ctype, self.unary())
+        return self.postfix(self.primary())
+
+    def postfix(self, expression):
+        while True:
+            token = self.peek()
+            if token[1] == '.' or token[1] == '->':
+                self.next()
+                expression = ('member', expression, self.name(), token[2])
+            elif token[1] == '[':
+                self.next()
+                index = self.expression()
+                self.expect(']')
+                expression = ('index', expression, index, token[2])
+            elif token[1] in ('++', '--') and token[0] == 'op':
+                self.next()
+                expression = ('incdec', token[1], expression, False, token[2])
+            else:
+                return expression
+
+    def primary(self):
+        kind, text, line = self.next()
+        if kind == 'number':
+            value = _number(text)
+            if isinstance(value, float) or text[-1] in 'fF' and not text.lower().startswith('0x'):
+                return ('const', np.float32(value))
+            return ('const', value)
+        if kind == 'name':
+            if text in ('true', 'false'):
+                return ('const', text == 'true')
+            if self.peek()[1] == '(':
+                self.next()
+                args = []
+                if not self.accept(')'):
+                    while True:
+                        args.append(self.assignment())
+                        if self.accept(')'):
+                            break
+                        self.expect(',')
+                return ('call', text, args, line)
+            return ('var', text, line)
+        if text == '(':
+            expression = self.expression()
+            self.expect(')')
+            return expression
+        raise DctlError(f"nieoczekiwany token {text!r}", line)
+
+# =============================================================================
+# Wartości: skalary i tablice NumPy (jeden element na piksel), wektory floatN
+# =============================================================================
+
+class Vector:
+    """Wartość float2/float3/float4 - krotka składowych (skalarów lub tablic)"""
+
+    __slots__ = ('c',)
+
+    def __init__(self, components):
+        self.c = tuple(components)
+
+    def __repr__(self):
+        return f"Vector{self.c!r}"
+
+def _vectorize(function):
+    """Funkcja działająca na składowych, gdy któryś argument jest wektorem"""
+    def apply(*args):
+        size = next((len(a.c) for a in args if isinstance(a, Vector)), None)
+        if size is None:
+            return function(*args)
+        return Vector(function(*(a.c[i] if isinstance(a, Vector) else a for a in args)) for i in range(size))
+    return apply
+
+def _is_int(value):
+    if isinstance(value, (bool, np.bool_)):
+        return True
+    if isinstance(value, (int, np.integer)):
+        return True
+    return isinstance(value, np.ndarray) and value.dtype.kind in 'iub'
+
+def _to_float(value):
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32, copy=False)
+    return np.float32(value)
+
+def _to_int(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'iu':
+            return value
+        if value.dtype.kind == 'b':
+            return value.astype(np.int32)
+        return np.nan_to_num(np.trunc(value)).astype(np.int32)
+    value = float(value)
+    return int(value) if math.isfinite(value) else 0
+
+def _to_bool(value):
+    if isinstance(value, np.ndarray):
+        return value != 0
+    return bool(value)
+
+def convert(value, dtype, line=None):
+    """Zamienia wartość na typ DCTL (float/int/bool/floatN) jak przypisanie w C"""
+    if dtype in _VECTOR_SIZES:
+        if isinstance(value, Vector):
+            if len(value.c) != _VECTOR_SIZES[dtype]:
+                raise DctlError(f"nie można przypisać wektora {len(value.c)}-elementowego do {dtype}", line)
+            return Vector(_to_float(c) for c in value.c)
+        # Skalar rozszerzany na wszystkie składowe (jak make_floatN(x, x, x))
+        return Vector((_to_float(value),) * _VECTOR_SIZES[dtype])
+    if isinstance(value, Vector):
+        raise DctlError(f"nie można przypisać wektora do {dtype}", line)
+    if dtype == 'float':
+        return _to_float(value)
+    if dtype == 'int':
+        return _to_int(value)
+    if dtype == 'bool':
+        return _to_bool(value)
+    return value
+
+def _select(mask, new, old):
+    """Wartość `new` na pikselach z maską, `old` na pozostałych"""
+    if mask is True:
+        return new
+    if isinstance(new, Vector) or isinstance(old, Vector):
+        size = len((new if isinstance(new, Vector) else old).c)
+        new_c = new.c if isinstance(new, Vector) else (new,) * size
+        old_c = old.c if isinstance(old, Vector) else (old,) * size
+        return Vector(np.where(mask, n, o) for n, o in zip(new_c, old_c))
+    result = np.where(mask, new, old)
+    return result
+
+def _pick(values, index):
+    """Elementy tablicy dla indeksu per piksel (indeksy spoza tablicy są przycinane)"""
+    if isinstance(values[0], Vector):
+        return Vector(_pick([value.c[i] for value in values], index) for i in range(len(values[0].c)))
+    index = np.clip(_to_int(index), 0, len(values) - 1)
+    if not any(isinstance(value, np.ndarray) for value in values):
+        return np.asarray(values)[index]
+    arrays = np.broadcast_arrays(index, *values)
+    return np.take_along_axis(np.stack(arrays[1:]), arrays[0][np.newaxis], axis=0)[0]
+
+def _and(a, b):
+    if a is True:
+        return b
+    if b is True:
+        return a
+    if a is False or b is False:
+        return False
+    return np.logical_and(a, b)
+
+def _or(a, b):
+    if a is False:
+        return b
+    if b is False:
+        return a
+    if a is True or b is True:
+        return True
+    return np.logical_or(a, b)
+
+def _not(a):
+    if a is True:
+        return False
+    if a is False:
+        return True
+    return np.logical_not(a)
+
+def _alive(mask):
+    return mask is True or (mask is not False and bool(np.any(mask)))
+
+def _condition(value, line=None):
+    """Warunek: Python bool dla wartości jednolitej, tablica bool dla wartości per piksel"""
+    if isinstance(value, Vector):
+        raise DctlError("wektor w warunku", line)
+    if isinstance(value, np.ndarray):
+        return value != 0
+    return bool(value)
+
+def _divide(a, b):
+    if _is_int(a) and _is_int(b):
+        # Dzielenie całkowite w C obcina w stronę zera
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            return np.trunc(np.true_divide(a, np.where(b == 0, 1, b))).astype(np.int32)
+        return int(a / b) if b else 0
+    return np.true_divide(_to_float(a), b) if not isinstance(a, np.ndarray) else np.true_divide(a, b)
+
+def _modulo(a, b):
+    if _is_int(a) and _is_int(b):
+        if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+            return np.fmod(a, np.where(b == 0, 1, b))
+        return int(math.fmod(a, b)) if b else 0
+    return np.fmod(a, b)
+
+_BINARY = {
+    '+': _vectorize(lambda a, b: a + b),
+    '-': _vectorize(lambda a, b: a - b),
+    '*': _vectorize(lambda a, b: a * b),
+    '/': _vectorize(_divide),
+    '%': _modulo,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '&': lambda a, b: np.bitwise_and(_to_int(a), _to_int(b)),
+    '|': lambda a, b: np.bitwise_or(_to_int(a), _to_int(b)),
+    '^': lambda a, b: np.bitwise_xor(_to_int(a), _to_int(b)),
+    '<<': lambda a, b: np.left_shift(_to_int(a), _to_int(b)),
+    '>>': lambda a, b: np.right_shift(_to_int(a), _to_int(b)),
+}
+
+def _round(x):
+    # Zaokrąglenie w C: połówki od zera (np.round zaokrągla do parzystej)
+    return np.trunc(x + np.copysign(np.float32(0.5), x))
+
+def _float_function(function):
+    return _vectorize(lambda *args: function(*(_to_float(a) for a in args)))
+
+BUILTINS = {name: _float_function(function) for name, function in {
+    '_powf': np.power, '_pow': np.power, '_expf': np.exp, '_exp2f': np.exp2,
+    '_exp10f': lambda x: np.power(np.float32(10), x), '_logf': np.log, '_log2f': np.log2, '_log10f': np.log10,
+    '_sqrtf': np.sqrt, '_rsqrtf': lambda x: 1 / np.sqrt(x), '_cbrtf': np.cbrt, '_fabs': np.abs, '_fabsf': np.abs,
+    '_floor': np.floor, '_floorf': np.floor, '_ceil': np.ceil, '_ceilf': np.ceil, '_round': _round,
+    '_roundf': _round, '_truncf': np.trunc, '_rintf': np.rint, '_fmod': np.fmod, '_fmodf': np.fmod,
+    '_fmaxf': np.maximum, '_fminf': np.minimum, '_copysignf': np.copysign, '_hypotf': np.hypot,
+    '_sinf': np.sin, '_cosf': np.cos, '_tanf': np.tan, '_asinf': np.arcsin, '_acosf': np.arccos,
+    '_atanf': np.arctan, '_atan2f': np.arctan2, '_sinhf': np.sinh, '_coshf': np.cosh, '_tanhf': np.tanh,
+    '_asinhf': np.arcsinh, '_acoshf': np.arccosh, '_atanhf': np.arctanh, '_fdividef': np.true_divide,
+    '_fmaf': lambda a, b, c: a * b + c, '_clampf': lambda x, lo, hi: np.minimum(np.maximum(x, lo), hi),
+    '_saturatef': lambda x: np.minimum(np.maximum(x, np.float32(0)), np.float32(1)),
+    '_mix': lambda a, b, t: a + (b - a) * t, '_ldexpf': lambda x, e: x * np.exp2(e),
+}.items()}
+BUILTINS.update({
+    '_fmax': BUILTINS['_fmaxf'], '_fmin': BUILTINS['_fminf'], '_clamp': BUILTINS['_clampf'],
+    '_isnan': _vectorize(np.isnan), '_isinf': _vectorize(np.isinf),
+    '_min': _vectorize(np.minimum), '_max': _vectorize(np.maximum), '_abs': _vectorize(np.abs),
+    'make_float2': lambda x, y: Vector((_to_float(x), _to_float(y))),
+    'make_float3': lambda x, y, z: Vector((_to_float(x), _to_float(y), _to_float(z))),
+    'make_float4': lambda x, y, z, w: Vector((_to_float(x), _to_float(y), _to_float(z), _to_float(w))),
+})
+
+# =============================================================================
+# Wykonanie z maskami: gałęzie zależne od piksela działają na podzbiorze pikseli
+# =============================================================================
+
+class _Frame:
+    """Stan wywołania funkcji: wynik, maska pikseli po return i stos pętli/switch"""
+
+    __slots__ = ('rtype', 'result', 'returned', 'loops')
+
+    def __init__(self, rtype):
+        self.rtype = rtype
+        self.result = None
+        self.returned = False
+        self.loops = []  # Dla każdej pętli/switch: [maska po break, maska po continue]
+
+    def live(self, mask):
+        mask = _and(mask, _not(self.returned))
+        if self.loops:
+            broken, continued = self.loops[-1]  # W switch continue = None
+            mask = _and(mask, _not(_or(broken, False if continued is None else continued)))
+        return mask if _alive(mask) else None
+
+class _Scope:
+    __slots__ = ('names', 'parent')
+
+    def __init__(self, parent=None):
+        self.names = {}
+        self.parent = parent
+
+    def find(self, name):
+        scope = self
+        while scope is not None:
+            if name in scope.names:
+                return scope.names
+            scope = scope.parent
+        return None
+
+class DctlKernel:
+    """Skompilowany plik DCTL wykonywany na tablicach NumPy
+
+    `params` to parametry DEFINE_UI_PARAMS (nazwa → UiParam). Wywołanie
+    `kernel(r, g, b, ...)` wykonuje transform dla wszystkich pikseli naraz:
+    warunki zależne tylko od parametrów wybierają jedną gałąź, a zależne od
+    piksela wykonują obie gałęzie na rozłącznych maskach pikseli.
+    """
+
+    def __init__(self, source, name='<dctl>'):
+        self.name = name
+        source, params = parse_ui_params(source)
+        self.params = {param.name: param for param in params}
+        self.functions, self.constants = _Parser(tokenize(source)).program()
+        transform = self.functions['transform']
+        names = [pname for _, pname in transform.params]
+        if len(names) != 7 or transform.rtype != 'float3':
+            raise DctlError("transform musi mieć postać float3 transform(int p_Width, int p_Height, int p_X, "
+                            "int p_Y, float p_R, float p_G, float p_B)", transform.line)
+        self._depth = 0
+        self._iterations = 0
+        self._work = 0
+        self._lanes = 1
+
+    def _globals(self, params):
+        scope = _Scope()
+        for param in self.params.values():
+            value = param.default if params is None or param.name not in params else param.value(params[param.name])
+            scope.names[param.name] = ('int' if param.is_int else 'float', value)
+            for number, option in enumerate(param.options):
+                scope.names[option] = ('int', number)
+        frame = _Frame('void')
+        for declaration in self.constants:
+            self._statement(declaration, scope, True, frame)
+        return scope
+
+    def __call__(self, r, g, b, x=0, y=0, width=1, height=1, params=None):
+        """Wykonuje transform; zwraca tablice (r, g, b) w kształcie wejścia"""
+        r = np.asarray(r, dtype=np.float32)
+        g = np.asarray(g, dtype=np.float32)
+        b = np.asarray(b, dtype=np.float32)
+        unknown = set(params or ()) - set(self.params)
+        if unknown:
+            raise DctlError(f"nieznane parametry: {', '.join(sorted(unknown))} (dostępne: {', '.join(self.params)})")
+        shape = np.broadcast_shapes(r.shape, g.shape, b.shape)
+        with np.errstate(all='ignore'):
+            scope = self._globals(params)
+            self._iterations = 0
+            self._work = 0
+            self._lanes = max(1, math.prod(np.broadcast_shapes(shape, np.shape(x), np.shape(y))))
+            result = self._call(self.functions['transform'], [width, height, x, y, r, g, b], scope)
+        return tuple(np.broadcast_to(_to_float(c), shape).astype(np.float32) for c in result.c)
+
+    # --- funkcje
+
+    def _call(self, function, args, globals_scope, line=None):
+        if len(args) != len(function.params):
+            raise DctlError(f"{function.name}() oczekuje {len(function.params)} argumentów, podano {len(args)}", line)
+        self._depth += 1
+        if self._depth > MAX_CALL_DEPTH:
+            raise DctlError(f"zbyt głęboka rekurencja w {function.name}()", line)
+        try:
+            scope = _Scope(globals_scope)
+            for (ptype, pname), value in zip(function.params, args):
+                scope.names[pname] = (ptype, convert(value, ptype, line))
+            frame = _Frame(function.rtype)
+            self._statement(function.body, scope, True, frame)
+        finally:
+            self._depth -= 1
+        if function.rtype != 'void' and frame.result is None:
+            raise DctlError(f"{function.name}() nie zwraca wartości", function.line)
+        return frame.result
+
+    def _root(self, scope):
+        while scope.parent is not None:
+            scope = scope.parent
+        return scope
+
+    # --- instrukcje
+
+    def _statement(self, statement, scope, mask, frame):
+        mask = frame.live(mask)
+        if mask is None:
+            return
+        kind = statement[0]
+
+        if kind == 'block':
+            inner = _Scope(scope)
+            for item in statement[1]:
+                self._statement(item, inner, mask, frame)
+                if frame.live(mask) is None:
+                    break
+        elif kind == 'expr':
+            self._expression(statement[1], scope, mask, frame)
+        elif kind == 'decl':
+            _, dtype, items, line = statement
+            for name, size, init in items:
+                self._declare(dtype, name, size, init, scope, mask, frame, line)
+        elif kind == 'if':
+            _, condition, then, other, line = statement
+            test = _condition(self._expression(condition, scope, mask, frame), line)
+            then_mask = _and(mask, test)
+            other_mask = _and(mask, _not(test))
+            if _alive(then_mask):
+                self._statement(then, scope, then_mask, frame)
+            if other is not None and _alive(other_mask):
+                self._statement(other, scope, other_mask, frame)
+        elif kind == 'for':
+            self._loop(statement, scope, mask, frame)
+        elif kind == 'do':
+            _, body, condition, line = statement
+            self._loop(('for', None, condition, None, body, line), scope, mask, frame, first=True)
+        elif kind == 'switch':
+            self._switch(statement, scope, mask, frame)
+        elif kind == 'return':
+            _, value, line = statement
+            if value is None:
+                frame.returned = _or(frame.returned, mask)
+                return
+            result = convert(self._expression(value, scope, mask, frame), frame.rtype, line)
+            frame.result = result if frame.result is None else _select(mask, result, frame.result)
+            frame.returned = _or(frame.returned, mask)
+        elif kind in ('break', 'continue'):
+            if not frame.loops:
+                raise DctlError(f"{kind} poza pętlą", statement[1])
+            state = frame.loops[-1]
+            if kind == 'continue' and state[1] is None:
+                raise DctlError("continue wewnątrz switch nie jest obsługiwane", statement[1])
+            index = 0 if kind == 'break' else 1
+            state[index] = _or(state[index], mask)
+        else:
+            raise DctlError(f"nieobsługiwana instrukcja {kind}")
+
+    def _declare(self, dtype, name, size, init, scope, mask, frame, line):
+        if size is not None or (init is not None and init[0] == 'init' and dtype not in _VECTOR_SIZES):
+            # Tablica: lista wartości (indeks jednolity lub per piksel)
+            values = [] if init is None else [
+                convert(self._initializer(value, dtype, scope, mask, frame), dtype, line) for value in init[1]
+            ]
+            length = _to_int(self._expression(size, scope, mask, frame)) if size is not None else len(values)
+            values += [convert(0, dtype)] * (length - len(values))
+            scope.names[name] = (dtype + '[]', values)
+            return
+        # Zmienna istnieje już w swoim inicjalizatorze (float s = ... ? s = 0.0f : ...)
+        scope.names[name] = (dtype, convert(0, dtype) if dtype != 'void' else None)
+        if init is not None:
+            value = self._initializer(init, dtype, scope, mask, frame)
+            scope.names[name] = (dtype, convert(value, dtype, line))
+
+    def _initializer(self, init, dtype, scope, mask, frame):
+        if init[0] == 'init':
+            values = [self._initializer(value, 'float', scope, mask, frame) for value in init[1]]
+            if dtype in _VECTOR_SIZES:
+                values += [np.float32(0)] * (_VECTOR_SIZES[dtype] - len(values))
+                return Vector(_to_float(v) for v in values)
+            raise DctlError("lista inicjalizacyjna dla typu skalarnego", init[2])
+        return self._expression(init, scope, mask, frame)
+
+    def _loop(self, statement, scope, mask, frame, first=False):
+        _, init, condition, step, body, line = statement
+        scope = _Scope(scope)
+        if init is not None:
+            self._statement(init, scope, mask, frame)
+        active = mask
+        state = [False, False]
+        frame.loops.append(state)
+        try:
+            while True:
+                if not first and condition is not None:
+                    test = _condition(self._expression(condition, scope, active, frame), line)
+                    active = _and(active, test)
+                first = False
+                state[1] = False
+                if frame.live(active) is None:
+                    return
+                self._count_iteration(active, line)
+                self._statement(body, scope, active, frame)
+                state[1] = False
+                active = _and(active, _not(state[0]))
+                if frame.live(active) is None:
+                    return
+                if step is not None:
+                    self._expression(step, scope, frame.live(active), frame)
+        finally:
+            frame.loops.pop()
+
+    def _count_iteration(self, active, line):
+        """Liczy iterację pętli i jej pracę (aktywne piksele) - pętla po milionach pikseli kończy się wcześniej"""
+        self._iterations += 1
+        if self._iterations > MAX_LOOP_ITERATIONS:
+            raise DctlError(f"pętle przekroczyły {MAX_LOOP_ITERATIONS} iteracji", line)
+        if isinstance(active, np.ndarray):
+            self._work += np.count_nonzero(active) * (self._lanes // max(1, active.size))
+        else:
+            self._work += self._lanes
+        if self._work > MAX_LOOP_WORK:
+            raise DctlError(f"pętle przekroczyły {MAX_LOOP_WORK:.0e} iteracji pikseli "
+                            f"({self._iterations} iteracji po {self._lanes} pikseli)", line)
+
+    def _switch(self, statement, scope, mask, frame):
+        _, value, items, line = statement
+        value = self._expression(value, scope, mask, frame)
+        labels = [self._expression(item[1], scope, mask, frame) for item in items if item[0] == 'case']
+        matched_any = False
+        for label in labels:
+            matched_any = _or(matched_any, _condition(value == label, line))
+        entered = False
+        state = [False, None]
+        frame.loops.append(state)
+        inner = _Scope(scope)
+        try:
+            for item in items:
+                if item[0] == 'case':
+                    label = self._expression(item[1], scope, mask, frame)
+                    entered = _or(entered, _and(mask, _condition(value == label, line)))
+                elif item[0] == 'default':
+                    entered = _or(entered, _and(mask, _not(matched_any)))
+                elif _alive(entered):
+                    self._statement(item, inner, _and(entered, _not(state[0])), frame)
+        finally:
+            frame.loops.pop()
+
+    # --- wyrażenia
+
+    def _lookup(self, name, scope, line):
+        names = scope.find(name)
+        if names is None:
+            raise DctlError(f"nieznana nazwa {name!r}", line)
+        return names
+
+    def _assign(self, target, value, scope, mask, frame, line):
+        """Przypisuje `value` do zmiennej, składowej wektora lub elementu tablicy na pikselach z maski"""
+        kind = target[0]
+        if kind == 'var':
+            names = self._lookup(target[1], scope, line)
+            dtype, old = names[target[1]]
+            if dtype.endswith('[]'):
+                raise DctlError("przypisanie do całej tablicy", line)
+            value = convert(value, dtype, line)
+            names[target[1]] = (dtype, _select(mask, value, old) if old is not None else value)
+            return value
+        if kind == 'member':
+            vector = self._expression(target[1], scope, mask, frame)
+            if not isinstance(vector, Vector) or target[2] not in _COMPONENTS:
+                raise DctlError(f"nieobsługiwane pole .{target[2]}", line)
+            components = list(vector.c)
+            component = _COMPONENTS[target[2]]
+            value = _to_float(value)
+            components[component] = _select(mask, value, components[component])
+            self._assign(target[1], Vector(components), scope, True, frame, line)
+            return value
+        if kind == 'index':
+            if target[1][0] != 'var':
+                raise DctlError("nieobsługiwany cel przypisania", line)
+            names = self._lookup(target[1][1], scope, line)
+            dtype, values = names[target[1][1]]
+            index = self._expression(target[2], scope, mask, frame)
+            if isinstance(index, np.ndarray):
+                raise DctlError("indeks zależny od piksela w przypisaniu do tablicy", line)
+            index = self._index(index, values, line)
+            value = convert(value, dtype[:-2], line)
+            values[index] = _select(mask, value, values[index])
+            return value
+        raise DctlError("nieobsługiwany cel przypisania", line)
+
+    def _expression(self, expression, scope, mask, frame):
+        kind = expression[0]
+        if kind == 'const':
+            return expression[1]
+        if kind == 'var':
+            dtype, value = self._lookup(expression[1], scope, expression[2])[expression[1]]
+            return value
+        if kind == 'binary':
+            op = expression[1]
+            if op in ('&&', '||'):
+                return self._logical(expression, scope, mask, frame)
+            left = self._expression(expression[2], scope, mask, frame)
+            right = self._expression(expression[3], scope, mask, frame)
+            return _BINARY[op](left, right)
+        if kind == 'unary':
+            value = self._expression(expression[2], scope, mask, frame)
+            op = expression[1]
+            if op == '-':
+                return _vectorize(lambda v: -v)(value)
+            if op == '!':
+                return np.logical_not(value) if isinstance(value, np.ndarray) else not value
+            if op == '~':
+                return np.invert(_to_int(value))
+            return value
+        if kind == 'ternary':
+            test = _condition(self._expression(expression[1], scope, mask, frame))
+            if test is True or test is False:
+                return self._expression(expression[2] if test else expression[3], scope, mask, frame)
+            then = self._expression(expression[2], scope, _and(mask, test), frame)
+            other = self._expression(expression[3], scope, _and(mask, _not(test)), frame)
+            if _is_int(then) and _is_int(other):
+                return np.where(test, then, other)
+            return _select(test, _to_float(then) if not isinstance(then, Vector) else then,
+                           _to_float(other) if not isinstance(other, Vector) else other)
+        if kind == 'call':
+            return self._call_expression(expression, scope, mask, frame)
+        if kind == 'member':
+            vector = self._expression(expression[1], scope, mask, frame)
+            if not isinstance(vector, Vector) or expression[2] not in _COMPONENTS:
+                raise DctlError(f"nieobsługiwane pole .{expression[2]}", expression[3])
+            return vector.c[_COMPONENTS[expression[2]]]
+        if kind == 'index':
+            values = self._expression(expression[1], scope, mask, frame)
+            index = self._expression(expression[2], scope, mask, frame)
+            if not isinstance(values, list):
+                raise DctlError("indeksowanie wartości, która nie jest tablicą", expression[3])
+            if isinstance(index, np.ndarray):
+                return _pick(values, index)
+            return values[self._index(index, values, expression[3])]
+        if kind == 'cast':
+            value = expression[2]
+            if value[0] == 'init':
+                return self._initializer(value, expression[1], scope, mask, frame)
+            return convert(self._expression(value, scope, mask, frame), expression[1])
+        if kind == 'assign':
+            _, op, target, value, line = expression
+            value = self._expression(value, scope, mask, frame)
+            if op != '=':
+                value = _BINARY[op[:-1]](self._expression(target, scope, mask, frame), value)
+            return self._assign(target, value, scope, mask, frame, line)
+        if kind == 'incdec':
+            _, op, target, prefix, line = expression
+            old = self._expression(target, scope, mask, frame)
+            new = old + 1 if op == '++' else old - 1
+            self._assign(target, new, scope, mask, frame, line)
+            return new if prefix else old
+        if kind == 'comma':
+            self._expression(expression[1], scope, mask, frame)
+            return self._expression(expression[2], scope, mask, frame)
+        if kind == 'init':
+            return self._initializer(expression, 'float3', scope, mask, frame)
+        raise DctlError(f"nieobsługiwane wyrażenie {kind}")
+
+    def _logical(self, expression, scope, mask, frame):
+        """&& i || ze skróconym wartościowaniem
+
+        Prawy argument jest liczony tylko na pikselach, których lewy nie
+        rozstrzyga (dla && - lewy prawdziwy, dla || - fałszywy); przy lewym
+        jednolitym jest pomijany w całości albo liczony na całej masce.
+        """
+        op = expression[1]
+        left = _condition(self._expression(expression[2], scope, mask, frame))
+        undecided = _and(mask, left if op == '&&' else _not(left))
+        if not _alive(undecided):
+            return left
+        right = _condition(self._expression(expression[3], scope, undecided, frame))
+        return _and(left, right) if op == '&&' else _or(left, right)
+
+    def _index(self, index, values, line):
+        index = _to_int(index)
+        if not 0 <= index < len(values):
+            raise DctlError(f"indeks {index} poza tablicą {len(values)}-elementową", line)
+        return index
+
+    def _call_expression(self, expression, scope, mask, frame):
+        _, name, args, line = expression
+        values = [self._expression(arg, scope, mask, frame) for arg in args]
+        function = self.functions.get(name)
+        if function is not None:
+            return self._call(function, values, self._root(scope), line)
+        builtin = BUILTINS.get(name)
+        if builtin is None:
+            raise DctlError(f"nieobsługiwana funkcja {name}()", line)
+        try:
+            return builtin(*values)
+        except TypeError:
+            raise DctlError(f"nieprawidłowa liczba argumentów {name}()", line) from None
+
+def load_kernel(path):
+    """Wczytuje i kompiluje plik .dctl"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return DctlKernel(f.read(), name=path)
+
+# =============================================================================
+# LUT-y .cube i obrazy testowe
+# =============================================================================
+
+def lut_grid(size):
+    """Węzły LUT-a 3D w kolejności .cube (czerwony zmienia się najszybciej): tablice r, g, b"""
+    axis = np.linspace(0, 1, size, dtype=np.float32)
+    b, g, r = np.meshgrid(axis, axis, axis, indexing='ij')
+    return r.ravel(), g.ravel(), b.ravel()
+
+def bake_lut(kernel, size=DEFAULT_LUT_SIZE, params=None):
+    """Tablica (size³, 3) z wynikiem transform dla węzłów siatki (p_X = numer węzła, p_Width = size³)"""
+    r, g, b = lut_grid(size)
+    count = size ** 3
+    x = np.arange(count, dtype=np.int32)
+    return np.stack(kernel(r, g, b, x=x, y=0, width=count, height=1, params=params), axis=-1)
+
+def write_cube(path, table, title=None):
+    """Zapisuje LUT 3D w formacie .cube (Resolve, OCIO)"""
+    size = round(len(table) ** (1 / 3))
+    with open(path, 'w', encoding='utf-8') as f:
+        if title:
+            f.write(f'TITLE "{title}"\n')
+        f.write(f"LUT_3D_SIZE {size}\nDOMAIN_MIN 0.0 0.0 0.0\nDOMAIN_MAX 1.0 1.0 1.0\n")
+        np.savetxt(f, table, fmt='%.6f')
+
+def read_cube(path):
+    """Wczytuje LUT 3D .cube: tablica (N³, 3)"""
+    size = None
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('LUT_3D_SIZE'):
+                size = int(line.split()[1])
+            elif not (line[0].isalpha() and line.split()[0].isupper()):  # Słowa kluczowe: TITLE, DOMAIN_MIN...
+                rows.append(line.split())
+    table = np.array(rows, dtype=np.float32)
+    if size is None or len(table) != size ** 3:
+        raise ValueError(f"{path}: nieprawidłowy LUT 3D (LUT_3D_SIZE {size}, {len(table)} wierszy)")
+    return table
+
+def test_image(width=DEFAULT_IMAGE_SIZE[0], height=DEFAULT_IMAGE_SIZE[1]):
+    """Obraz testowy (wysokość, szerokość, 3): rampa szarości u dołu, nad nią barwy o rosnącej jasności"""
+    x = np.linspace(0, 1, width, dtype=np.float32)
+    y = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    hue = x * 6
+    rgb = np.stack([np.clip(np.abs(hue - 3) - 1, 0, 1), np.clip(2 - np.abs(hue - 2), 0, 1),
+                    np.clip(2 - np.abs(hue - 4), 0, 1)], axis=-1)
+    image = rgb[None, :, :] * (1 - y[..., None]) + y[..., None] * 0.5  # Od pełnych barw do szarości
+    ramp_rows = max(1, height // 5)
+    image[-ramp_rows:] = x[None, :, None]
+    return image.astype(np.float32)
+
+def process_image(kernel, image, params=None):
+    """Przetwarza obraz (wysokość, szerokość, 3) - p_X/p_Y to współrzędne pikseli"""
+    height, width = image.shape[:2]
+    y, x = np.mgrid[0:height, 0:width].astype(np.int32)
+    return np.stack(kernel(image[..., 0], image[..., 1], image[..., 2], x=x, y=y, width=width, height=height,
+                           params=params), axis=-1)
+
+def write_ppm(path, image):
+    """Zapisuje obraz jako 16-bitowy PPM (P6), wartości przycięte do 0-1"""
+    height, width = image.shape[:2]
+    data = (np.clip(np.nan_to_num(image), 0, 1) * 65535 + 0.5).astype('>u2')
+    with open(path, 'wb') as f:
+        f.write(f"P6\n{width} {height}\n65535\n".encode('ascii'))
+        f.write(data.tobytes())
+
+def read_ppm(path):
+    """Wczytuje obraz PPM (P6, 8 lub 16 bitów) jako tablicę float32 0-1"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    fields = []
+    position = 0
+    while len(fields) < 4:
+        match = re.compile(rb'\s*(#[^\n]*\n\s*)*(\S+)').match(data, position)
+        fields.append(match.group(2))
+        position = match.end()
+    if fields[0] != b'P6':
+        raise ValueError(f"{path}: obsługiwane są tylko obrazy PPM P6")
+    width, height, maxval = (int(field) for field in fields[1:])
+    dtype = '>u2' if maxval > 255 else 'u1'
+    pixels = np.frombuffer(data, dtype=dtype, count=width * height * 3, offset=position + 1)
+    return (pixels.reshape(height, width, 3) / np.float32(maxval)).astype(np.float32)
+
+def parse_params(items):
+    """Zamienia ["nazwa=wartość", ...] na słownik (wartości liczbowe lub nazwy opcji listy wyboru)"""
+    params = {}
+    for item in items or ():
+        name, _, value = item.partition('=')
+        params[name.strip()] = value.strip()
+    return params
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Wykonuje transform z pliku DCTL na CPU (NumPy): LUT .cube lub obraz",
+        epilog=f"Pętle są ograniczone do {MAX_LOOP_WORK:.0e} iteracji pikseli na wykonanie - generatory z pętlami "
+               "zależnymi od p_Width (np. Step-Ramp.dctl) działają tylko dla małych obrazów i LUT-ów "
+               "albo z mniejszymi parametrami, większe kończą się błędem"
+    )
+    parser.add_argument('dctl', help="plik .dctl z funkcją transform(...)")
+    parser.add_argument('--cube', metavar='PLIK', help="zapisz LUT 3D .cube")
+    parser.add_argument('--size', type=int, default=DEFAULT_LUT_SIZE, help="rozmiar LUT-a (np. 33 lub 65)")
+    parser.add_argument('--image', metavar='PLIK', help="zapisz przetworzony obraz (16-bitowy PPM)")
+    parser.add_argument('--input', metavar='PLIK', help="obraz wejściowy PPM (domyślnie obraz testowy)")
+    parser.add_argument('--param', action='append', metavar='NAZWA=WARTOŚĆ',
+                        help="wartość parametru DEFINE_UI_PARAMS (można podać wiele razy)")
+    parser.add_argument('--check', metavar='PLIK', help="porównaj LUT z wzorcowym .cube (test regresji)")
+    parser.add_argument('--tolerance', type=float, default=CHECK_TOLERANCE, help="dopuszczalna różnica dla --check")
+    args = parser.parse_args()
+
+    params = parse_params(args.param)
+    try:
+        kernel = load_kernel(args.dctl)
+        values = [(p, p.value(params.get(p.name, p.default))) for p in kernel.params.values()]
+    except ValueError as e:  # DctlError albo nieprawidłowa wartość --param
+        print(f"❌ {args.dctl}: {e}")
+        raise SystemExit(2)
+    print(f"🎛️ {args.dctl}: " + (', '.join(
+        f"{p.name}={p.options[v] if v in range(len(p.options)) else v if p.is_int else f'{v:.6g}'}"
+        for p, v in values
+    ) or "bez parametrów"))
+
+    status = 0
+    try:
+        if args.cube or args.check or not args.image:
+            start = time.perf_counter()
+            table = bake_lut(kernel, args.size, params)
+            print(f"🎨 LUT {args.size}³ obliczony w {time.perf_counter() - start:.3f} s")
+            if args.cube:
+                write_cube(args.cube, table, title=args.dctl)
+                print(f"✅ LUT zapisany do: {args.cube}")
+            if args.check:
+                reference = read_cube(args.check)
+                if reference.shape != table.shape:
+                    print(f"❌ Różne rozmiary LUT-ów: {len(reference)} i {len(table)} węzłów")
+                    status = 1
+                else:
+                    nan_mismatch = int(np.count_nonzero(np.isnan(reference) != np.isnan(table)))
+                    error = float(np.nanmax(np.abs(reference - table), initial=0.0))
+                    ok = error <= args.tolerance and not nan_mismatch
+                    print(f"{'✅' if ok else '❌'} Maksymalna różnica względem {args.check}: {error:.2e}"
+                          + (f", NaN w {nan_mismatch} innych miejscach" if nan_mismatch else ""))
+                    status = 0 if ok else 1
+        if args.image:
+            image = read_ppm(args.input) if args.input else test_image()
+            start = time.perf_counter()
+            result = process_image(kernel, image, params)
+            print(f"🖼️ Obraz {image.shape[1]}x{image.shape[0]} przetworzony w {time.perf_counter() - start:.3f} s")
+            write_ppm(args.image, result)
+            print(f"✅ Obraz zapisany do: {args.image}")
+    except DctlError as e:
+        print(f"❌ {args.dctl}: {e}")
+        status = 2
+    raise SystemExit(status)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Indeks fragmentów kodu DCTL z tutoriali i plików .dctl
+Z oczyszczonego markdown wyciągane są bloki kodu (``` i `inline`) z
+konstrukcjami DCTL, a pliki .dctl są dzielone na definicje (funkcje
+__DEVICE__, bloki DEFINE_UI_PARAMS...). Fragmenty są deduplikowane po
+skrócie znormalizowanego kodu i trafiają do bazy SQLite z indeksem
+symbol → fragment → źródło (URL lub ścieżka pliku)
+"""
+
+import glob
+import hashlib
+import os
+import re
+import sqlite3
+import time
+
+DEFAULT_INDEX_FILE = "dctl_index.db"
+DEFAULT_LOOKUP_LIMIT = 20
+
+# Fragment kodu trafia do indeksu, jeśli zawiera choć jedną konstrukcję DCTL
+DCTL_MARKERS = re.compile(
+    r'\bDEFINE_UI_PARAMS\b|\bDEFINE_LUT\b|\b__DEVICE__\b|\b__CONSTANT__\b|\btransform\s*\('
+    r'|\bmake_float[234]\b|\bfloat[234]\b|\b_[a-z][a-z0-9]*\s*\('
+)
+
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})\s*([\w+-]*)')
+_INLINE_RE = re.compile(r'(`+)([^`\n]+?)\1')
+_COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+_SPACE_RE = re.compile(r'\s+')
+_PUNCT_SPACE_RE = re.compile(r'\s*([{}()\[\];,=+*/<>!&|?:%^~-])\s*')
+
+_DEF_PATTERNS = (
+    re.compile(r'\b__DEVICE__\s+(?:inline\s+)?[\w ]*?\b(\w+)\s*\('),
+    re.compile(r'\bDEFINE_UI_PARAMS\s*\(\s*(\w+)'),
+    re.compile(r'\bDEFINE_LUT\s*\(\s*(\w+)'),
+    re.compile(r'^\s*#\s*define\s+(\w+)', re.M),
+    re.compile(r'\b__CONSTANT__\s+[\w ]*?\b(\w+)\s*(?:\[|=)'),
+    re.compile(r'\b(?:typedef\s+)?struct\s+(\w+)\s*\{'),
+)
+_USE_RE = re.compile(r'\b(DEFINE_UI_PARAMS|DEFINE_LUT|__DEVICE__|__CONSTANT__|DCTLUI_\w+|float[234]|int[234])\b')
+_CALL_RE = re.compile(r'\b([A-Za-z_]\w*)\s*\(')
+_NOT_CALLS = frozenset(('if', 'for', 'while', 'switch', 'return', 'sizeof', 'case', 'else', 'do'))
+
+# Linie najwyższego poziomu, które łączymy w jeden fragment (np. cały blok parametrów UI)
+_GROUPED_LINE_RE = re.compile(r'^\s*(DEFINE_UI_PARAMS|DEFINE_LUT|#\s*\w+)')
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    hash TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    hash TEXT NOT NULL,
+    source TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (hash, source, line)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS occurrences_source ON occurrences (source);
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT NOT NULL,
+    role TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (symbol, role, hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS symbols_hash ON symbols (hash);
+"""
+
+def normalize_code(code):
+    """Kod bez komentarzy i różnic w białych znakach - podstawa deduplikacji"""
+    code = _COMMENT_RE.sub(' ', code)
+    code = _SPACE_RE.sub(' ', code)
+    return _PUNCT_SPACE_RE.sub(r'\1', code).strip()
+
+def code_hash(code):
+    """Skrót znormalizowanego kodu (16 znaków szesnastkowych)"""
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()[:16]
+
+def is_dctl(code):
+    return DCTL_MARKERS.search(_COMMENT_RE.sub(' ', code)) is not None
+
+def code_blocks(markdown):
+    """Bloki kodu markdown: lista (numer linii od 1, rodzaj "fenced"/"inline", kod)
+
+    Niedomknięty blok ``` ciągnie się do końca tekstu, jak w CommonMark.
+    Kod inline szukany jest tylko poza blokami.
+    """
+    blocks = []
+    fence = None
+    start = 0
+    body = []
+    for number, line in enumerate((markdown or '').split('\n'), 1):
+        if fence is None:
+            match = _FENCE_RE.match(line)
+            if match:
+                fence, start, body = match.group(1), number + 1, []
+                continue
+            if '`' in line:
+                blocks.extend((number, 'inline', m.group(2).strip()) for m in _INLINE_RE.finditer(line))
+        elif line.strip().startswith(fence[0] * len(fence)) and not line.strip().strip(fence[0]):
+            blocks.append((start, 'fenced', '\n'.join(body)))
+            fence = None
+        else:
+            body.append(line)
+    if fence is not None and body:
+        blocks.append((start, 'fenced', '\n'.join(body)))
+    return blocks
+
+def _brace_delta(line):
+    code = _COMMENT_RE.sub(' ', line)
+    return code.count('{') - code.count('}')
+
+def definitions(code):
+    """Dzieli kod na jednostki najwyższego poziomu: lista (numer linii od 1, kod)
+
+    Jednostka to funkcja z ciałem w klamrach, instrukcja zakończona średnikiem
+    albo ciąg linii DEFINE_UI_PARAMS/DEFINE_LUT/dyrektyw preprocesora.
+    Komentarze tuż nad jednostką należą do niej, a urwany fragment
+    (niedomknięte klamry) kończy się razem z kodem.
+    """
+    units = []
+    current = []
+    start = 0
+    depth = 0
+    opened = False
+    grouped = False
+    comments = []
+    comment_start = 0
+    in_comment = False
+
+    for number, line in enumerate(code.split('\n'), 1):
+        stripped = line.strip()
+        if current and grouped and not _GROUPED_LINE_RE.match(line):
+            units.append((start, '\n'.join(current)))
+            current = []
+
+        if not current:
+            # Między jednostkami: komentarze czekają na następną jednostkę, pusta linia je odrzuca
+            if in_comment or stripped.startswith(('//', '/*')):
+                if not comments:
+                    comment_start = number
+                comments.append(line)
+                in_comment = (in_comment or stripped.startswith('/*')) and '*/' not in stripped
+                continue
+            if not stripped:
+                comments = []
+                continue
+            start = comment_start if comments else number
+            current = comments + [line]
+            comments = []
+            depth = 0
+            opened = False
+            grouped = bool(_GROUPED_LINE_RE.match(line))
+        else:
+            current.append(line)
+
+        if grouped:
+            continue
+        opened = opened or '{' in line
+        depth = max(0, depth + _brace_delta(line))
+        if depth == 0 and (stripped.endswith(';') or opened and stripped.endswith('}')):
+            units.append((start, '\n'.join(current)))
+            current = []
+
+    if current:
+        units.append((start, '\n'.join(current)))
+    return units
+
+def symbols(code):
+    """Symbole fragmentu: zbiór (symbol, rola) z rolą "def" (definiowany) lub "use" (używany)"""
+    code = _COMMENT_RE.sub(' ', code)
+    found = set()
+    defined = set()
+    for pattern in _DEF_PATTERNS:
+        for match in pattern.finditer(code):
+            defined.add(match.group(1))
+    found.update((name, 'def') for name in defined)
+    found.update((match.group(1), 'use') for match in _USE_RE.finditer(code))
+    for match in _CALL_RE.finditer(code):
+        name = match.group(1)
+        if name not in _NOT_CALLS and name not in defined and name not in ('DEFINE_UI_PARAMS', 'DEFINE_LUT'):
+            found.add((name, 'use'))
+    return found
+
+def extract_snippets(markdown):
+    """Fragmenty kodu DCTL z markdown strony: lista (linia, rodzaj, kod)
+
+    Blok ``` z kilkoma definicjami jest dzielony jak plik .dctl, pozostałe
+    bloki (np. urywki ciała funkcji) i kod inline trafiają do indeksu w całości.
+    """
+    snippets = []
+    for line, kind, code in code_blocks(markdown):
+        if not code.strip() or not is_dctl(code):
+            continue
+        units = definitions(code) if kind == 'fenced' else []
+        if len(units) > 1:
+            snippets.extend((line + offset - 1, 'definition', unit) for offset, unit in units if is_dctl(unit))
+        else:
+            snippets.append((line, kind, code.strip('\n')))
+    return snippets
+
+def file_snippets(code):
+    """Definicje pliku .dctl jako fragmenty: lista (linia, "definition", kod)"""
+    return [(line, 'definition', unit) for line, unit in definitions(code) if unit.strip()]
+
+class DctlIndex:
+    """Indeks symbol → fragment kodu DCTL → źródło w bazie SQLite
+
+    Każde źródło (URL strony albo ścieżka pliku .dctl) jest zapisywane ze
+    skrótem treści: niezmienione źródła są przy ponownym dodaniu pomijane,
+    a zmienione - zastępowane w jednej transakcji. Ten sam fragment
+    (po normalizacji) z wielu źródeł jest zapisany raz, z listą wystąpień.
+    Zapytania (`lookup`, `symbols`) korzystają z indeksów bazy.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(INDEX_SCHEMA)
+        self.stats = {'sources': 0, 'unchanged': 0, 'snippets': 0, 'new_snippets': 0}
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _replace_source(self, source, text, snippets):
+        """Zastępuje fragmenty źródła; zwraca liczbę nowych fragmentów albo None dla niezmienionego"""
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        row = self._db.execute("SELECT content_hash FROM sources WHERE source = ?", (source,)).fetchone()
+        if row is not None and row['content_hash'] == digest:
+            self.stats['unchanged'] += 1
+            return None
+
+        new = 0
+        self._db.execute("BEGIN")
+        try:
+            previous = [r['hash'] for r in self._db.execute("SELECT hash FROM occurrences WHERE source = ?", (source,))]
+            self._db.execute("DELETE FROM occurrences WHERE source = ?", (source,))
+            for line, kind, code in snippets:
+                snippet = code_hash(code)
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO snippets (hash, kind, code) VALUES (?, ?, ?)", (snippet, kind, code)
+                )
+                if cursor.rowcount:
+                    new += 1
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO symbols (symbol, role, hash) VALUES (?, ?, ?)",
+                        [(symbol, role, snippet) for symbol, role in symbols(code)]
+                    )
+                self._db.execute(
+                    "INSERT OR IGNORE INTO occurrences (hash, source, line) VALUES (?, ?, ?)", (snippet, source, line)
+                )
+            # Dawne fragmenty źródła, które nie występują już nigdzie
+            orphans = [
+                (snippet,) for snippet in set(previous)
+                if self._db.execute("SELECT 1 FROM occurrences WHERE hash = ? LIMIT 1", (snippet,)).fetchone() is None
+            ]
+            self._db.executemany("DELETE FROM symbols WHERE hash = ?", orphans)
+            self._db.executemany("DELETE FROM snippets WHERE hash = ?", orphans)
+            self._db.execute(
+                "INSERT INTO sources (source, content_hash, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT (source) DO UPDATE SET content_hash = excluded.content_hash, updated = excluded.updated",
+                (source, digest, time.time())
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self.stats['sources'] += 1
+        self.stats['snippets'] += len(snippets)
+        self.stats['new_snippets'] += new
+        return new
+
+    def add_markdown(self, source, markdown):
+        """Indeksuje kod DCTL z markdown strony `source` (URL)"""
+        return self._replace_source(source, markdown or '', extract_snippets(markdown))
+
+    def add_file(self, path, root=None):
+        """Indeksuje definicje pliku .dctl; źródłem jest `path` (względna wobec `root`, jeśli podano)"""
+        with open(os.path.join(root, path) if root else path, 'r', encoding='utf-8', errors='replace') as f:
+            code = f.read()
+        return self._replace_source(path, code, file_snippets(code))
+
+    def add_files(self, patterns, root=None):
+        """Indeksuje pliki pasujące do wzorców glob (względnych wobec `root`); zwraca liczbę zmienionych"""
+        changed = 0
+        for pattern in patterns:
+            for path in sorted(glob.glob(pattern, root_dir=root)):
+                if self.add_file(path, root) is not None:
+                    changed += 1
+        return changed
+
+    def lookup(self, symbol, role=None, limit=DEFAULT_LOOKUP_LIMIT):
+        """Fragmenty z symbolem: lista {hash, kind, role, code, sources: [(źródło, linia)]}
+
+        Najpierw definicje symbolu, potem użycia; w obu grupach najpierw
+        fragmenty występujące w największej liczbie źródeł.
+        """
+        sql = (
+            "SELECT s.hash, s.kind, s.code, y.role, count(o.source) AS seen "
+            "FROM symbols y JOIN snippets s ON s.hash = y.hash JOIN occurrences o ON o.hash = s.hash "
+            "WHERE y.symbol = ?" + (" AND y.role = ?" if role else "") +
+            " GROUP BY s.hash, y.role ORDER BY y.role = 'use', seen DESC, length(s.code) LIMIT ?"
+        )
+        rows = self._db.execute(sql, (symbol, role, limit) if role else (symbol, limit)).fetchall()
+        results = []
+        for row in rows:
+            sources = self._db.execute(
+                "SELECT source, line FROM occurrences WHERE hash = ? ORDER BY source, line", (row['hash'],)
+            ).fetchall()
+            results.append({
+                'hash': row['hash'],
+                'kind': row['kind'],
+                'role': row['role'],
+                'code': row['code'],
+                'sources': [(source['source'], source['line']) for source in sources],
+            })
+        return results
+
+    def symbols(self, prefix='', role=None):
+        """Symbole w indeksie (z prefiksem) i liczba fragmentów: lista (symbol, rola, liczba)"""
+        sql = (
+            "SELECT symbol, role, count(*) AS n FROM symbols WHERE symbol >= ? AND symbol < ?" +
+            (" AND role = ?" if role else "") + " GROUP BY symbol, role ORDER BY symbol, role"
+        )
+        # Zakres zamiast LIKE - zapytanie korzysta z klucza głównego (symbol, ...)
+        args = [prefix, prefix + '\U0010ffff'] + ([role] if role else [])
+        return [(row['symbol'], row['role'], row['n']) for row in self._db.execute(sql, args)]
+
+    def summary(self):
+        counts = self._db.execute(
+            "SELECT (SELECT count(*) FROM snippets), (SELECT count(DISTINCT symbol) FROM symbols), "
+            "(SELECT count(*) FROM sources)"
+        ).fetchone()
+        stats = self.stats
+        return (
+            f"🧩 Indeks DCTL: {stats['sources']} zaktualizowanych źródeł ({stats['unchanged']} bez zmian), "
+            f"{stats['new_snippets']} nowych fragmentów; łącznie {counts[0]} fragmentów, {counts[1]} symboli "
+            f"z {counts[2]} źródeł"
+        )
+
+def print_lookup(symbol, results):
+    """Wypisuje wynik DctlIndex.lookup()"""
+    if not results:
+        print(f"🔍 Brak fragmentów z symbolem {symbol}")
+        return
+    for result in results:
+        where = ', '.join(f"{source}:{line}" for source, line in result['sources'][:5])
+        more = len(result['sources']) - 5
+        print(f"--- {'definicja' if result['role'] == 'def' else 'użycie'} [{result['kind']}] {where}"
+              + (f" (+{more})" if more > 0 else ''))
+        print(result['code'])
+        print()
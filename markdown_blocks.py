@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Blokowy czyściciel markdown o liniowym czasie działania
+Dzieli dokument na bloki (nagłówki, listy, akapity, tabele, kod) w jednym
+przebiegu i podejmuje decyzje o usunięciu dla całych bloków lub linii,
+zamiast przeszukiwać cały dokument leniwymi wzorcami DOTALL
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+
+from markdown_cleaner import finalize_markdown
+
+HEADING = 'heading'
+LIST = 'list'
+TABLE = 'table'
+CODE = 'code'
+PARAGRAPH = 'paragraph'
+
+_LIST_ITEM_RE = re.compile(r'(?:[*+-]|\d+[.)])(?:\s|$)')
+
+class Block:
+    """Fragment dokumentu: nagłówek, lista, tabela, blok kodu lub akapit"""
+
+    __slots__ = ('kind', 'lines', 'level', 'start')
+
+    def __init__(self, kind, lines, level=0, start=0):
+        self.kind = kind
+        self.lines = lines
+        self.level = level
+        self.start = start
+
+    @property
+    def text(self):
+        return '\n'.join(self.lines)
+
+    def __repr__(self):
+        return f"Block({self.kind!r}, {self.text[:40]!r})"
+
+def split_blocks(content):
+    """Dzieli markdown na bloki w jednym przebiegu po liniach
+
+    Puste linie kończą blok, nagłówek jest zawsze osobnym blokiem, a bloki
+    kodu (```) są przenoszone bez zmian aż do linii zamykającej. `Block.start`
+    to numer pierwszej linii bloku - linie bloku zawsze następują po sobie.
+    """
+    blocks = []
+    current = None
+    in_code = False
+
+    for number, line in enumerate(content.split('\n')):
+        stripped = line.strip()
+
+        if in_code:
+            current.lines.append(line)
+            if stripped.startswith('```'):
+                in_code = False
+                current = None
+            continue
+
+        if stripped.startswith('```'):
+            current = Block(CODE, [line], start=number)
+            blocks.append(current)
+            in_code = True
+            continue
+
+        if not stripped:
+            current = None
+            continue
+
+        if stripped.startswith('#'):
+            level = len(stripped) - len(stripped.lstrip('#'))
+            if level <= 6 and (len(stripped) == level or stripped[level] == ' '):
+                blocks.append(Block(HEADING, [line], level, number))
+                current = None
+                continue
+
+        if stripped.startswith('|'):
+            kind = TABLE
+        elif _LIST_ITEM_RE.match(stripped):
+            kind = LIST
+        else:
+            kind = PARAGRAPH
+
+        # Linie kontynuacji elementu listy należą do listy
+        if current is None or (kind != current.kind and not (current.kind == LIST and kind == PARAGRAPH)):
+            current = Block(kind, [line], start=number)
+            blocks.append(current)
+        else:
+            current.lines.append(line)
+
+    return blocks
+
+class SpanRule:
+    """Usuwa tekst od wystąpienia `start` do końca linii, w której występuje `end`
+
+    Odpowiada wzorcom `start.*?end.*?\n`: koniec jest szukany od miejsca startu
+    (także w tej samej linii). Część linii przed `start` zostaje zachowana
+    jako osobna linia, o ile nie jest samym znacznikiem nagłówka.
+    Gdy `end` nie występuje dalej w dokumencie, nic nie jest usuwane.
+    `start_pattern`/`end_pattern` zastępują dosłowne dopasowanie kotwic
+    (np. żeby objąć sąsiednie linie okna dialogowego); kotwice nadal
+    decydują, czy reguła jest w ogóle uruchamiana.
+    """
+
+    __slots__ = ('start', 'end', 'ignorecase', 'start_re', 'end_re')
+
+    def __init__(self, start, end, ignorecase=False, start_pattern=None, end_pattern=None):
+        self.start = start
+        self.end = end
+        self.ignorecase = ignorecase
+        flags = re.IGNORECASE if ignorecase else 0
+        self.start_re = re.compile(start_pattern if start_pattern is not None else re.escape(start), flags)
+        self.end_re = re.compile(end_pattern if end_pattern is not None else re.escape(end), flags)
+
+    @property
+    def anchors(self):
+        return (self.start, self.end)
+
+class BlockRule:
+    """Usuwa każdy blok zawierający wszystkie podane fragmenty"""
+
+    __slots__ = ('anchors', 'ignorecase')
+
+    def __init__(self, *anchors, ignorecase=False):
+        self.anchors = anchors
+        self.ignorecase = ignorecase
+
+class LineRule:
+    """Obcina linię od dopasowania `pattern` do jej końca
+
+    `anchor` to fragment, który musi wystąpić w linii, zanim wzorzec zostanie
+    uruchomiony. Wzorce dotyczą pojedynczej linii, więc nie mogą przeszukiwać
+    reszty dokumentu.
+    """
+
+    __slots__ = ('anchor', 'regex', 'ignorecase', 'anchor_re')
+
+    def __init__(self, anchor, pattern=None, ignorecase=False):
+        self.anchor = anchor
+        self.ignorecase = ignorecase
+        flags = re.IGNORECASE if ignorecase else 0
+        self.regex = re.compile(pattern if pattern is not None else re.escape(anchor), flags)
+        self.anchor_re = re.compile(re.escape(anchor), flags)
+
+    @property
+    def anchors(self):
+        return (self.anchor,)
+
+class InlineRule(LineRule):
+    """Usuwa wszystkie dopasowania `pattern` wewnątrz linii zawierającej `anchor`"""
+
+    __slots__ = ()
+
+class BlockRuleSet:
+    """Zestaw reguł blokowego czyściciela pogrupowany według rodzaju"""
+
+    def __init__(self, spans=(), blocks=(), lines=(), inline=()):
+        self.spans = list(spans)
+        self.blocks = list(blocks)
+        self.lines = list(lines)
+        self.inline = list(inline)
+
+    def fingerprint(self):
+        """Skrót wszystkich reguł zestawu - zmienia się po edycji dowolnej reguły"""
+        digest = hashlib.sha256()
+        for group in (self.spans, self.blocks, self.lines, self.inline):
+            for rule in group:
+                if isinstance(rule, LineRule):
+                    pattern = rule.regex.pattern
+                elif isinstance(rule, SpanRule):
+                    pattern = (rule.start_re.pattern, rule.end_re.pattern)
+                else:
+                    pattern = None
+                digest.update(repr((type(rule).__name__, rule.anchors, pattern, rule.ignorecase)).encode('utf-8'))
+            digest.update(b'|')
+        return digest.hexdigest()
+
+class _Text:
+    """Tekst wraz z leniwie liczoną wersją do porównań bez wielkości liter"""
+
+    __slots__ = ('text', '_folded')
+
+    def __init__(self, text):
+        self.text = text
+        self._folded = None
+
+    def contains(self, rule):
+        if rule.ignorecase:
+            if self._folded is None:
+                self._folded = self.text.casefold()
+            return all(anchor.casefold() in self._folded for anchor in rule.anchors)
+        return all(anchor in self.text for anchor in rule.anchors)
+
+def _apply_span(text, rule):
+    """Usuwa wszystkie zakresy start..koniec linii z `end` w jednym przebiegu
+
+    Pozycja wyszukiwania tylko rośnie, a gdy po danym starcie nie ma już
+    końca, nie będzie go też po żadnym późniejszym - przerywamy zamiast
+    skanować resztę dokumentu od nowa (to ten przypadek jest kwadratowy
+    we wzorcach regex).
+    """
+    pieces = []
+    pos = 0
+    while True:
+        start = rule.start_re.search(text, pos)
+        if start is None:
+            break
+        end = rule.end_re.search(text, start.end())
+        if end is None:
+            break
+        line_end = text.find('\n', end.end())
+        line_start = text.rfind('\n', pos, start.start()) + 1 if start.start() > pos else pos
+        prefix = text[line_start:start.start()]
+        pieces.append(text[pos:line_start])
+        # Zachowujemy początek linii przed startem, chyba że to sam znacznik nagłówka
+        if prefix.strip(' \t#'):
+            pieces.append(prefix + '\n')
+        pos = len(text) if line_end < 0 else line_end + 1
+
+    if not pieces:
+        return text
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+def _clean_line(line, rules):
+    """Stosuje reguły liniowe i wewnątrzliniowe do jednej linii
+
+    Zwraca None, jeśli z linii nic nie zostało.
+    """
+    for rule in rules:
+        if rule.anchor_re.search(line) is None:
+            continue
+
+        if isinstance(rule, InlineRule):
+            line = rule.regex.sub('', line)
+        else:
+            match = rule.regex.search(line)
+            if match is None:
+                continue
+            line = line[:match.start()]
+
+        if not line.strip():
+            return None
+    return line
+
+def _rules_by_line(text, lines, line_rules):
+    """Przypisuje reguły liniowe do numerów linii, w których występują ich kotwice
+
+    Kotwice są wyszukiwane w całym tekście (w C), a pozycje mapowane na numery
+    linii, więc linie bez żadnej kotwicy nie są w ogóle odwiedzane.
+    """
+    line_starts = [0]
+    for length in map(len, lines[:-1]):
+        line_starts.append(line_starts[-1] + length + 1)
+
+    hits = {}
+    for rule in line_rules:
+        last = -1
+        for match in rule.anchor_re.finditer(text):
+            number = bisect_right(line_starts, match.start()) - 1
+            if number != last:
+                hits.setdefault(number, []).append(rule)
+                last = number
+    return hits
+
+def _clean_run(text, spans, block_rules, line_rules, kept):
+    """Czyści ciąg bloków bez kodu i dopisuje wynikowe bloki do `kept`"""
+    for rule in spans:
+        text = _apply_span(text, rule)
+
+    lines = text.split('\n')
+    hits = _rules_by_line(text, lines, line_rules) if line_rules else {}
+
+    for block in split_blocks(text):
+        if block_rules:
+            block_text = _Text(block.text)
+            if any(block_text.contains(rule) for rule in block_rules):
+                continue
+
+        block_lines = block.lines
+        if hits:
+            block_lines = []
+            for number, line in enumerate(block.lines, block.start):
+                rules = hits.get(number)
+                if rules:
+                    line = _clean_line(line, rules)
+                if line is not None:
+                    block_lines.append(line)
+        if block_lines:
+            kept.append('\n'.join(block_lines))
+
+def clean_markdown_blocks(content, rules):
+    """Czyści markdown blokowo według zestawu reguł `rules` (BlockRuleSet)
+
+    Reguły, których kotwic nie ma w dokumencie, są odrzucane na starcie.
+    Każda pozostała reguła przechodzi po tekście co najwyżej raz, a wzorce
+    liniowe działają tylko na pojedynczych liniach, więc czas działania rośnie
+    liniowo z rozmiarem dokumentu. Bloki kodu nie są modyfikowane.
+    """
+    if not content:
+        return ""
+
+    document = _Text(content)
+    spans = [rule for rule in rules.spans if document.contains(rule)]
+    block_rules = [rule for rule in rules.blocks if document.contains(rule)]
+    line_rules = [rule for rule in rules.lines + rules.inline if document.contains(rule)]
+
+    kept = []
+    run = []
+    for block in split_blocks(content):
+        if block.kind != CODE:
+            run.append(block.text)
+            continue
+        if run:
+            _clean_run('\n\n'.join(run), spans, block_rules, line_rules, kept)
+            run = []
+        kept.append(block.text)
+    if run:
+        _clean_run('\n\n'.join(run), spans, block_rules, line_rules, kept)
+
+    return finalize_markdown('\n\n'.join(kept))
+
+# =============================================================================
+# Zestawy reguł odpowiadające wzorcom regex z crawlerów
+# =============================================================================
+
+# Treści moderacyjne - dopasowywane bez względu na wielkość liter, jak w wersji regex
+# Okna zgłaszania i blokowania razem z nagłówkiem i przyciskiem ("Report", "Confirm") -
+# same takie linie poza oknem dialogowym to zwykła treść i zostają, jak w wersji regex
+_MODERATION_SPANS = [
+    SpanRule('There was a problem reporting this post.', 'Report note', ignorecase=True,
+             start_pattern=r'(?:(?:#{1,6}[ \t]*)?Report\s+)?There was a problem reporting this post\.',
+             end_pattern=r'Report note\s+Report'),
+    SpanRule('Report', 'Report note', ignorecase=True,
+             start_pattern=r'####[ \t]*Report', end_pattern=r'Report note\s+Report'),
+    SpanRule('Block Member?', 'Please allow a few minutes for this process to complete.', ignorecase=True,
+             end_pattern=r'Please allow a few minutes for this process to complete\.\s*Confirm'),
+    SpanRule('Block Member?', 'Confirm', ignorecase=True, start_pattern=r'####[ \t]*Block Member\?'),
+    SpanRule('Harassment or bullying behavior', 'Other', ignorecase=True),
+    SpanRule('You will no longer be able to:', 'Mention this member', ignorecase=True),
+]
+
+_MODERATION_INLINE = [
+    InlineRule('You have already reported this', r'(?:#{1,6}\s*Report\s+)?You have already reported this\s*\.', ignorecase=True),
+    InlineRule('Contains mature or sensitive content', r'Inappropriate\s+Contains mature or sensitive content', ignorecase=True),
+    InlineRule('Contains abusive or derogatory content', r'Offensive\s+Contains abusive or derogatory content', ignorecase=True),
+    InlineRule('Contains spam, fake content', r'Suspicious\s+Contains spam, fake content or potential malware', ignorecase=True),
+]
+
+# Kategorie zgłoszeń w postaci dwuliniowej ("Inappropriate\nContains mature...") - wzorce
+# regex przechodzą przez znak nowej linii, a reguły wewnątrzliniowe widzą tylko jedną linię
+_MODERATION_BLOCKS = [
+    BlockRule('Inappropriate', 'Contains mature or sensitive content', ignorecase=True),
+    BlockRule('Offensive', 'Contains abusive or derogatory content', ignorecase=True),
+    BlockRule('Suspicious', 'Contains spam, fake content or potential malware', ignorecase=True),
+]
+
+# Formularze, paywall, playlisty i powiadomienia
+_MEMBERSHIP_SPANS = [
+    SpanRule('##### Contact', 'This field is for validation purposes'),
+    SpanRule('##### Stay In Touch', 'This field is for validation purposes'),
+    SpanRule('Email*', 'This field is for validation'),
+    SpanRule('### Member Content', 'Need more information about our memberships'),
+    SpanRule('Sorry... the rest of this content is for members only.', 'Membership options'),
+    SpanRule('##### Member Login', 'Remember me'),
+    SpanRule('## Membership Required', 'Close'),
+    SpanRule('**Bonus**', 'Join Today'),
+    SpanRule('×', 'Add to New Playlist'),
+    SpanRule('## Add to Playlist', 'Add to New Playlist'),
+    SpanRule('##### Adding to Playlist...', 'Add to New Playlist'),
+    SpanRule('Notifications', 'Yes, please.No Thanks'),
+    SpanRule('![notification icon]', 'Yes, please.No Thanks'),
+    SpanRule('Did you know?', 'Check out our membership options'),
+]
+
+_SHARE_LINES = [
+    LineRule('[](https://www.facebook.com/sharer', r'\*\s*\[\]\(https://www\.facebook\.com/sharer'),
+    LineRule('[](https://x.com/share', r'\*\s*\[\]\(https://x\.com/share'),
+    LineRule('[](mailto:', r'\*\s*\[\]\(mailto:'),
+    LineRule('facebook', r'\*\s*\[\]\([^)\n]*facebook'),
+    LineRule('twitter', r'\*\s*\[\]\([^)\n]*twitter'),
+    LineRule('[](https://www.linkedin.com', r'\*\s*\[\]\(https://www\.linkedin\.com'),
+]
+
+_PAGE_LINES = [
+    LineRule('## Post navigation'),
+    LineRule('##### Our Products'),
+    LineRule('Type', r'Type\s+(?:Article|Video)'),
+    LineRule('Duration', r'Duration\s+\d+:\d+'),
+    LineRule('Skill Level', r'Skill Level\s+(?:Beginner|Intermediate|Advanced)'),
+    LineRule('indicates required fields', r'"?\*"?\s*indicates required fields'),
+    LineRule('(', r'\*\s*\[\s*\(\d{3}\)\s*\d{3}-\d{4}\]'),
+]
+
+_TRACKING_INLINE = [
+    InlineRule('https://cdn.usefathom.com', r'!\[\]\(https://cdn\.usefathom\.com[^)\n]*\)'),
+    InlineRule('https://app.monstercampaigns.com', r'!\[\]\(https://app\.monstercampaigns\.com[^)\n]*\)'),
+    InlineRule('Loading...', r'!\[\]\(data:image/svg\+xml[^)\n]*\)\s*Loading\.\.\.'),
+    InlineRule('Prev', r'\[\s*Prev\s*\]\([^)\n]*\).*\[\s*Next\s*\]\([^)\n]*\)'),
+]
+
+_LOGIN_TABLES = [
+    BlockRule('Username', '---', 'Password'),
+]
+
+MIXINGLIGHT_BLOCK_RULES = BlockRuleSet(
+    spans=_MODERATION_SPANS + _MEMBERSHIP_SPANS + [
+        SpanRule('##### About', 'About Mixing Light'),
+        SpanRule('Mixing Light provides industry leading tutorials', 'Join our community!'),
+        SpanRule('© ', 'Terms of Use'),
+        SpanRule('Other Tutorials in this Series', 'View All'),
+    ],
+    blocks=_MODERATION_BLOCKS + _LOGIN_TABLES,
+    lines=_SHARE_LINES + _PAGE_LINES + [
+        LineRule('[Color Grading', r'Search:\s*\*\s*\[Color Grading'),
+        LineRule('[Tutorial Library Index]', r'\*\s*\[Tutorial Library Index\]'),
+        LineRule('[Focused Flight Paths]', r'\*\s*\[Focused Flight Paths\]'),
+        LineRule('[Tutorial Library Membership]', r'\*\s*\[Tutorial Library Membership\]'),
+        LineRule('Learn DaVinci Resolve]', r'\*\s*\[\s*Learn DaVinci Resolve\]'),
+        LineRule('DaVinci Resolve Courses]', r'\*\s*\[\s*DaVinci Resolve Courses\]'),
+        LineRule('The All-Access Accelerator]', r'\*\s*\[\s*The All-Access Accelerator\]'),
+        LineRule('Grading Practice Projects]', r'\*\s*\[\s*Grading Practice Projects\]'),
+        LineRule('Login]', r'\*\s*\[\s*Login\]'),
+        LineRule('[Join Now!]', r'\*\s*\[Join Now!\]'),
+        LineRule('[Tutorials](', r'\[Tutorials\]\([^)\n]*\) / \[[^\]\n]*\]\([^)\n]*\) / '),
+        LineRule('MixingLight.com Uptime Status'),
+        LineRule('[](https://www.facebook.com/MixingLight/)', r'\*\s*\[\]\(https://www\.facebook\.com/MixingLight/\)'),
+        LineRule('[](https://x.com/MixingLight)', r'\*\s*\[\]\(https://x\.com/MixingLight\)'),
+        LineRule('[](https://mixinglight.com/press/)', r'\*\s*\[\]\(https://mixinglight\.com/press/\)'),
+        LineRule('Penny Farms', r'\*\s*\[\s*\d+\s+[^\]\n]*Penny Farms'),
+        LineRule('Insight #', r'Insight #\s*ML\s*\d+'),
+        LineRule('Series', r'Series\s*\|\s*\*\s*\[Creative Coding With DCTL\]'),
+        LineRule('Categories', r'Categories\s*\[DCTL\]'),
+        LineRule('Skills', r'Skills\s*\[[^\]\n]*\]'),
+    ],
+    inline=_MODERATION_INLINE + _TRACKING_INLINE + [
+        InlineRule('![Mixing Light]', r'\[\s*!\[Mixing Light\][^\]\n]*\]\([^)\n]*\)'),
+    ],
+)
+
+GENERIC_BLOCK_RULES = BlockRuleSet(
+    spans=_MODERATION_SPANS + _MEMBERSHIP_SPANS + [
+        SpanRule('Problem z zgłoszeniem', 'Zgłoś', ignorecase=True),
+        SpanRule('Zablokuj użytkownika?', 'Potwierdź', ignorecase=True),
+        SpanRule('Molestowanie', 'Inne', ignorecase=True),
+        SpanRule('Nieodpowiednie', 'Obraźliwe', ignorecase=True),
+        SpanRule('##### Kontakt', 'To pole służy do walidacji'),
+        SpanRule('E-mail*', 'To pole służy do walidacji'),
+        SpanRule('##### About', 'About '),
+        SpanRule('##### O nas', 'O firmie'),
+        SpanRule('## Dodaj do playlisty', 'Dodaj do nowej playlisty'),
+        SpanRule('Subskrybuj powiadomienia', 'Nie, dziękuję'),
+        SpanRule('Czy wiesz?', 'Sprawdź nasze opcje członkostwa'),
+        SpanRule('Przepraszamy', 'reszta treści jest tylko dla członków'),
+        SpanRule('© ', 'Terms of Use'),
+        SpanRule('© ', 'Regulamin'),
+        SpanRule('This website uses cookies', 'Accept'),
+        SpanRule('Ta strona używa plików cookie', 'Akceptuj'),
+        SpanRule('Other ', 'View All'),
+    ],
+    blocks=_MODERATION_BLOCKS + _LOGIN_TABLES + [
+        BlockRule('Nazwa użytkownika', '---', 'Hasło'),
+    ],
+    lines=_SHARE_LINES + _PAGE_LINES + [
+        LineRule('Search:', r'Search:\s*\*\s*\['),
+        LineRule('[Home]', r'\*\s*\[Home\]'),
+        LineRule('[About]', r'\*\s*\[About\]'),
+        LineRule('[Contact]', r'\*\s*\[Contact\]'),
+        LineRule('[Login]', r'\*\s*\[Login\]'),
+        LineRule('[Register]', r'\*\s*\[Register\]'),
+        LineRule('[Sign Up]', r'\*\s*\[Sign Up\]'),
+        LineRule('[Menu]', r'\*\s*\[Menu\]'),
+        LineRule(') / [', r'\[[^\]\n]*\]\([^)\n]*\) / \[[^\]\n]*\]\([^)\n]*\) / '),
+        LineRule('Home > '),
+        LineRule('Strona główna > '),
+        LineRule('##### Nasze Produkty'),
+        # W wersji regex wzorzec '.*?Uptime Status' usuwa wszystko od początku dokumentu;
+        # tutaj usuwana jest tylko linia ze statusem
+        LineRule('Uptime Status', r'^.*Uptime Status'),
+        LineRule('[](https://twitter.com/share', r'\*\s*\[\]\(https://twitter\.com/share'),
+        LineRule('/press/)', r'\*\s*\[\]\(https://[^)\n]*/press/\)'),
+        LineRule('Copyright ', r'Copyright \d{4}'),
+        LineRule('[', r'\*\s*\[\s*\+\d+[^\]\n]*\]'),
+        LineRule('[', r'\*\s*\[\s*\d+\s+[^\]\n]*\]'),
+        LineRule('oznacza pola wymagane', r'"?\*"?\s*oznacza pola wymagane'),
+        LineRule('Typ', r'Typ\s+(?:Artykuł|Wideo)'),
+        LineRule('Czas trwania', r'Czas trwania\s+\d+:\d+'),
+        LineRule('Poziom', r'Poziom\s+(?:Początkujący|Średni|Zaawansowany)'),
+        LineRule('### Treść dla członków'),
+        LineRule('We use cookies'),
+        LineRule('Używamy plików cookie'),
+        LineRule('Już zgłosiłeś', r'Już zgłosiłeś', ignorecase=True),
+    ],
+    inline=_MODERATION_INLINE + _TRACKING_INLINE + [
+        InlineRule('](', r'\[\s*!\[[^\]\n]*\][^\]\n]*\]\([^)\n]*\)'),
+        InlineRule('analytics', r'!\[\]\(https://[^)\n]*analytics[^)\n]*\)'),
+        InlineRule('tracking', r'!\[\]\(https://[^)\n]*tracking[^)\n]*\)'),
+        InlineRule('Previous', r'\[\s*Previous\s*\]\([^)\n]*\).*\[\s*Next\s*\]\([^)\n]*\)'),
+        InlineRule('Poprzedni', r'\[\s*Poprzedni\s*\]\([^)\n]*\).*\[\s*Następny\s*\]\([^)\n]*\)'),
+        InlineRule('Ładowanie...', r'Ładowanie\.\.\.'),
+    ],
+)
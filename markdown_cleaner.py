@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Silnik reguł czyszczenia markdown
+Wzorce są kompilowane raz przy imporcie, a każda reguła ma wymagany fragment
+tekstu (kotwicę) - reguła jest pomijana, jeśli kotwicy nie ma na stronie
+"""
+
+import json
+import re
+import time
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Wspólne flagi wzorców czyszczących
+DEFAULT_FLAGS = re.DOTALL | re.MULTILINE
+
+# Końcowe porządki po usunięciu elementów
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+_LONG_SPACES_RE = re.compile(r' {3,}')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+
+# Aktywny zbiór statystyk reguł (None = pomiary wyłączone)
+_rule_stats = None
+
+class CompiledRule:
+    """Skompilowana reguła czyszczenia wraz z kotwicą do szybkiego odrzucenia"""
+
+    __slots__ = ('pattern', 'regex', 'anchor', 'ignorecase', 'name')
+
+    def __init__(self, pattern, flags=DEFAULT_FLAGS, anchor=None, name=None):
+        self.pattern = pattern
+        self.name = name or pattern
+        self.regex = re.compile(pattern, flags)
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        if anchor is None:
+            anchor = literal_anchor(pattern, flags)
+        if anchor and self.ignorecase:
+            anchor = anchor.casefold()
+        self.anchor = anchor or None
+
+    def __repr__(self):
+        return f"CompiledRule({self.pattern!r}, anchor={self.anchor!r})"
+
+def literal_anchor(pattern, flags=DEFAULT_FLAGS):
+    """Wyznacza najdłuższy fragment dosłowny, który musi wystąpić w każdym dopasowaniu
+
+    Analizowane są tylko elementy najwyższego poziomu wzorca (poza grupami,
+    alternatywami i powtórzeniami), więc każdy znaleziony fragment jest
+    obowiązkowy. Zwraca None, jeśli wzorzec nie ma takiego fragmentu.
+    """
+    best = ''
+    current = []
+    for op, value in sre_parse.parse(pattern, flags):
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if len(current) > len(best):
+            best = ''.join(current)
+        current = []
+    if len(current) > len(best):
+        best = ''.join(current)
+    return best or None
+
+def compile_rules(patterns, flags=DEFAULT_FLAGS, name=None):
+    """Kompiluje listę wzorców do reguł
+
+    Element listy to wzorzec (kotwica wyznaczana automatycznie) lub para
+    (wzorzec, kotwica), gdy kotwicę trzeba podać ręcznie. `name` nazywa
+    grupę reguł w statystykach - reguły dostają nazwy `name[0]`, `name[1]`...
+    """
+    rules = []
+    for i, item in enumerate(patterns):
+        if isinstance(item, tuple):
+            pattern, anchor = item
+        else:
+            pattern, anchor = item, None
+        rules.append(CompiledRule(pattern, flags, anchor, f"{name}[{i}]" if name else None))
+    return rules
+
+class RuleStats:
+    """Zbiorcze statystyki reguł czyszczenia ze wszystkich stron przebiegu
+
+    Dla każdej reguły liczy: sprawdzenia (strony, na których reguła była
+    brana pod uwagę), pominięcia przez brak kotwicy, wykonania, liczbę
+    dopasowań, usunięte znaki i łączny czas wykonania.
+    """
+
+    FIELDS = ('checks', 'skipped', 'runs', 'matches', 'chars_removed', 'seconds')
+    SORT_LABELS = {'seconds': 'czasu', 'matches': 'trafień', 'chars_removed': 'usuniętych znaków'}
+
+    def __init__(self):
+        self.rules = {}
+
+    def _entry(self, rule):
+        entry = self.rules.get(rule.name)
+        if entry is None:
+            entry = self.rules[rule.name] = dict.fromkeys(self.FIELDS, 0)
+            entry['pattern'] = rule.pattern
+        return entry
+
+    def skip(self, rule):
+        entry = self._entry(rule)
+        entry['checks'] += 1
+        entry['skipped'] += 1
+
+    def record(self, rule, matches, chars_removed, seconds):
+        entry = self._entry(rule)
+        entry['checks'] += 1
+        entry['runs'] += 1
+        entry['matches'] += matches
+        entry['chars_removed'] += chars_removed
+        entry['seconds'] += seconds
+
+    def merge(self, rules):
+        """Dołącza statystyki z innego zbioru (np. słownik `rules` z procesu roboczego)"""
+        for name, other in rules.items():
+            entry = self.rules.setdefault(name, dict(dict.fromkeys(self.FIELDS, 0), pattern=other['pattern']))
+            for field in self.FIELDS:
+                entry[field] += other[field]
+
+    def save(self, path):
+        """Zapisuje statystyki do pliku JSON (reguły posortowane wg czasu)"""
+        ordered = dict(sorted(self.rules.items(), key=lambda item: item[1]['seconds'], reverse=True))
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(ordered, f, ensure_ascii=False, indent=2)
+
+    def table(self, top=15, key='seconds'):
+        """Zwraca tabelę `top` reguł posortowanych wg `key` oraz listę reguł, które nigdy nie trafiły"""
+        ranked = sorted(self.rules.items(), key=lambda item: item[1][key], reverse=True)
+        lines = [
+            f"📈 Reguły czyszczenia - top {top} wg {self.SORT_LABELS.get(key, key)}:",
+            f"   {'reguła':<28}{'trafienia':>10}{'usunięte':>12}{'czas ms':>10}  wzorzec",
+        ]
+        for name, entry in ranked[:top]:
+            pattern = entry['pattern'] if len(entry['pattern']) <= 50 else entry['pattern'][:47] + '...'
+            lines.append(
+                f"   {name:<28}{entry['matches']:>10}{entry['chars_removed']:>12}"
+                f"{entry['seconds'] * 1000:>10.2f}  {pattern}"
+            )
+        dead = [name for name, entry in self.rules.items() if not entry['matches']]
+        lines.append(f"💤 Reguły bez trafień: {len(dead)} z {len(self.rules)}")
+        return "\n".join(lines)
+
+def enable_rule_stats():
+    """Włącza zbieranie statystyk reguł dla wszystkich kolejnych wywołań apply_rules"""
+    global _rule_stats
+    _rule_stats = RuleStats()
+    return _rule_stats
+
+def disable_rule_stats():
+    """Wyłącza zbieranie statystyk i zwraca zebrane dane (lub None)"""
+    global _rule_stats
+    stats, _rule_stats = _rule_stats, None
+    return stats
+
+def rule_stats():
+    """Zwraca aktywny zbiór statystyk reguł lub None, gdy pomiary są wyłączone"""
+    return _rule_stats
+
+def apply_rules(content, rules):
+    """Stosuje reguły po kolei, pomijając te, których kotwicy nie ma w treści
+
+    Wynik jest identyczny jak przy wywołaniu re.sub dla każdego wzorca.
+    Obecność kotwic jest sprawdzana leniwie i zapamiętywana; po każdej
+    udanej zamianie zapamiętane braki są unieważniane, bo usunięcie
+    fragmentu może skleić tekst w nową kotwicę.
+
+    Gdy włączono statystyki (enable_rule_stats), każda reguła jest mierzona.
+    """
+    if not content:
+        return content
+
+    stats = _rule_stats
+    lowered = None
+    present = {}
+
+    for rule in rules:
+        anchor = rule.anchor
+        if anchor is not None:
+            memo_key = (anchor, rule.ignorecase)
+            found = present.get(memo_key)
+            if found is None:
+                if rule.ignorecase:
+                    if lowered is None:
+                        lowered = content.casefold()
+                    found = anchor in lowered
+                else:
+                    found = anchor in content
+                present[memo_key] = found
+            if not found:
+                if stats is not None:
+                    stats.skip(rule)
+                continue
+
+        if stats is None:
+            content, count = rule.regex.subn('', content)
+        else:
+            length = len(content)
+            start = time.perf_counter()
+            content, count = rule.regex.subn('', content)
+            stats.record(rule, count, length - len(content), time.perf_counter() - start)
+        if count:
+            lowered = None
+            present = {key: True for key, found in present.items() if found}
+
+    return content
+
+def finalize_markdown(content):
+    """Usuwa nadmiarowe puste linie, długie ciągi spacji i znaki kontrolne"""
+    # Usuwamy nadmiarowe puste linie
+    content = _BLANK_LINES_RE.sub('\n\n', content)
+
+    # Usuwamy długie ciągi spacji
+    content = _LONG_SPACES_RE.sub(' ', content)
+
+    # Usuwamy znaki kontrolne
+    content = _CONTROL_CHARS_RE.sub('', content)
+
+    return content.strip()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Strumieniowy zapis raportu markdown
+Sekcje stron trafiają od razu do pliku tymczasowego, a spis treści jest
+budowany z lekkiego indeksu i dopisywany na początku przy zamknięciu raportu
+"""
+
+import os
+import shutil
+
+COPY_CHUNK_SIZE = 1024 * 1024  # Rozmiar bloku przy przepisywaniu treści raportu
+
+class StreamingReportWriter:
+    """Zapisuje raport sekcja po sekcji bez trzymania całej treści w pamięci
+
+    W pamięci zostaje tylko indeks - jedna linia spisu treści na stronę.
+    Przy `close()` powstaje plik docelowy: nagłówek, spis treści, treść
+    (przepisana blokami z pliku tymczasowego) i stopka.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.sections = 0
+        self._toc = []
+        self._body_path = output_file + '.body.tmp'
+        self._body = open(self._body_path, 'w', encoding='utf-8')
+
+    def add_section(self, toc_line, text):
+        """Dopisuje sekcję strony do treści i jej wpis do spisu treści"""
+        self._toc.append(toc_line)
+        self._body.write(text)
+        self.sections += 1
+
+    def close(self, header, toc_separator='', footer=''):
+        """Składa plik docelowy: nagłówek, spis treści, treść i stopkę"""
+        self._body.close()
+        tmp_path = self.output_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write(header)
+            for line in self._toc:
+                out.write(line)
+            out.write(toc_separator)
+            with open(self._body_path, 'r', encoding='utf-8') as body:
+                shutil.copyfileobj(body, out, COPY_CHUNK_SIZE)
+            out.write(footer)
+        os.replace(tmp_path, self.output_file)
+        os.remove(self._body_path)
+
+    def abort(self):
+        """Porzuca raport i usuwa plik tymczasowy"""
+        self._body.close()
+        if os.path.exists(self._body_path):
+            os.remove(self._body_path)
+
+class FirstUniqueLinks:
+    """Zbiera pierwsze `limit` unikalnych linków według href bez trzymania reszty
+
+    Zachowuje semantykę `{link['href']: link for link in links}`: kolejność
+    według pierwszego wystąpienia, wartość z ostatniego wystąpienia.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._links = {}
+
+    def add(self, link):
+        href = link.get('href')
+        if not href:
+            return
+        if href in self._links or len(self._links) < self.limit:
+            self._links[href] = link
+
+    def __iter__(self):
+        return iter(self._links.values())
+
+    def __bool__(self):
+        return bool(self._links)
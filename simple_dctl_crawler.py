@@ -5,16 +5,113 @@ Używa crawl4ai do pobrania głównej strony i powiązanych stron
 Zapisuje wyniki w formacie markdown z spisem treści
 """
 
+import argparse
 import asyncio
 import json
 import os
 import re
-from urllib.parse import urljoin, urlparse
+import time
+from functools import partial
+from urllib.parse import urlparse
 from datetime import datetime
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from clean_pool import CleaningPool
+from crawl_boilerplate import BoilerplateFilter
+from crawl_browsers import BrowserPool
+from crawl_cache import PageCache
+from crawl_dedupe import DuplicateDetector, simhash
+from crawl_fetch import fetch_many
+from crawl_http import FastPathCrawler
+from crawl_frontier import PriorityFrontier
+from crawl_journal import CrawlJournal
+from crawl_metrics import CODE, EXTRACT, FILTER, LINKS, QUEUE_WAIT, WRITE, CrawlMetrics, run_profiled
+from crawl_politeness import HostScheduler
+from crawl_relevance import LinkScorer, link_contexts, parse_weights
+from crawl_pages import HtmlSpool, PageRecord
+from crawl_sections import SectionStore
+from crawl_store import PageStore, print_search_results
+from crawl_urls import canonical_host, canonicalize_url, same_site, url_key
+from dctl_index import DctlIndex, print_lookup
+from cleaning_packs import FOOTER, MODERATION, NAVIGATION, UI, apply_rule_packs, rule_packs_fingerprint
+from markdown_blocks import MIXINGLIGHT_BLOCK_RULES, clean_markdown_blocks
+from markdown_cleaner import disable_rule_stats, enable_rule_stats, finalize_markdown
+from report_writer import FirstUniqueLinks, StreamingReportWriter
 
-async def crawl_dctl_tutorial():
-    """Główna funkcja crawlowania tutorial DCTL"""
+MAX_CONCURRENCY = 5  # Maksymalna liczba stron pobieranych jednocześnie
+MAX_DEPTH = 1  # Maksymalna głębokość (0 = tylko strona startowa)
+MAX_PAGES = 6  # Maksymalna łączna liczba stron (strona startowa + powiązane)
+MAX_PAGES_PER_HOST = None  # Limit stron na host (None = bez limitu)
+USE_CACHE = True  # Używaj lokalnego cache stron zamiast renderować wszystko od nowa
+CACHE_DIR = ".crawl_cache"  # Katalog cache stron
+CACHE_TTL_SECONDS = 24 * 60 * 60  # Po tym czasie strona jest rewalidowana (ETag/Last-Modified)
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Maksymalny rozmiar cache (najdawniej używane są usuwane)
+CLEANER = "regex"  # Sposób czyszczenia markdown: "regex" lub "blocks" (liniowy, blokowy)
+DEFAULT_PAGE_URL = "https://mixinglight.com/color-grading-tutorials/creative-coding-with-dctl-part-1/"  # Strona, do której dobierane są pakiety reguł, gdy nie podano URL
+CLEAN_WORKERS = None  # Procesy do czyszczenia dużych partii stron (None = liczba rdzeni, 0 = bez puli)
+REPORT_CLEAN_BATCH = 64  # Rozmiar partii stron czyszczonych w puli przez generate_markdown_report
+SPOOL_HTML = True  # Zapisuj surowy i oczyszczony HTML stron na dysk (raport go nie używa)
+SPOOL_DIR = ".crawl_spool"  # Katalog roboczy na HTML stron (podkatalog na każdy przebieg)
+KEEP_SPOOL = False  # Zostaw HTML na dysku po zakończeniu przebiegu
+JOURNAL_FILE = ".crawl_journal/dctl_tutorial.jsonl"  # Dziennik przebiegu do wznawiania (--resume)
+SECTIONS_FILE = ".crawl_sections/dctl_tutorial.db"  # Wyczyszczone sekcje z poprzedniego przebiegu (None = wyłączone)
+BOILERPLATE_FILE = ".crawl_boilerplate/mixinglight_com.json"  # Tabela częstości bloków serwisu (None = bez automatycznego usuwania)
+BOILERPLATE_THRESHOLD = 0.5  # Blok występujący na większym ułamku stron serwisu jest usuwany
+BOILERPLATE_MIN_PAGES = 5  # Liczba stron w tabeli, od której bloki są usuwane
+DEDUPE_PAGES = True  # Pomijaj w raporcie strony niemal identyczne z już zapisanymi (SimHash)
+DEDUPE_MAX_DISTANCE = 3  # Maksymalna liczba różnych bitów odcisku (na 64) dla duplikatu
+SEED_TITLE = "Creative Coding With DCTL: Part 1"  # Tytuł strony startowej - wzorzec trafności linków
+SEED_KEYWORDS = ("dctl", "part")  # Dodatkowe słowa kluczowe serii
+SCORE_WEIGHTS = {}  # Wagi oceny trafności linków (puste = crawl_relevance.DEFAULT_WEIGHTS), np. {'nav': -5}
+LINK_MIN_SCORE = 1.0  # Linki z niższą oceną nie trafiają do kolejki (None = wszystkie linki serwisu)
+BROWSER_POOL_SIZE = 2  # Liczba instancji przeglądarki pobierających strony na zmianę
+BROWSER_TABS = 3  # Maksymalna liczba stron pobieranych jednocześnie przez jedną instancję
+BROWSER_MAX_PAGES = 200  # Po tylu stronach instancja przeglądarki jest restartowana (None = bez limitu)
+BROWSER_MAX_RSS_MB = 1536  # Restart instancji po przekroczeniu tej pamięci jej procesów (None = bez limitu)
+PAGE_TIMEOUT_SECONDS = 120  # Strona pobierana dłużej jest porzucana, a jej przeglądarka restartowana
+FAST_PATH = True  # Strony statycznych domen pobieraj zwykłym HTTP, bez renderowania w przeglądarce
+FAST_PATH_FILE = ".crawl_fastpath.json"  # Wyuczone decyzje szybkiej ścieżki per domena
+FAST_PATH_TRIAL_PAGES = 3  # Strony domeny pobierane obiema ścieżkami przed decyzją
+FAST_PATH_MIN_YIELD = 0.8  # Minimalny stosunek ilości tekstu szybkiej ścieżki do przeglądarki
+HOST_REQUESTS_PER_SECOND = 4.0  # Limit tempa zapytań do jednego hosta (None = bez limitu)
+HOST_MAX_CONCURRENCY = MAX_CONCURRENCY  # Górna granica adaptacyjnego okna współbieżności hosta
+FETCH_RETRIES = 3  # Ponowienia po 429/5xx/przekroczeniu czasu (z wykładniczym opóźnieniem i Retry-After)
+RETRY_BASE_SECONDS = 1.0  # Opóźnienie pierwszego ponowienia (losowane z [0, podwajane co próbę])
+METRICS_FILE = "crawl_metrics.json"  # Metryki etapów (histogramy i czasy każdej strony) w JSON (None = bez zapisu)
+METRICS_PROM_FILE = "crawl_metrics.prom"  # Te same metryki w formacie tekstowym Prometheusa (None = bez zapisu)
+PROFILE_FILE = "crawl_profile"  # Przedrostek pliku profilu (--profile), rozszerzenie zależy od profilera
+OUTPUT = "markdown"  # Wynik: "markdown" (dctl_tutorial_complete.md), "sqlite" (baza stron z FTS5) lub "both"
+PAGE_STORE_FILE = "crawl_pages.db"  # Baza SQLite ze stronami (raport można z niej wygenerować: --report-from-store)
+PAGE_STORE_BATCH = 100  # Strony zapisywane do bazy w jednej transakcji
+STORE_SITE = "dctl_tutorial"  # Nazwa serwisu tutorialu w bazie stron
+SEARCH_LIMIT = 20  # Liczba wyników --search
+DCTL_INDEX_FILE = "dctl_index.db"  # Indeks symbol → fragment kodu DCTL → źródło (None = bez indeksu)
+DCTL_FILES = ("resolve-dctl-master/*.dctl", "Halation_2.dctl")  # Pliki DCTL dołączane do indeksu (wzorce glob)
+DCTL_FILES_ROOT = os.path.dirname(os.path.abspath(__file__))  # Katalog, względem którego są wzorce DCTL_FILES
+RULE_STATS = False  # Zbieraj statystyki reguł czyszczenia (trafienia, usunięte znaki, czas)
+RULE_STATS_FILE = "rule_stats.json"  # Plik JSON ze statystykami reguł
+RULE_STATS_TOP = 15  # Liczba reguł w tabeli na końcu przebiegu
+
+async def crawl_dctl_tutorial(resume=False, rule_stats=RULE_STATS, weights=None, output=None):
+    """Główna funkcja crawlowania tutorial DCTL
+
+    Z `resume=True` przebieg jest odtwarzany z dziennika: ukończone strony
+    trafiają do raportu bez ponownego pobierania, a reszta kolejki jest
+    pobierana dalej.
+
+    `rule_stats=True` włącza pomiar reguł czyszczenia; zbiorcze wyniki ze
+    wszystkich czyszczonych stron trafiają do RULE_STATS_FILE i tabeli na
+    końcu przebiegu (strony z niezmienionymi sekcjami nie są czyszczone).
+
+    Linki serwisu są oceniane względem SEED_TITLE, SEED_KEYWORDS i treści
+    strony startowej (crawl_relevance.LinkScorer); do kolejki trafiają te
+    z oceną co najmniej LINK_MIN_SCORE, a budżet MAX_PAGES - najlepszym
+    z nich. `weights` nadpisuje SCORE_WEIGHTS w tym przebiegu.
+
+    `output` (domyślnie OUTPUT) wybiera wynik: raport markdown, bazę stron
+    PAGE_STORE_FILE (crawl_store.PageStore, serwis STORE_SITE) albo oba.
+    Kod DCTL z oczyszczonych stron i plików DCTL_FILES trafia do indeksu
+    symboli DCTL_INDEX_FILE (dctl_index.DctlIndex).
+    """
     
     start_url = "https://mixinglight.com/color-grading-tutorials/creative-coding-with-dctl-part-1/"
     
@@ -22,6 +119,9 @@ async def crawl_dctl_tutorial():
     print(f"URL startowy: {start_url}")
     print("")
     
+    # Opcjonalny pomiar reguł czyszczenia (zbiorczo dla całego przebiegu)
+    stats = enable_rule_stats() if rule_stats else None
+    
     # Konfiguracja crawlera
     config = CrawlerRunConfig(
         word_count_threshold=10,
@@ -29,187 +129,561 @@ async def crawl_dctl_tutorial():
         verbose=True
     )
     
-    # Lista do przechowywania wyników
-    crawled_data = []
+    # Raport zapisywany na bieżąco - strony nie są trzymane w pamięci
+    output_file = "dctl_tutorial_complete.md"
+    # Niezmienione strony używają sekcji wyczyszczonych w poprzednim przebiegu
+    sections = SectionStore(SECTIONS_FILE, cleaner=cleaner_fingerprint()) if SECTIONS_FILE else None
+    output = output or OUTPUT
+    report = DctlTutorialReport(output_file) if output != "sqlite" else None
+    
+    # Strony w bazie SQLite z indeksem pełnotekstowym - zapisywane partiami
+    store = PageStore(PAGE_STORE_FILE, batch_size=PAGE_STORE_BATCH) if output != "markdown" else None
+    written = 0
+    
+    def save_page(page, content, fetched_at=None, restored=False):
+        """Zapisuje wyczyszczoną stronę do raportu i/lub bazy stron"""
+        nonlocal written
+        if report is not None:
+            report.add_page(page, content=content)
+        if store is not None:
+            store.add(STORE_SITE, page.url, page.title, page.depth, page.markdown, content, {
+                'images': list(page.images[:10]),
+                'external_links': list(page.external_links)
+            }, fetched_at=fetched_at, restored=restored)
+        written += 1
+    
+    # Fragmenty kodu DCTL ze stron i plików repozytorium - aktualizowane przyrostowo
+    index = DctlIndex(DCTL_INDEX_FILE) if DCTL_INDEX_FILE else None
+    if index is not None:
+        index.add_files(DCTL_FILES, DCTL_FILES_ROOT)
+    
+    def close_outputs(abort=False):
+        if report is not None and abort:
+            report.abort()
+        if store is not None:
+            store.close()
+        if index is not None:
+            index.close()
+    
+    # Bloki powtarzające się na większości stron serwisu są usuwane automatycznie
+    boilerplate = BoilerplateFilter(
+        BOILERPLATE_FILE, threshold=BOILERPLATE_THRESHOLD, min_pages=BOILERPLATE_MIN_PAGES
+    ) if BOILERPLATE_FILE else None
+    
+    # Czasy etapów każdej strony (kolejka, pobieranie, czyszczenie, zapis...)
+    metrics = CrawlMetrics()
+    
+    # Czyszczenie jest pracą CPU - duże partie trafiają do puli procesów
+    pool = CleaningPool(partial(clean_page_markdown, cleaner=CLEANER), CLEAN_WORKERS, metrics=metrics)
+    
+    # HTML stron trafia na dysk, w pamięci zostają tylko lekkie rekordy
+    spool = HtmlSpool(SPOOL_DIR) if SPOOL_HTML else None
+    
+    # Niemal identyczne strony są pomijane, a adresy podobne do nich pobierane na końcu
+    duplicates = DuplicateDetector(max_distance=DEDUPE_MAX_DISTANCE) if DEDUPE_PAGES else None
+    
+    cache = PageCache(CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES) if USE_CACHE else None
+    
+    scorer = LinkScorer(SEED_TITLE, keywords=SEED_KEYWORDS, weights={**SCORE_WEIGHTS, **(weights or {})})
+    
+    frontier = PriorityFrontier(
+        scorer,
+        max_depth=MAX_DEPTH,
+        max_pages=MAX_PAGES,
+        max_pages_per_host=MAX_PAGES_PER_HOST,
+        deprioritize=duplicates.is_suspect if duplicates is not None else None,
+        min_score=LINK_MIN_SCORE
+    )
     
-    async with AsyncWebCrawler(verbose=True) as crawler:
+    journal = CrawlJournal(JOURNAL_FILE)
+    queued_at = {}  # URL → chwila dodania do kolejki (czas oczekiwania w metrykach)
+    
+    def schedule(url, depth, **info):
+        """Dodaje URL do kolejki i zapisuje to w dzienniku"""
+        if frontier.add(url, depth=depth, **info):
+            journal.queued(url, depth, **info)
+            queued_at.setdefault(url, time.perf_counter())
+            return True
+        return False
+    
+    state = journal.load() if resume else None
+    resumed = state is not None and state.start_url == start_url
+    if store is not None:
+        store.begin(STORE_SITE, start_url, resume=resumed)
+    if resumed:
+        # Wzorzec trafności ze strony startowej przed odtworzeniem kolejki - linki są przy tym oceniane od nowa
+        root = next((saved for saved in state.pages.values() if saved is not None and saved['depth'] == 0), None)
+        if root is not None:
+            scorer.set_seed(SEED_TITLE, root['content'])
+        state.restore_frontier(frontier)
+        for url, saved in state.pages.items():
+            if sections is not None:
+                sections.keep(url)
+            if saved is None:
+                continue  # Duplikat pominięty w raporcie
+            if duplicates is not None:
+                # Odcisk z dziennika (sprzed filtra boilerplate); starszy dziennik ma tylko treść
+                duplicates.check(url, saved['content'], saved.get('fingerprint'))
+            page = PageRecord(
+                url, saved['title'], saved.get('raw_markdown') or '', saved['depth'],
+                tuple(saved['images']), tuple(saved['external_links'])
+            )
+            # Strony z niezapisanej partii bazy wracają do niej z dziennika w całości
+            save_page(page, saved['content'], saved.get('fetched_at'), restored='raw_markdown' not in saved)
+            if index is not None:
+                index.add_markdown(url, saved['content'])
+        journal.open(start_url, resume=True)
+        print(f"♻️ Wznowiono przebieg: {len(state.pages)} ukończonych stron, {len(frontier)} w kolejce")
+    else:
+        if resume:
+            print("⚠️ Brak dziennika dla tego URL - zaczynam od nowa")
+        journal.open(start_url)
+    
+    if start_url not in frontier:
+        schedule(start_url, 0, text=SEED_TITLE, title='')
+    
+    known_patterns = 0
+    async with browser_pool(metrics) as browsers:
+        fast = fast_path(browsers, metrics)
+        crawler = host_scheduler(fast)
         try:
-            print("Pobieranie głównej strony...")
-            result = await crawler.arun(url=start_url, config=config)
-            
-            if result.success:
-                print(f"✅ Pomyślnie pobrano główną stronę")
-                print(f"Rozmiar HTML: {len(result.html)} znaków")
-                print(f"Rozmiar Markdown: {len(result.markdown.raw_markdown) if result.markdown else 0} znaków")
+            while frontier:
+                batch = frontier.pop_batch(MAX_CONCURRENCY)
+                if not batch:
+                    break
+                now = time.perf_counter()
+                for entry in batch:
+                    if entry['url'] in queued_at:
+                        metrics.record(QUEUE_WAIT, now - queued_at.pop(entry['url']), url=entry['url'])
+                if batch[0]['depth'] == 0:
+                    print("Pobieranie głównej strony...")
+                else:
+                    print(f"Pobieranie {len(batch)} stron (maks. {MAX_CONCURRENCY} jednocześnie)...")
                 
-                # Zapisujemy dane głównej strony
-                main_page_data = {
-                    'url': start_url,
-                    'title': 'Creative Coding With DCTL: Part 1',
-                    'html': result.html,
-                    'markdown': result.markdown.raw_markdown if result.markdown else '',
-                    'cleaned_html': result.cleaned_html or '',
-                    'links': result.links,
-                    'media': result.media,
-                    'metadata': result.metadata or {},
-                    'depth': 0
-                }
-                crawled_data.append(main_page_data)
+                results = await fetch_many(
+                    crawler, [entry['url'] for entry in batch], config, max_concurrency=MAX_CONCURRENCY, cache=cache,
+                    metrics=metrics
+                )
                 
-                # Szukamy linków do innych części serii DCTL
-                dctl_links = []
-                if result.links and 'internal' in result.links:
-                    for link in result.links['internal']:
-                        href = link.get('href', '')
-                        text = link.get('text', '').lower()
-                        
-                        if ('dctl' in href.lower() or 'dctl' in text) and 'part' in text:
-                            full_url = urljoin(start_url, href)
-                            if full_url not in [start_url]:  # Nie duplikujemy głównej strony
-                                dctl_links.append({
-                                    'url': full_url,
-                                    'text': link.get('text', ''),
-                                    'title': link.get('title', '')
-                                })
+                fetched = []
+                for link_info, sub_result in zip(batch, results):
+                    depth = link_info['depth']
+                    
+                    if isinstance(sub_result, Exception):
+                        if depth == 0:
+                            raise sub_result
+                        print(f"❌ Wyjątek podczas pobierania {link_info['url']}: {str(sub_result)}")
+                        continue
+                    if not sub_result.success:
+                        if depth == 0:
+                            print(f"❌ Błąd pobierania głównej strony: {sub_result.error_message}")
+                            close_outputs(abort=True)
+                            journal.close()
+                            pool.close()
+                            if spool is not None:
+                                spool.cleanup()
+                            if sections is not None:
+                                sections.close()
+                            return
+                        print(f"❌ Błąd pobierania: {link_info['url']}")
+                        continue
+                    
+                    if depth == 0:
+                        print(f"✅ Pomyślnie pobrano główną stronę")
+                        print(f"Rozmiar HTML: {len(sub_result.html)} znaków")
+                        print(f"Rozmiar Markdown: {len(sub_result.markdown.raw_markdown) if sub_result.markdown else 0} znaków")
+                    else:
+                        print(f"✅ Pobrano: {link_info['text']}")
+                    
+                    with metrics.timer(EXTRACT, link_info['url'], len(sub_result.html or '')) as sizes:
+                        page = PageRecord.from_result(
+                            link_info['url'],
+                            link_info['text'] or f'DCTL Tutorial Part {written + len(fetched) + 1}',
+                            depth,
+                            sub_result,
+                            spool=spool
+                        )
+                        sizes['bytes_out'] = len(page.markdown)
+                    fetched.append((page, sub_result.links))
                 
-                print(f"Znaleziono {len(dctl_links)} powiązanych linków DCTL")
+                # Czyścimy całą partię naraz - duże partie w puli procesów,
+                # niezmienione strony biorą sekcję z poprzedniego przebiegu
+                contents = await pool.clean_pages_async([(page.url, page.markdown) for page, _ in fetched], sections)
                 
-                # Crawlujemy powiązane strony (maksymalnie 5)
-                for i, link_info in enumerate(dctl_links[:5]):
-                    try:
-                        print(f"Pobieranie strony {i+1}/{min(len(dctl_links), 5)}: {link_info['text']}")
-                        sub_result = await crawler.arun(url=link_info['url'], config=config)
+                for (page, links), content in zip(fetched, contents):
+                    with metrics.timer(FILTER, page.url, len(content)) as sizes:
+                        # Odcisk treści sprzed filtra boilerplate - wynik filtra zmienia się, gdy tabela bloków rośnie
+                        fingerprint = simhash(content) if duplicates is not None else None
+                        if boilerplate is not None:
+                            content = boilerplate.filter(content)
                         
-                        if sub_result.success:
-                            sub_page_data = {
-                                'url': link_info['url'],
-                                'title': link_info['text'] or f'DCTL Tutorial Part {i+2}',
-                                'html': sub_result.html,
-                                'markdown': sub_result.markdown.raw_markdown if sub_result.markdown else '',
-                                'cleaned_html': sub_result.cleaned_html or '',
-                                'links': sub_result.links,
-                                'media': sub_result.media,
-                                'metadata': sub_result.metadata or {},
-                                'depth': 1
-                            }
-                            crawled_data.append(sub_page_data)
-                            print(f"✅ Pobrano: {link_info['text']}")
-                        else:
-                            print(f"❌ Błąd pobierania: {link_info['url']}")
-                            
-                    except Exception as e:
-                        print(f"❌ Wyjątek podczas pobierania {link_info['url']}: {str(e)}")
-                        
-            else:
-                print(f"❌ Błąd pobierania głównej strony: {result.error_message}")
-                return
+                        # Niemal identyczna kopia zapisanej już strony (np. paginacja komentarzy)
+                        # nie trafia do raportu, a jej linki nie są dodawane do kolejki
+                        original = duplicates.check(page.url, fingerprint=fingerprint) if duplicates is not None else None
+                        sizes['bytes_out'] = len(content)
+                    if original is not None:
+                        print(f"♊ Pominięto duplikat: {page.url} (≈ {original})")
+                        journal.done(page.url, None)
+                        continue
+                    
+                    write_start = time.perf_counter()
+                    fetched_at = time.time()
+                    save_page(page, content, fetched_at)
+                    write_seconds = time.perf_counter() - write_start
+                    if page.depth == 0:
+                        scorer.set_seed(SEED_TITLE, content)
+                    
+                    if index is not None:
+                        with metrics.timer(CODE, page.url, len(content)):
+                            index.add_markdown(page.url, content)
+                    
+                    # Linki serwisu oceniamy względem serii DCTL - do kolejki trafiają
+                    # wystarczająco trafne, a pobierane są najpierw najlepsze
+                    with metrics.timer(LINKS, page.url, len(content)):
+                        dctl_links = find_dctl_links(links, page.url, link_contexts(content))
+                        added = sum(
+                            schedule(l['url'], page.depth + 1, text=l['text'], title=l['title'], context=l['context'])
+                            for l in dctl_links
+                        )
+                    print(f"Znaleziono {len(dctl_links)} linków serwisu ({added} trafnych nowych w kolejce)")
+                    
+                    # Stronę oznaczamy jako ukończoną dopiero po zapisaniu jej linków w dzienniku
+                    write_start = time.perf_counter()
+                    journal.done(page.url, {
+                        'title': page.title,
+                        'depth': page.depth,
+                        'content': content,
+                        'images': page.images[:10],  # Raport używa najwyżej 10 obrazów
+                        'external_links': page.external_links,
+                        'raw_markdown': page.markdown,  # Baza stron zapisuje partiami - po przerwaniu odtwarzana z dziennika
+                        'fetched_at': fetched_at,
+                        'fingerprint': fingerprint  # Odcisk duplikatów sprzed filtra boilerplate
+                    })
+                    write_seconds += time.perf_counter() - write_start
+                    metrics.record(WRITE, write_seconds, len(content), len(content), url=page.url)
+                
+                # Nowo wykryte wzorce duplikatów - podobne adresy z kolejki idą na koniec
+                if duplicates is not None and duplicates.patterns != known_patterns:
+                    known_patterns = duplicates.patterns
+                    frontier.defer_matching()
                 
         except Exception as e:
             print(f"❌ Błąd krytyczny: {str(e)}")
+            close_outputs(abort=True)
+            journal.close()
+            pool.close()
+            if spool is not None and not KEEP_SPOOL:
+                spool.cleanup()
+            if cache is not None:
+                cache.save()
+            if fast is not browsers:
+                fast.save()
+            if sections is not None:
+                sections.close()
+            save_metrics(metrics)
             return
     
-    # Generowanie raportu markdown
-    print(f"\n📝 Generowanie raportu markdown...")
-    markdown_content = generate_markdown_report(crawled_data)
+        print(browsers.summary())
     
-    # Zapisywanie do pliku
-    output_file = "dctl_tutorial_complete.md"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(markdown_content)
-    
-    print(f"✅ Raport zapisany do: {output_file}")
-    print(f"📊 Pobrano łącznie {len(crawled_data)} stron")
-    print(f"📏 Rozmiar pliku: {os.path.getsize(output_file)} bajtów")
-
-def generate_markdown_report(crawled_data):
-    """Generuje raport markdown z pobranych danych"""
-    
-    if not crawled_data:
-        return "Brak danych do wygenerowania raportu."
-    
-    markdown_lines = []
-    
-    # Nagłówek
-    markdown_lines.append("# DCTL (DaVinci Color Transform Language) - Kompletny Przewodnik")
-    markdown_lines.append("")
-    markdown_lines.append(f"*Wygenerowano: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-    markdown_lines.append("")
-    markdown_lines.append("**Źródło:** [Mixing Light - Creative Coding With DCTL](https://mixinglight.com/color-grading-tutorials/creative-coding-with-dctl-part-1/)")
-    markdown_lines.append("")
-    markdown_lines.append("---")
-    markdown_lines.append("")
-    
-    # Spis treści
-    markdown_lines.append("## 📋 Spis Treści")
-    markdown_lines.append("")
-    
-    for i, page in enumerate(crawled_data, 1):
-        title = clean_title(page['title'])
-        anchor = create_anchor(title)
-        indent = "  " * page['depth']
-        markdown_lines.append(f"{indent}- [{i}. {title}](#{anchor})")
-    
-    markdown_lines.append("")
-    markdown_lines.append("---")
-    markdown_lines.append("")
-    
-    # Zawartość stron
-    for i, page in enumerate(crawled_data, 1):
-        title = clean_title(page['title'])
-        depth_prefix = "#" * (page['depth'] + 2)
-        
-        markdown_lines.append(f"{depth_prefix} {i}. {title}")
-        markdown_lines.append("")
-        markdown_lines.append(f"**URL:** {page['url']}")
-        markdown_lines.append("")
-        
-        # Główna zawartość markdown
-        if page['markdown']:
-            cleaned_markdown = clean_markdown_content(page['markdown'])
-            markdown_lines.append(cleaned_markdown)
+    print(crawler.summary())
+    if fast is not browsers:
+        fast.save()
+        print(fast.summary())
+    
+    journal.close()
+    pool.close()
+    save_metrics(metrics)
+    
+    if sections is not None:
+        if written:
+            sections.save()
+            print(sections.summary())
         else:
-            markdown_lines.append("*Brak zawartości markdown*")
-        
-        markdown_lines.append("")
-        markdown_lines.append("---")
-        markdown_lines.append("")
+            sections.close()  # Pusty przebieg nie usuwa sekcji poprzedniego
+    
+    if boilerplate is not None:
+        boilerplate.save()
+        print(boilerplate.summary())
     
-    # Dodatek - informacje o mediach i linkach
-    markdown_lines.append("## 📎 Dodatek - Zasoby i Linki")
-    markdown_lines.append("")
+    if duplicates is not None:
+        print(duplicates.summary())
     
-    all_images = []
-    all_external_links = []
+    if cache is not None:
+        cache.save()
+        print(cache.summary())
     
-    for page in crawled_data:
-        if page['media'] and 'images' in page['media']:
-            all_images.extend(page['media']['images'])
+    if spool is not None:
+        if KEEP_SPOOL:
+            print(f"🗂️ HTML stron zapisany w: {spool.path}")
+        else:
+            spool.cleanup()
+    
+    if store is not None:
+        print(store.summary())
+    if index is not None:
+        print(index.summary())
+    close_outputs(abort=not written)
+    if not written:
+        print("❌ Błąd pobierania głównej strony")
+        return
+    
+    if report is not None:
+        # Domykanie raportu markdown (sekcje stron są już zapisane)
+        print(f"\n📝 Generowanie raportu markdown...")
+        report.finish()
+        print(f"✅ Raport zapisany do: {output_file}")
+    else:
+        print(f"\n🗄️ Strony zapisane w bazie: {PAGE_STORE_FILE} (raport: --report-from-store)")
+    print(f"📊 Pobrano łącznie {written} stron")
+    if report is not None:
+        print(f"📏 Rozmiar pliku: {os.path.getsize(output_file)} bajtów")
+    
+    if stats is not None:
+        disable_rule_stats()
+        stats.save(RULE_STATS_FILE)
+        print(stats.table(RULE_STATS_TOP))
+        print(f"📈 Statystyki reguł zapisane do: {RULE_STATS_FILE}")
+
+def browser_pool(metrics=None):
+    """Pula przeglądarek z restartami po limicie stron/pamięci i zawieszonych stronach"""
+    return BrowserPool(
+        partial(AsyncWebCrawler, verbose=True),
+        size=BROWSER_POOL_SIZE,
+        tabs=BROWSER_TABS,
+        max_pages=BROWSER_MAX_PAGES,
+        max_rss_bytes=BROWSER_MAX_RSS_MB * 1024 * 1024 if BROWSER_MAX_RSS_MB else None,
+        page_timeout=PAGE_TIMEOUT_SECONDS,
+        metrics=metrics
+    )
+
+def host_scheduler(crawler):
+    """Limity tempa i adaptacyjna współbieżność per host oraz ponowienia nieudanych pobrań"""
+    return HostScheduler(
+        crawler,
+        rate=HOST_REQUESTS_PER_SECOND,
+        max_concurrency=HOST_MAX_CONCURRENCY,
+        retries=FETCH_RETRIES,
+        backoff_base=RETRY_BASE_SECONDS
+    )
+
+def fast_path(crawler, metrics=None):
+    """Szybka ścieżka HTTP przed przeglądarką (FAST_PATH) albo sam `crawler`"""
+    if not FAST_PATH:
+        return crawler
+    return FastPathCrawler(
+        crawler, FAST_PATH_FILE, trial_pages=FAST_PATH_TRIAL_PAGES, min_yield=FAST_PATH_MIN_YIELD,
+        metrics=metrics
+    )
+
+def save_metrics(metrics):
+    """Wypisuje tabelę etapów i zapisuje metryki (METRICS_FILE, METRICS_PROM_FILE)"""
+    print(metrics.table())
+    if METRICS_FILE:
+        metrics.save_json(METRICS_FILE)
+        print(f"⏱️ Metryki zapisane do: {METRICS_FILE}")
+    if METRICS_PROM_FILE:
+        metrics.save_prometheus(METRICS_PROM_FILE)
+
+def find_dctl_links(links, base_url, contexts=None):
+    """Znajduje kandydatów na kolejne części serii DCTL - linki wewnętrzne serwisu
+
+    Linki są kanonizowane (crawl_urls.canonicalize_url), a warianty tego
+    samego adresu zwracane tylko raz. O tym, które z nich są częściami serii,
+    decyduje ocena trafności (crawl_relevance.LinkScorer) zamiast sztywnego
+    warunku "dctl" i "part" w tekście. `contexts` ({href: linia treści},
+    crawl_relevance.link_contexts) dodaje do linków pole `context`.
+    """
+    dctl_links = []
+    if not links or 'internal' not in links:
+        return dctl_links
+    
+    base_host = urlparse(base_url).hostname
+    seen = {url_key(base_url)}  # Nie duplikujemy bieżącej strony
+    for link in links['internal']:
+        href = link.get('href', '')
+        full_url = canonicalize_url(href, base_url)
+        if full_url is None or not same_site(canonical_host(full_url), base_host):
+            continue
+        key = url_key(full_url, canonical=True)
+        if key not in seen:
+            seen.add(key)
+            dctl_links.append({
+                'url': full_url,
+                'text': link.get('text', ''),
+                'title': link.get('title', ''),
+                'context': contexts.get(href, '') if contexts else ''
+            })
+    
+    return dctl_links
+
+class DctlTutorialReport(StreamingReportWriter):
+    """Raport markdown tutorialu DCTL zapisywany strona po stronie"""
+
+    def __init__(self, output_file, sections=None):
+        super().__init__(output_file)
+        self.section_store = sections
+        self.images = []
+        self.has_images = False
+        self.external_links = FirstUniqueLinks(15)
+        self.has_external_links = False
+
+    def add_page(self, page, content=None):
+        """Czyści i zapisuje sekcję strony, zapamiętując zasoby do dodatku
+
+        `content` pozwala podać gotową (już wyczyszczoną) treść sekcji, np.
+        odczytaną z dziennika. Jeśli raport ma magazyn sekcji
+        (crawl_sections.SectionStore), niezmienione strony nie są czyszczone
+        ponownie. Zwraca treść zapisaną w sekcji.
+        """
+        i = self.sections + 1
+        title = clean_title(page.title)
+        indent = "  " * page.depth
+        depth_prefix = "#" * min(page.depth + 2, 6)
+        
+        section_lines = [f"{depth_prefix} {i}. {title}", "", f"**URL:** {page.url}", ""]
+        
+        # Główna zawartość markdown
+        if content is None:
+            if self.section_store is not None:
+                content = self.section_store.clean(page.url, page.markdown, partial(clean_page_markdown, url=page.url))
+            else:
+                content = clean_page_markdown(page.markdown, url=page.url)
+        section_lines.append(content)
+        
+        section_lines.extend(["", "---", ""])
+        self.add_section(f"{indent}- [{i}. {title}](#{create_anchor(title)})\n", "\n".join(section_lines) + "\n")
+        
+        # Zasoby do dodatku - tylko tyle, ile trafi do raportu
+        if page.images:
+            self.has_images = True
+            self.images.extend(page.images[:10 - len(self.images)])
+        
+        for link in page.external_links:
+            self.has_external_links = True
+            self.external_links.add(link)
+        
+        return content
+
+    def finish(self):
+        """Dopisuje nagłówek, spis treści i dodatek z zasobami"""
+        header_lines = [
+            "# DCTL (DaVinci Color Transform Language) - Kompletny Przewodnik",
+            "",
+            f"*Wygenerowano: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*",
+            "",
+            "**Źródło:** [Mixing Light - Creative Coding With DCTL](https://mixinglight.com/color-grading-tutorials/creative-coding-with-dctl-part-1/)",
+            "",
+            "---",
+            "",
+            # Spis treści
+            "## 📋 Spis Treści",
+            "",
+        ]
+        
+        # Dodatek - informacje o mediach i linkach
+        footer_lines = ["## 📎 Dodatek - Zasoby i Linki", ""]
+        
+        if self.has_images:
+            footer_lines.append("### 🖼️ Obrazy")
+            footer_lines.append("")
+            for img in self.images:  # Maksymalnie 10 obrazów
+                src = img.get('src', '')
+                alt = img.get('alt', 'Obraz')
+                if src:
+                    footer_lines.append(f"- ![{alt}]({src})")
+            footer_lines.append("")
         
-        if page['links'] and 'external' in page['links']:
-            all_external_links.extend(page['links']['external'])
-    
-    if all_images:
-        markdown_lines.append("### 🖼️ Obrazy")
-        markdown_lines.append("")
-        for img in all_images[:10]:  # Maksymalnie 10 obrazów
-            src = img.get('src', '')
-            alt = img.get('alt', 'Obraz')
-            if src:
-                markdown_lines.append(f"- ![{alt}]({src})")
-        markdown_lines.append("")
-    
-    if all_external_links:
-        markdown_lines.append("### 🔗 Linki zewnętrzne")
-        markdown_lines.append("")
-        unique_links = {link['href']: link for link in all_external_links if link.get('href')}.values()
-        for link in list(unique_links)[:15]:  # Maksymalnie 15 linków
-            href = link.get('href', '')
-            text = link.get('text', href)
-            if href:
-                markdown_lines.append(f"- [{text}]({href})")
-        markdown_lines.append("")
-    
-    return "\n".join(markdown_lines)
+        if self.has_external_links:
+            footer_lines.append("### 🔗 Linki zewnętrzne")
+            footer_lines.append("")
+            for link in self.external_links:  # Maksymalnie 15 linków
+                href = link.get('href', '')
+                text = link.get('text', href)
+                if href:
+                    footer_lines.append(f"- [{text}]({href})")
+            footer_lines.append("")
+        
+        self.close("\n".join(header_lines) + "\n", toc_separator="\n---\n\n", footer="\n".join(footer_lines))
+
+def generate_markdown_report(crawled_data, output_file, sections=None, pool=None):
+    """Zapisuje raport markdown z pobranych danych do pliku
+
+    `crawled_data` może być dowolnym iterowalnym źródłem rekordów stron
+    (crawl_pages.PageRecord) - strony są zapisywane po kolei, bez składania
+    całego raportu w pamięci. Z `sections` niezmienione strony dostają
+    sekcje z poprzedniego przebiegu, a czyszczone są tylko zmienione.
+    Z `pool` (clean_pool.CleaningPool) strony są czyszczone partiami
+    po REPORT_CLEAN_BATCH w puli procesów.
+    """
+    report = DctlTutorialReport(output_file, sections=sections)
+    if pool is None:
+        for page in crawled_data:
+            report.add_page(page)
+    else:
+        for batch in _batches(crawled_data, REPORT_CLEAN_BATCH):
+            contents = pool.clean_pages([(page.url, page.markdown) for page in batch], sections)
+            for page, content in zip(batch, contents):
+                report.add_page(page, content=content)
+    
+    if not report.sections:
+        report.abort()
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write("Brak danych do wygenerowania raportu.")
+        return output_file
+    
+    report.finish()
+    return output_file
+
+def report_from_store(output_file="dctl_tutorial_complete.md", store_file=PAGE_STORE_FILE):
+    """Generuje raport tutorialu z bazy stron (ostatni przebieg STORE_SITE, kolejność jak w crawlu)"""
+    with PageStore(store_file) as store:
+        report = DctlTutorialReport(output_file)
+        for row in store.pages(STORE_SITE):
+            meta = row['meta']
+            page = PageRecord(
+                row['url'], row['title'], row['raw_markdown'], row['depth'],
+                tuple(meta.get('images', ())), tuple(meta.get('external_links', ()))
+            )
+            report.add_page(page, content=row['markdown'])
+    if not report.sections:
+        report.abort()
+        print(f"❌ Brak stron tutorialu w bazie {store_file}")
+        return None
+    report.finish()
+    print(f"✅ Raport zapisany do: {output_file} ({report.sections} stron z bazy {store_file})")
+    return output_file
+
+def lookup_dctl(symbol, index_file=DCTL_INDEX_FILE):
+    """Wypisuje fragmenty kodu DCTL z symbolem (najpierw definicje) po odświeżeniu plików DCTL_FILES"""
+    with DctlIndex(index_file) as index:
+        index.add_files(DCTL_FILES, DCTL_FILES_ROOT)
+        results = index.lookup(symbol)
+    print_lookup(symbol, results)
+    return results
+
+def search_store(query, limit=SEARCH_LIMIT, store_file=PAGE_STORE_FILE):
+    """Wyszukiwanie pełnotekstowe w bazie stron (składnia FTS5)"""
+    with PageStore(store_file) as store:
+        results = store.search(query, limit=limit)
+    print_search_results(results)
+    return results
+
+def _batches(items, size):
+    """Dzieli iterowalne źródło na listy po `size` elementów"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def clean_page_markdown(markdown, cleaner=None, url=None):
+    """Czyści markdown strony do treści sekcji raportu"""
+    if not markdown:
+        return "*Brak zawartości markdown*"
+    return clean_markdown_content(markdown, cleaner, url)
 
 def clean_title(title):
     """Czyści tytuł z niepotrzebnych znaków"""
@@ -230,196 +704,81 @@ def create_anchor(title):
     anchor = re.sub(r'[-\s]+', '-', anchor).strip('-')
     return anchor
 
-def clean_markdown_content(content):
-    """Czyści zawartość markdown z niepotrzebnych elementów"""
+def clean_markdown_content(content, cleaner=None, url=None):
+    """Czyści zawartość markdown z niepotrzebnych elementów
+
+    `cleaner` wybiera implementację: "regex" (wzorce) lub "blocks"
+    (blokowa, liniowa); domyślnie używana jest wartość CLEANER.
+    `url` strony decyduje o pakietach reguł (domyślnie DEFAULT_PAGE_URL).
+    """
     if not content:
         return ""
     
-    # Usuwamy elementy nawigacyjne i menu
-    content = remove_navigation_elements(content)
+    if (cleaner or CLEANER) == "blocks":
+        return clean_markdown_blocks(content, MIXINGLIGHT_BLOCK_RULES)
     
-    # Usuwamy elementy moderacyjne i zgłaszania
-    content = remove_moderation_elements(content)
+    # Usuwamy elementy nawigacyjne, moderacyjne, stopki i UI - pakietami reguł
+    # dobranymi do hosta strony i języka treści (rule_packs/)
+    content = apply_rule_packs(content, url or DEFAULT_PAGE_URL)
     
-    # Usuwamy elementy stopki i kontaktu
-    content = remove_footer_elements(content)
-    
-    # Usuwamy powtarzające się elementy UI
-    content = remove_ui_elements(content)
-    
-    # Usuwamy nadmiarowe puste linie
-    content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
-    
-    # Usuwamy długie ciągi spacji
-    content = re.sub(r' {3,}', ' ', content)
-    
-    # Usuwamy znaki kontrolne
-    content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
-    
-    return content.strip()
+    # Usuwamy nadmiarowe puste linie, długie ciągi spacji i znaki kontrolne
+    return finalize_markdown(content)
+
+def cleaner_fingerprint(cleaner=None):
+    """Sposób czyszczenia z odciskiem aktywnych reguł, np. "regex:3f2a9c..."
 
-def remove_navigation_elements(content):
+    Sekcje zapisane z innym odciskiem (po edycji rule_packs/*.json albo
+    reguł blokowych) są czyszczone ponownie.
+    """
+    cleaner = cleaner or CLEANER
+    rules = MIXINGLIGHT_BLOCK_RULES.fingerprint() if cleaner == "blocks" else rule_packs_fingerprint()
+    return f"{cleaner}:{rules[:16]}"
+
+def remove_navigation_elements(content, url=None):
     """Usuwa elementy nawigacyjne i menu"""
-    
-    # Wzorce do usunięcia - elementy nawigacyjne
-    nav_patterns = [
-        # Menu główne
-        r'Search:\s*\*\s*\[Color Grading.*?\]\(.*?\).*?(?=\n##|\n\[|$)',
-        r'\*\s*\[Tutorial Library Index\].*?\n',
-        r'\*\s*\[Focused Flight Paths\].*?\n',
-        r'\*\s*\[Tutorial Library Membership\].*?\n',
-        r'\*\s*\[\s*Learn DaVinci Resolve\].*?\n',
-        r'\*\s*\[\s*DaVinci Resolve Courses\].*?\n',
-        r'\*\s*\[\s*The All-Access Accelerator\].*?\n',
-        r'\*\s*\[\s*Grading Practice Projects\].*?\n',
-        r'\*\s*\[\s*Login\].*?\n',
-        r'\*\s*\[Join Now!\].*?\n',
-        
-        # Breadcrumbs
-        r'\[Tutorials\]\(.*?\) / \[.*?\]\(.*?\) / .*?\n',
-        
-        # Nawigacja między artykułami
-        r'## Post navigation.*?(?=\n##|\n\[|$)',
-        r'\[\s*Prev\s*\]\(.*?\).*?\[\s*Next\s*\]\(.*?\)',
-        
-        # Logo i nagłówek strony
-        r'\[\s*!\[Mixing Light\].*?\]\(.*?\)',
-        
-        # Przyciski udostępniania
-        r'\*\s*\[\]\(https://www\.facebook\.com/sharer.*?\)\n',
-        r'\*\s*\[\]\(https://x\.com/share.*?\)\n',
-        r'\*\s*\[\]\(mailto:.*?\)\n',
-        r'\*\s*\[\]\(.*?facebook.*?\)\n',
-        r'\*\s*\[\]\(.*?twitter.*?\)\n',
-    ]
-    
-    for pattern in nav_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(NAVIGATION,))
 
-def remove_moderation_elements(content):
+def remove_moderation_elements(content, url=None):
     """Usuwa elementy moderacyjne i zgłaszania"""
-    
-    # Wzorce elementów moderacyjnych
-    moderation_patterns = [
-        # Zgłaszanie postów
-        r'Report\s+There was a problem reporting this post\..*?Report note\s+Report',
-        r'####\s*Report.*?Report note.*?Report',
-        
-        # Blokowanie użytkowników  
-        r'Block Member\?.*?Please allow a few minutes for this process to complete\.\s*Confirm',
-        r'####\s*Block Member\?.*?Confirm',
-        
-        # Powiadomienia o zgłoszeniach
-        r'####\s*Report\s+You have already reported this\s*\.',
-        r'You have already reported this\s*\.',
-        
-        # Harassment i inne kategorie zgłoszeń
-        r'Harassment\s+Harassment or bullying behavior.*?Other',
-        r'Inappropriate\s+Contains mature or sensitive content',
-        r'Offensive\s+Contains abusive or derogatory content', 
-        r'Suspicious\s+Contains spam, fake content or potential malware',
-        
-        # Elementy moderacyjne
-        r'You will no longer be able to:\s*\*\s*See blocked member.*?\*\s*Mention this member.*?(?=\n\n|\n#|$)',
-    ]
-    
-    for pattern in moderation_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE | re.IGNORECASE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(MODERATION,))
 
-def remove_footer_elements(content):
+def remove_footer_elements(content, url=None):
     """Usuwa elementy stopki i kontaktu"""
-    
-    # Wzorce elementów stopki
-    footer_patterns = [
-        # Informacje o produkcie
-        r'##### Our Products.*?(?=\n##|\n##### |$)',
-        
-        # Informacje kontaktowe
-        r'##### Contact.*?This field is for validation purposes.*?(?=\n##|\n##### |$)',
-        r'##### Stay In Touch.*?This field is for validation purposes.*?(?=\n##|\n##### |$)',
-        
-        # Informacje o firmie
-        r'##### About.*?About Mixing Light.*?\n',
-        r'Mixing Light provides industry leading tutorials.*?Join our community!.*?\n',
-        
-        # Status i linki społecznościowe
-        r'MixingLight\.com Uptime Status.*?\n',
-        r'\*\s*\[\]\(https://www\.facebook\.com/MixingLight/\).*?\n',
-        r'\*\s*\[\]\(https://x\.com/MixingLight\).*?\n',
-        r'\*\s*\[\]\(https://www\.linkedin\.com.*?\).*?\n',
-        r'\*\s*\[\]\(https://mixinglight\.com/press/\).*?\n',
-        
-        # Copyright
-        r'© \d{4} Mixing Light, LLC\..*?Terms of Use.*?\n',
-        
-        # Telefon i adres
-        r'\*\s*\[\s*\(\d{3}\)\s*\d{3}-\d{4}\].*?\n',
-        r'\*\s*\[\s*\d+\s+.*?Penny Farms.*?\].*?\n',
-        
-        # Pola formularza
-        r'"?\*"?\s*indicates required fields.*?\n',
-        r'Email\*.*?First Name\*.*?Phone.*?This field is for validation.*?\n',
-    ]
-    
-    for pattern in footer_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(FOOTER,))
 
-def remove_ui_elements(content):
+def remove_ui_elements(content, url=None):
     """Usuwa powtarzające się elementy interfejsu użytkownika"""
-    
-    # Wzorce elementów UI
-    ui_patterns = [
-        # Membership i paywall
-        r'### Member Content.*?Need more information about our memberships.*?(?=\n##|\n### |$)',
-        r'Sorry\.\.\. the rest of this content is for members only\..*?Membership options.*?\n',
-        r'##### Member Login.*?Remember me.*?\n',
-        r'## Membership Required.*?Join Today.*?Close.*?\n',
-        r'\*\*Bonus\*\*\s*:.*?Join Today.*?\n',
-        
-        # Playlist i dodawanie
-        r'×.*?## Add to Playlist.*?Add to New Playlist.*?\n',
-        r'##### Adding to Playlist\.\.\..*?Add to New Playlist.*?\n',
-        
-        # Powiadomienia push
-        r'Notifications.*?Subscribe to push notifications.*?Yes, please\.No Thanks',
-        r'!\[notification icon\].*?Yes, please\.No Thanks',
-        
-        # Informacje o kosztach
-        r'Did you know\?.*?## Maintaining.*?Check out our membership options.*?\n',
-        
-        # Tracking i analytics
-        r'!\[\]\(https://cdn\.usefathom\.com.*?\)',
-        r'!\[\]\(https://app\.monstercampaigns\.com.*?\)',
-        
-        # Loading i inne elementy dynamiczne
-        r'!\[\]\(data:image/svg\+xml.*?\)\s*Loading\.\.\.',
-        
-        # Metadane artykułu (czasem niepotrzebne)
-        r'Insight #\s*ML\s*\d+.*?\n',
-        r'Type\s+(Article|Video).*?\n',
-        r'Duration\s+\d+:\d+.*?\n',
-        r'Skill Level\s+(Beginner|Intermediate|Advanced).*?\n',
-        
-        # Serie i kategorie (jeśli są redundantne)
-        r'Series\s*\|\s*\*\s*\[Creative Coding With DCTL\].*?\n',
-        r'Categories\s*\[DCTL\].*?\n',
-        r'Skills\s*\[.*?\].*?\n',
-        
-        # Inne powtarzające się elementy
-        r'Other Tutorials in this Series.*?View All.*?\n',
-        r'Username\s*\|\s*---\s*\|\s*---.*?Password.*?\|.*?\n',
-    ]
-    
-    for pattern in ui_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(UI,))
 
 if __name__ == "__main__":
-    asyncio.run(crawl_dctl_tutorial()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crawler tutorialu DCTL z mixinglight.com")
+    parser.add_argument('--resume', action='store_true', help="wznów przerwany przebieg z dziennika")
+    parser.add_argument('--rule-stats', action='store_true', help="zbieraj statystyki reguł czyszczenia")
+    parser.add_argument('--weights', type=parse_weights, default=None,
+                        help="wagi oceny trafności linków, np. text=1,nav=-5 (zob. crawl_relevance.DEFAULT_WEIGHTS)")
+    parser.add_argument('--output', choices=('markdown', 'sqlite', 'both'), default=None,
+                        help=f"wynik: raport markdown, baza stron {PAGE_STORE_FILE} (SQLite + FTS5) lub oba (domyślnie {OUTPUT})")
+    parser.add_argument('--report-from-store', action='store_true',
+                        help="wygeneruj raport markdown z bazy stron bez crawlowania")
+    parser.add_argument('--search', metavar='ZAPYTANIE', help="wyszukaj w bazie stron (składnia FTS5) i zakończ")
+    parser.add_argument('--dctl-lookup', metavar='SYMBOL',
+                        help="pokaż fragmenty kodu DCTL z symbolem (np. _powf, transform) z indeksu i zakończ")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=('cprofile', 'sample'),
+                        help="profiluj przebieg: cprofile (domyślnie, plik .prof) lub sample (stosy .folded)")
+    args = parser.parse_args()
+    
+    def main():
+        if args.search:
+            return search_store(args.search)
+        if args.dctl_lookup:
+            return lookup_dctl(args.dctl_lookup)
+        if args.report_from_store:
+            return report_from_store()
+        return asyncio.run(crawl_dctl_tutorial(
+            resume=args.resume, rule_stats=args.rule_stats or RULE_STATS, weights=args.weights, output=args.output
+        ))
+    
+    if args.profile:
+        run_profiled(main, args.profile, f"{PROFILE_FILE}.{'prof' if args.profile == 'cprofile' else 'folded'}")
+    else:
+        main()
\ No newline at end of file
@@ -5,13 +5,36 @@ Używa crawl4ai do pobrania głównej strony i powiązanych stron
 Zapisuje wyniki w formacie markdown z spisem treści
 """
 
+import argparse
 import asyncio
 import json
 import os
 import re
+import sys
+import time
+from functools import partial
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+from clean_pool import CleaningPool
+from crawl_boilerplate import BoilerplateFilter
+from crawl_browsers import BrowserPool
+from crawl_cache import PageCache
+from crawl_dedupe import DuplicateDetector, simhash
+from crawl_fetch import fetch_many
+from crawl_http import FastPathCrawler
+from crawl_frontier import PriorityFrontier
+from crawl_journal import CrawlJournal
+from crawl_metrics import FILTER, LINKS, QUEUE_WAIT, WRITE, CrawlMetrics, run_profiled
+from crawl_politeness import HostScheduler
+from crawl_relevance import LinkScorer, link_contexts, parse_weights
+from crawl_sections import SectionStore
+from crawl_store import PageStore, print_search_results
+from crawl_urls import DEFAULT_DROP_PARAMS, canonical_host, canonicalize_url, same_site, url_key
+from cleaning_packs import FOOTER, MODERATION, NAVIGATION, UI, apply_rule_packs, rule_packs_fingerprint
+from markdown_blocks import GENERIC_BLOCK_RULES, clean_markdown_blocks
+from markdown_cleaner import disable_rule_stats, enable_rule_stats, finalize_markdown
+from report_writer import FirstUniqueLinks, StreamingReportWriter
 
 # =============================================================================
 # 🎯 KONFIGURACJA - WKLEJ TUTAJ SWÓJ URL
@@ -19,12 +42,92 @@ from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
 
 TARGET_URL = "https://zenn.dev/omakazu/articles/0d63566ebea6d3"  # ← WKLEJ TUTAJ URL STRONY DO CRAWLOWANIA
 
+MAX_CONCURRENCY = 5  # Maksymalna liczba stron pobieranych jednocześnie
+MAX_DEPTH = 1  # Maksymalna głębokość (0 = tylko strona startowa)
+MAX_PAGES = 6  # Maksymalna łączna liczba stron (strona startowa + powiązane)
+MAX_PAGES_PER_HOST = None  # Limit stron na host (None = bez limitu)
+QUERY_PARAMS_KEEP = None  # Parametry zapytania zachowywane w linkach (wzorce fnmatch, None = wszystkie poza QUERY_PARAMS_DROP)
+QUERY_PARAMS_DROP = DEFAULT_DROP_PARAMS  # Parametry usuwane z linków (śledzące, odpowiedzi na komentarze)
+VISITED_BLOOM_CAPACITY = None  # Zbiór odwiedzonych jako filtr Blooma na tyle adresów (None = dokładny zbiór skrótów)
+USE_CACHE = True  # Używaj lokalnego cache stron zamiast renderować wszystko od nowa
+CACHE_DIR = ".crawl_cache"  # Katalog cache stron
+CACHE_TTL_SECONDS = 24 * 60 * 60  # Po tym czasie strona jest rewalidowana (ETag/Last-Modified)
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Maksymalny rozmiar cache (najdawniej używane są usuwane)
+CLEANER = "regex"  # Sposób czyszczenia markdown: "regex" lub "blocks" (liniowy, blokowy)
+DEFAULT_PAGE_URL = TARGET_URL  # Strona, do której dobierane są pakiety reguł, gdy nie podano URL
+CLEAN_WORKERS = None  # Procesy do czyszczenia dużych partii stron (None = liczba rdzeni, 0 = bez puli)
+JOURNAL_DIR = ".crawl_journal"  # Dziennik przebiegu do wznawiania (--resume)
+SECTIONS_DIR = ".crawl_sections"  # Wyczyszczone sekcje z poprzedniego przebiegu (None = wyłączone)
+BOILERPLATE_DIR = ".crawl_boilerplate"  # Tabele częstości bloków per domena (None = bez automatycznego usuwania)
+BOILERPLATE_THRESHOLD = 0.5  # Blok występujący na większym ułamku stron serwisu jest usuwany
+BOILERPLATE_MIN_PAGES = 5  # Liczba stron w tabeli, od której bloki są usuwane
+DEDUPE_PAGES = True  # Pomijaj w raporcie strony niemal identyczne z już zapisanymi (SimHash)
+DEDUPE_MAX_DISTANCE = 3  # Maksymalna liczba różnych bitów odcisku (na 64) dla duplikatu
+SCORE_WEIGHTS = {}  # Wagi oceny trafności linków (puste = crawl_relevance.DEFAULT_WEIGHTS), np. {'nav': -5}
+SEED_KEYWORDS = ()  # Dodatkowe słowa kluczowe tematu crawla (oprócz tytułu i treści strony startowej)
+LINK_MIN_SCORE = None  # Linki z niższą oceną nie trafiają do kolejki (None = wszystkie)
+BROWSER_POOL_SIZE = 2  # Liczba instancji przeglądarki pobierających strony na zmianę
+BROWSER_TABS = 3  # Maksymalna liczba stron pobieranych jednocześnie przez jedną instancję
+BROWSER_MAX_PAGES = 200  # Po tylu stronach instancja przeglądarki jest restartowana (None = bez limitu)
+BROWSER_MAX_RSS_MB = 1536  # Restart instancji po przekroczeniu tej pamięci jej procesów (None = bez limitu)
+PAGE_TIMEOUT_SECONDS = 120  # Strona pobierana dłużej jest porzucana, a jej przeglądarka restartowana
+FAST_PATH = True  # Strony statycznych domen pobieraj zwykłym HTTP, bez renderowania w przeglądarce
+FAST_PATH_FILE = ".crawl_fastpath.json"  # Wyuczone decyzje szybkiej ścieżki per domena
+FAST_PATH_TRIAL_PAGES = 3  # Strony domeny pobierane obiema ścieżkami przed decyzją
+FAST_PATH_MIN_YIELD = 0.8  # Minimalny stosunek ilości tekstu szybkiej ścieżki do przeglądarki
+HOST_REQUESTS_PER_SECOND = 4.0  # Limit tempa zapytań do jednego hosta (None = bez limitu)
+HOST_MAX_CONCURRENCY = MAX_CONCURRENCY  # Górna granica adaptacyjnego okna współbieżności hosta
+FETCH_RETRIES = 3  # Ponowienia po 429/5xx/przekroczeniu czasu (z wykładniczym opóźnieniem i Retry-After)
+RETRY_BASE_SECONDS = 1.0  # Opóźnienie pierwszego ponowienia (losowane z [0, podwajane co próbę])
+METRICS_FILE = "crawl_metrics.json"  # Metryki etapów (histogramy i czasy każdej strony) w JSON (None = bez zapisu)
+METRICS_PROM_FILE = "crawl_metrics.prom"  # Te same metryki w formacie tekstowym Prometheusa (None = bez zapisu)
+PROFILE_FILE = "crawl_profile"  # Przedrostek pliku profilu (--profile), rozszerzenie zależy od profilera
+RULE_STATS = False  # Zbieraj statystyki reguł czyszczenia (trafienia, usunięte znaki, czas)
+RULE_STATS_FILE = "rule_stats.json"  # Plik JSON ze statystykami reguł
+RULE_STATS_TOP = 15  # Liczba reguł w tabeli na końcu przebiegu
+SEED_CONCURRENCY = 4  # Tryb wsadowy (--seeds): liczba serwisów crawlowanych jednocześnie
+BATCH_MAX_FETCHES = 10  # Tryb wsadowy: łączny limit stron pobieranych jednocześnie przez wspólną przeglądarkę
+MANIFEST_FILE = "crawl_manifest.jsonl"  # Tryb wsadowy: wynik każdego seeda (raport, liczba stron, status)
+OUTPUT = "markdown"  # Wynik: "markdown" (raport {domena}_content.md), "sqlite" (baza stron z FTS5) lub "both"
+PAGE_STORE_FILE = "crawl_pages.db"  # Baza SQLite ze stronami (raport można z niej wygenerować: --report-from-store)
+PAGE_STORE_BATCH = 100  # Strony zapisywane do bazy w jednej transakcji
+SEARCH_LIMIT = 20  # Liczba wyników --search
+
 # =============================================================================
 
-async def crawl_website():
-    """Główna funkcja crawlowania strony internetowej"""
+async def crawl_website(resume=False, rule_stats=RULE_STATS, weights=None, start_url=None,
+                        crawler=None, pool=None, cache=None, name=None, semaphore=None, metrics=None,
+                        output=None, store=None):
+    """Główna funkcja crawlowania strony internetowej
+
+    Z `resume=True` przebieg jest odtwarzany z dziennika: ukończone strony
+    trafiają do raportu bez ponownego pobierania, a reszta kolejki jest
+    pobierana dalej.
+
+    `rule_stats=True` włącza pomiar reguł czyszczenia; zbiorcze wyniki ze
+    wszystkich czyszczonych stron trafiają do RULE_STATS_FILE i tabeli na
+    końcu przebiegu (strony z niezmienionymi sekcjami nie są czyszczone).
+
+    Kolejka jest priorytetowa: linki są oceniane względem tytułu i treści
+    strony startowej (crawl_relevance.LinkScorer), a budżet MAX_PAGES trafia
+    do najwyżej ocenionych. `weights` nadpisuje SCORE_WEIGHTS w tym przebiegu.
+
+    `start_url` domyślnie to TARGET_URL. W trybie wsadowym (crawl_seeds)
+    przekazywane są wspólne `crawler`, `pool`, `cache` i `semaphore` (limit
+    jednoczesnych pobrań dla wszystkich seedów) - funkcja ich nie zamyka.
+    `name` (domyślnie site_name(start_url)) wyznacza nazwy raportu, dziennika
+    i plików stanu. Czasy etapów każdej strony trafiają do `metrics`
+    (crawl_metrics.CrawlMetrics) - bez niego przebieg zapisuje własne
+    metryki do METRICS_FILE i METRICS_PROM_FILE.
+
+    `output` (domyślnie OUTPUT) wybiera wynik: raport markdown, bazę stron
+    (crawl_store.PageStore w PAGE_STORE_FILE, w trybie wsadowym wspólny
+    `store`) albo oba. Zwraca {'url', 'report', 'pages'} ('report' = None
+    bez raportu markdown) lub None, jeśli nie udało się pobrać strony startowej.
+    """
     
-    start_url = TARGET_URL
+    if start_url is None:
+        start_url = TARGET_URL
     
     if start_url == "https://example.com":
         print("❌ BŁĄD: Musisz wkleić właściwy URL w zmiennej TARGET_URL")
@@ -36,6 +139,9 @@ async def crawl_website():
     print(f"URL startowy: {start_url}")
     print("")
     
+    # Opcjonalny pomiar reguł czyszczenia (zbiorczo dla całego przebiegu)
+    stats = enable_rule_stats() if rule_stats else None
+    
     # Konfiguracja crawlera
     config = CrawlerRunConfig(
         word_count_threshold=10,
@@ -43,80 +149,500 @@ async def crawl_website():
         verbose=True
     )
     
-    crawled_urls = set()
-    all_content = []
+    # Raport jest zapisywany strumieniowo - w pamięci zostaje tylko spis treści
+    output = output or OUTPUT
+    domain = name or site_name(start_url)
+    filename = f"{domain}_content.md"
+    report = WebsiteReport(filename, start_url) if output != "sqlite" else None
+    
+    # Strony w bazie SQLite z indeksem pełnotekstowym - zapisywane partiami
+    own_store = store is None and output != "markdown"
+    if own_store:
+        store = PageStore(PAGE_STORE_FILE, batch_size=PAGE_STORE_BATCH)
+    saved = 0
+    
+    def save_page(page, raw_markdown='', fetched_at=None, restored=False):
+        """Zapisuje stronę do raportu i/lub bazy stron"""
+        nonlocal saved
+        if report is not None:
+            report.add_page(page)
+        if store is not None:
+            links = [
+                {'href': link.get('href', ''), 'text': link.get('text', '')}
+                for link in page.get('links') or [] if isinstance(link, dict)
+            ]
+            store.add(domain, page['url'], page['title'], page['depth'], raw_markdown, page['content'],
+                      {'links': links}, fetched_at=fetched_at, restored=restored)
+        saved += 1
+    
+    # Niezmienione strony używają sekcji wyczyszczonych w poprzednim przebiegu
+    sections = SectionStore(os.path.join(SECTIONS_DIR, f"{domain}.db"), cleaner=cleaner_fingerprint()) if SECTIONS_DIR else None
+    
+    # Bloki powtarzające się na większości stron serwisu są usuwane automatycznie
+    boilerplate = BoilerplateFilter(
+        os.path.join(BOILERPLATE_DIR, f"{domain}.json"),
+        threshold=BOILERPLATE_THRESHOLD,
+        min_pages=BOILERPLATE_MIN_PAGES
+    ) if BOILERPLATE_DIR else None
+    
+    # Czasy etapów każdej strony (kolejka, pobieranie, czyszczenie, zapis...)
+    own_metrics = metrics is None
+    if own_metrics:
+        metrics = CrawlMetrics()
+    
+    # Czyszczenie jest pracą CPU - duże partie trafiają do puli procesów
+    own_pool = pool is None
+    if own_pool:
+        pool = CleaningPool(partial(clean_markdown_content, cleaner=CLEANER), CLEAN_WORKERS, metrics=metrics)
+    
+    # Niemal identyczne strony są pomijane, a adresy podobne do nich pobierane na końcu
+    duplicates = DuplicateDetector(max_distance=DEDUPE_MAX_DISTANCE) if DEDUPE_PAGES else None
+    
+    own_cache = cache is None and USE_CACHE
+    if own_cache:
+        cache = PageCache(CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES)
+    
+    # Ocena trafności linków - tytuł i słowa kluczowe strony startowej są
+    # ustawiane po jej pobraniu
+    scorer = LinkScorer(keywords=SEED_KEYWORDS, weights={**SCORE_WEIGHTS, **(weights or {})})
+    
+    frontier = PriorityFrontier(
+        scorer,
+        max_depth=MAX_DEPTH,
+        max_pages=MAX_PAGES,
+        max_pages_per_host=MAX_PAGES_PER_HOST,
+        deprioritize=duplicates.is_suspect if duplicates is not None else None,
+        visited_capacity=VISITED_BLOOM_CAPACITY,
+        min_score=LINK_MIN_SCORE
+    )
     
-    async with AsyncWebCrawler() as crawler:
-        # Pobierz główną stronę
-        print("Pobieranie głównej strony...")
-        result = await crawler.arun(start_url, config=config)
-        
-        if result.success:
-            print("✅ Pomyślnie pobrano główną stronę")
-            print(f"Rozmiar HTML: {len(result.html)} znaków")
-            print(f"Rozmiar Markdown: {len(result.markdown)} znaków")
+    journal = CrawlJournal(os.path.join(JOURNAL_DIR, f"{domain}.jsonl"))
+    queued_at = {}  # URL → chwila dodania do kolejki (czas oczekiwania w metrykach)
+    
+    def schedule(url, depth, **info):
+        """Dodaje URL do kolejki i zapisuje to w dzienniku"""
+        if frontier.add(url, depth=depth, **info):
+            journal.queued(url, depth, **info)
+            queued_at.setdefault(url, time.perf_counter())
+            return True
+        return False
+    
+    state = journal.load() if resume else None
+    resumed = state is not None and state.start_url == start_url
+    if store is not None:
+        store.begin(domain, start_url, resume=resumed)
+    if resumed:
+        # Wzorzec trafności ze strony startowej przed odtworzeniem kolejki - linki są przy tym oceniane od nowa
+        root = next((page for page in state.pages.values() if page is not None and page['depth'] == 0), None)
+        if root is not None:
+            scorer.set_seed(root['title'], root['content'])
+        state.restore_frontier(frontier)
+        for url, page in state.pages.items():
+            if sections is not None:
+                sections.keep(url)
+            if page is None:
+                continue  # Duplikat pominięty w raporcie
+            # Strony z niezapisanej partii bazy wracają do niej z dziennika w całości
+            save_page(page, page.get('raw_markdown') or '', page.get('fetched_at'),
+                      restored='raw_markdown' not in page)
+            if duplicates is not None:
+                # Odcisk z dziennika (sprzed filtra boilerplate); starszy dziennik ma tylko treść
+                duplicates.check(url, page['content'], page.get('fingerprint'))
+        journal.open(start_url, resume=True)
+        print(f"♻️ Wznowiono przebieg: {len(state.pages)} ukończonych stron, {len(frontier)} w kolejce")
+    else:
+        if resume:
+            print("⚠️ Brak dziennika dla tego URL - zaczynam od nowa")
+        journal.open(start_url)
+    
+    if start_url not in frontier:
+        schedule(start_url, 0)
+    
+    async def crawl_pages(crawler):
+        """Pobiera strony z kolejki; zwraca False, jeśli nie udało się pobrać strony startowej"""
+        known_patterns = 0
+        while frontier:
+            batch = frontier.pop_batch(MAX_CONCURRENCY)
+            if not batch:
+                break
+            now = time.perf_counter()
+            for entry in batch:
+                if entry['url'] in queued_at:
+                    metrics.record(QUEUE_WAIT, now - queued_at.pop(entry['url']), url=entry['url'])
+            if batch[0]['depth'] == 0:
+                print("Pobieranie głównej strony...")
+            else:
+                print(f"Pobieranie {len(batch)} stron (maks. {MAX_CONCURRENCY} jednocześnie)...")
             
-            # Wyczyść zawartość
-            cleaned_content = clean_markdown_content(result.markdown)
+            results = await fetch_many(
+                crawler, [entry['url'] for entry in batch], config, max_concurrency=MAX_CONCURRENCY, cache=cache,
+                semaphore=semaphore, metrics=metrics
+            )
             
-            # Dodaj do kolekcji
-            page_info = {
-                'url': start_url,
-                'title': extract_title_from_content(cleaned_content),
-                'content': cleaned_content,
-                'links': result.links.get('internal', []) if result.links else []
-            }
-            all_content.append(page_info)
-            crawled_urls.add(start_url)
+            # Odrzuć nieudane pobrania
+            fetched = []
+            for entry, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    print(f"❌ Błąd: {result}")
+                    if entry['depth'] == 0:
+                        return False  # Bez strony startowej przebieg niczego nie odwiedził
+                    continue
+                if not result.success:
+                    if entry['depth'] == 0:
+                        print("❌ Błąd pobierania głównej strony")
+                        return False
+                    print(f"❌ Błąd pobierania: {entry['url']}")
+                    continue
+                fetched.append((entry, result))
             
-            # Znajdź powiązane linki
-            related_links = find_related_links(result.links.get('internal', []) if result.links else [], start_url)
-            print(f"Znaleziono {len(related_links)} powiązanych linków")
+            # Wyczyść całą partię naraz - duże partie w puli procesów,
+            # niezmienione strony biorą sekcję z poprzedniego przebiegu
+            cleaned = await pool.clean_pages_async(
+                [(entry['url'], str(result.markdown or '')) for entry, result in fetched], sections
+            )
             
-            # Pobierz powiązane strony (maksymalnie 5)
-            for i, link_info in enumerate(related_links[:5]):
-                link_url = link_info['url']
-                if link_url not in crawled_urls:
-                    print(f"Pobieranie strony {i+1}/{len(related_links[:5])}: {link_info['text']}")
+            for (entry, result), cleaned_content in zip(fetched, cleaned):
+                url = entry['url']
+                depth = entry['depth']
+                internal_links = result.links.get('internal', []) if result.links else []
+                with metrics.timer(FILTER, url, len(cleaned_content)) as sizes:
+                    # Odcisk treści sprzed filtra boilerplate - wynik filtra zmienia się, gdy tabela bloków rośnie
+                    fingerprint = simhash(cleaned_content) if duplicates is not None else None
+                    if boilerplate is not None:
+                        cleaned_content = boilerplate.filter(cleaned_content)
                     
-                    try:
-                        link_result = await crawler.arun(link_url, config=config)
-                        if link_result.success:
-                            print(f"✅ Pobrano: {link_info['text']}")
-                            
-                            # Wyczyść zawartość
-                            cleaned_link_content = clean_markdown_content(link_result.markdown)
-                            
-                            link_page_info = {
-                                'url': link_url,
-                                'title': link_info['text'],
-                                'content': cleaned_link_content,
-                                'links': link_result.links.get('internal', []) if link_result.links else []
-                            }
-                            all_content.append(link_page_info)
-                            crawled_urls.add(link_url)
-                        else:
-                            print(f"❌ Błąd pobierania: {link_url}")
-                    except Exception as e:
-                        print(f"❌ Błąd: {e}")
+                    # Niemal identyczna kopia zapisanej już strony nie trafia do raportu,
+                    # a jej linki (zwykle te same lub kolejne kopie) nie są dodawane do kolejki
+                    original = duplicates.check(url, fingerprint=fingerprint) if duplicates is not None else None
+                    sizes['bytes_out'] = len(cleaned_content)
+                if original is not None:
+                    print(f"♊ Pominięto duplikat: {url} (≈ {original})")
+                    journal.done(url, None)
+                    continue
+                
+                if depth == 0:
+                    print("✅ Pomyślnie pobrano główną stronę")
+                    print(f"Rozmiar HTML: {len(result.html)} znaków")
+                    print(f"Rozmiar Markdown: {len(result.markdown)} znaków")
+                    title = extract_title_from_content(cleaned_content)
+                    scorer.set_seed(title, cleaned_content)
+                else:
+                    print(f"✅ Pobrano: {entry['text']}")
+                    title = entry['text']
+                
+                # Zapisz sekcję strony do raportu
+                page = {
+                    'url': url,
+                    'title': title,
+                    'content': cleaned_content,
+                    'links': internal_links,
+                    'depth': depth
+                }
+                write_start = time.perf_counter()
+                raw_markdown = str(result.markdown or '')
+                fetched_at = time.time()
+                save_page(page, raw_markdown, fetched_at)
+                write_seconds = time.perf_counter() - write_start
+                
+                # Znajdź powiązane linki i dodaj je do kolejki (z oceną trafności)
+                with metrics.timer(LINKS, url, len(cleaned_content)):
+                    related_links = find_related_links(internal_links, url, link_contexts(cleaned_content))
+                    added = sum(
+                        schedule(link_info['url'], depth + 1, text=link_info['text'], context=link_info['context'])
+                        for link_info in related_links
+                    )
+                print(f"Znaleziono {len(related_links)} powiązanych linków ({added} nowych w kolejce)")
+                
+                # Stronę oznaczamy jako ukończoną dopiero po zapisaniu jej linków w dzienniku
+                write_start = time.perf_counter()
+                # Baza stron zapisuje partiami - po przerwaniu strona jest odtwarzana z dziennika
+                journal.done(url, {**page, 'raw_markdown': raw_markdown, 'fetched_at': fetched_at,
+                                   'fingerprint': fingerprint})
+                write_seconds += time.perf_counter() - write_start
+                metrics.record(WRITE, write_seconds, len(cleaned_content), len(cleaned_content), url=url)
+            
+            # Nowo wykryte wzorce duplikatów - podobne adresy z kolejki idą na koniec
+            if duplicates is not None and duplicates.patterns != known_patterns:
+                known_patterns = duplicates.patterns
+                frontier.defer_matching()
+        return True
+    
+    if crawler is None:
+        async with browser_pool(metrics) as browsers:
+            fast = fast_path(browsers, metrics)
+            crawler = host_scheduler(fast)
+            ok = await crawl_pages(crawler)
+            print(browsers.summary())
+        print(crawler.summary())
+        if fast is not browsers:
+            fast.save()
+            print(fast.summary())
+    else:
+        ok = await crawl_pages(crawler)
+    
+    journal.close()
+    if own_pool:
+        pool.close()
+    if own_metrics:
+        save_metrics(metrics)
+    if own_store:
+        print(store.summary())
+        store.close()
+    
+    if not ok:
+        if report is not None:
+            report.abort()
+        if sections is not None:
+            sections.close()
+        return None
+    
+    if sections is not None:
+        if saved:
+            sections.save()
+            print(sections.summary())
         else:
-            print("❌ Błąd pobierania głównej strony")
-            return
-    
-    # Generuj raport markdown
-    print("\n📝 Generowanie raportu markdown...")
-    markdown_report = generate_markdown_report(all_content, start_url)
-    
-    # Zapisz do pliku
-    domain = urlparse(start_url).netloc.replace('www.', '').replace('.', '_')
-    filename = f"{domain}_content.md"
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(markdown_report)
+            sections.close()  # Pusty przebieg nie usuwa sekcji poprzedniego
+    
+    if boilerplate is not None:
+        boilerplate.save()
+        print(boilerplate.summary())
+    
+    if duplicates is not None:
+        print(duplicates.summary())
+    
+    if own_cache:
+        cache.save()
+        print(cache.summary())
+    
+    if not saved:
+        print("❌ Błąd pobierania głównej strony")
+        if report is not None:
+            report.abort()
+        return None
+    
+    if report is not None:
+        # Dokończ raport markdown (nagłówek i spis treści)
+        print("\n📝 Generowanie raportu markdown...")
+        report.finish()
+        print(f"✅ Raport zapisany do: {filename}")
+    else:
+        print(f"\n🗄️ Strony zapisane w bazie: {store.path} (raport: --report-from-store {domain})")
+    print(f"📊 Pobrano łącznie {saved} stron")
+    if report is not None:
+        print(f"📏 Rozmiar pliku: {os.path.getsize(filename)} bajtów")
+    
+    if stats is not None:
+        disable_rule_stats()
+        stats.save(RULE_STATS_FILE)
+        print(stats.table(RULE_STATS_TOP))
+        print(f"📈 Statystyki reguł zapisane do: {RULE_STATS_FILE}")
+    
+    return {'url': start_url, 'report': filename if report is not None else None, 'pages': saved}
+
+async def crawl_seeds(seeds, resume=False, rule_stats=RULE_STATS, weights=None,
+                      seed_concurrency=SEED_CONCURRENCY, manifest_file=MANIFEST_FILE, output=None):
+    """Crawluje wiele stron startowych przez wspólne przeglądarki
+    
+    Każdy seed to osobny przebieg crawl_website z własnym raportem, kolejką
+    i dziennikiem, ale wszystkie dzielą pulę przeglądarek (browser_pool),
+    pulę czyszczenia i cache stron. Jednocześnie crawlowanych jest
+    `seed_concurrency` seedów, a łączna liczba pobieranych stron jest
+    ograniczona do BATCH_MAX_FETCHES.
+    Po każdym seedzie do `manifest_file` (JSONL) dopisywany jest wiersz
+    z raportem, liczbą stron i statusem, więc manifest jest aktualny także
+    po przerwaniu. Z `output` "sqlite" lub "both" wszystkie seedy zapisują
+    strony do jednej bazy PAGE_STORE_FILE.
+    """
+    if not seeds:
+        print("❌ Brak adresów startowych")
+        return []
     
-    print(f"✅ Raport zapisany do: {filename}")
-    print(f"📊 Pobrano łącznie {len(all_content)} stron")
-    print(f"📏 Rozmiar pliku: {os.path.getsize(filename)} bajtów")
+    print(f"🚀 Tryb wsadowy: {len(seeds)} seedów, {seed_concurrency} jednocześnie")
+    
+    # Statystyki reguł zbierane zbiorczo dla wszystkich seedów
+    stats = enable_rule_stats() if rule_stats else None
+    
+    # Ten sam serwis podany kilka razy dostaje osobne pliki (_2, _3...)
+    names = []
+    used = {}
+    for seed in seeds:
+        name = site_name(seed)
+        used[name] = used.get(name, 0) + 1
+        names.append(name if used[name] == 1 else f"{name}_{used[name]}")
+    
+    metrics = CrawlMetrics()
+    pool = CleaningPool(partial(clean_markdown_content, cleaner=CLEANER), CLEAN_WORKERS, metrics=metrics)
+    cache = PageCache(CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES) if USE_CACHE else None
+    output = output or OUTPUT
+    store = PageStore(PAGE_STORE_FILE, batch_size=PAGE_STORE_BATCH) if output != "markdown" else None
+    seed_limit = asyncio.Semaphore(max(1, seed_concurrency))
+    fetch_limit = asyncio.Semaphore(max(1, BATCH_MAX_FETCHES))
+    results = []
+    
+    with open(manifest_file, 'a', encoding='utf-8') as manifest:
+        async def crawl_seed(seed, name):
+            async with seed_limit:
+                started = time.monotonic()
+                entry = {'seed': seed, 'report': None, 'pages': 0, 'status': 'failed', 'error': None}
+                try:
+                    result = await crawl_website(
+                        resume=resume, rule_stats=False, weights=weights, start_url=seed, crawler=crawler,
+                        pool=pool, cache=cache, name=name, semaphore=fetch_limit, metrics=metrics,
+                        output=output, store=store
+                    )
+                    if result is not None:
+                        entry.update(report=result['report'], pages=result['pages'], status='ok')
+                except Exception as e:
+                    # Błąd jednego serwisu nie przerywa pozostałych
+                    print(f"❌ Błąd crawlowania {seed}: {e}")
+                    entry.update(status='error', error=str(e))
+                entry['seconds'] = round(time.monotonic() - started, 2)
+                manifest.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                manifest.flush()
+                results.append(entry)
+        
+        try:
+            async with browser_pool(metrics) as browsers:
+                # Decyzje szybkiej ścieżki są wspólne - seedy z tej samej domeny uczą się raz
+                # Limity hostów też są wspólne - kilka seedów z jednego serwisu go nie przeciąży
+                fast = fast_path(browsers, metrics)
+                crawler = host_scheduler(fast)
+                try:
+                    await asyncio.gather(*(crawl_seed(seed, name) for seed, name in zip(seeds, names)))
+                finally:
+                    if fast is not browsers:
+                        fast.save()
+                print(browsers.summary())
+                print(crawler.summary())
+                if fast is not browsers:
+                    print(fast.summary())
+        finally:
+            pool.close()
+            if cache is not None:
+                cache.save()
+            if store is not None:
+                print(store.summary())
+                store.close()
+    
+    if cache is not None:
+        print(cache.summary())
+    
+    ok = sum(1 for entry in results if entry['status'] == 'ok')
+    print(f"\n📦 Ukończono {ok}/{len(seeds)} seedów, łącznie {sum(entry['pages'] for entry in results)} stron")
+    print(f"🗂️ Manifest zapisany do: {manifest_file}")
+    save_metrics(metrics)
+    
+    if stats is not None:
+        disable_rule_stats()
+        stats.save(RULE_STATS_FILE)
+        print(stats.table(RULE_STATS_TOP))
+        print(f"📈 Statystyki reguł zapisane do: {RULE_STATS_FILE}")
+    
+    return results
+
+def read_seeds(source):
+    """Wczytuje adresy startowe z pliku (lub stdin dla "-"), po jednym w linii
+    
+    Puste linie i komentarze (#) są pomijane, a adresy są kanonizowane
+    i deduplikowane z zachowaniem kolejności.
+    """
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    
+    seeds = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        url = canonicalize_url(line)
+        if url is None:
+            print(f"⚠️ Pominięto nieprawidłowy adres: {line}")
+            continue
+        key = url_key(url, canonical=True)
+        if key not in seen:
+            seen.add(key)
+            seeds.append(url)
+    return seeds
+
+def report_from_store(site, output_file=None, store_file=PAGE_STORE_FILE):
+    """Generuje raport markdown serwisu z bazy stron (ostatni przebieg, kolejność jak w crawlu)"""
+    with PageStore(store_file) as store:
+        start_url = store.start_url(site)
+        if start_url is None:
+            print(f"❌ Brak serwisu {site} w bazie {store_file}")
+            return None
+        output_file = output_file or f"{site}_content.md"
+        report = WebsiteReport(output_file, start_url)
+        for page in store.pages(site):
+            report.add_page({
+                'url': page['url'],
+                'title': page['title'],
+                'content': page['markdown'],
+                'links': page['meta'].get('links'),
+                'depth': page['depth']
+            })
+        if not report.sections:
+            report.abort()
+            print(f"❌ Brak stron serwisu {site} w bazie {store_file}")
+            return None
+        report.finish()
+    print(f"✅ Raport zapisany do: {output_file} ({report.sections} stron z bazy {store_file})")
+    return output_file
+
+def search_store(query, site=None, limit=SEARCH_LIMIT, store_file=PAGE_STORE_FILE):
+    """Wyszukiwanie pełnotekstowe w bazie stron (składnia FTS5)"""
+    with PageStore(store_file) as store:
+        results = store.search(query, limit=limit, site=site)
+    print_search_results(results)
+    return results
+
+def site_name(url):
+    """Nazwa serwisu do nazw raportu i plików stanu (np. zenn_dev)"""
+    return urlparse(url).netloc.replace('www.', '').replace('.', '_')
+
+def browser_pool(metrics=None):
+    """Pula przeglądarek z restartami po limicie stron/pamięci i zawieszonych stronach"""
+    return BrowserPool(
+        AsyncWebCrawler,
+        size=BROWSER_POOL_SIZE,
+        tabs=BROWSER_TABS,
+        max_pages=BROWSER_MAX_PAGES,
+        max_rss_bytes=BROWSER_MAX_RSS_MB * 1024 * 1024 if BROWSER_MAX_RSS_MB else None,
+        page_timeout=PAGE_TIMEOUT_SECONDS,
+        metrics=metrics
+    )
+
+def host_scheduler(crawler):
+    """Limity tempa i adaptacyjna współbieżność per host oraz ponowienia nieudanych pobrań"""
+    return HostScheduler(
+        crawler,
+        rate=HOST_REQUESTS_PER_SECOND,
+        max_concurrency=HOST_MAX_CONCURRENCY,
+        retries=FETCH_RETRIES,
+        backoff_base=RETRY_BASE_SECONDS
+    )
+
+def fast_path(crawler, metrics=None):
+    """Szybka ścieżka HTTP przed przeglądarką (FAST_PATH) albo sam `crawler`"""
+    if not FAST_PATH:
+        return crawler
+    return FastPathCrawler(
+        crawler, FAST_PATH_FILE, trial_pages=FAST_PATH_TRIAL_PAGES, min_yield=FAST_PATH_MIN_YIELD,
+        metrics=metrics
+    )
+
+def save_metrics(metrics):
+    """Wypisuje tabelę etapów i zapisuje metryki (METRICS_FILE, METRICS_PROM_FILE)"""
+    print(metrics.table())
+    if METRICS_FILE:
+        metrics.save_json(METRICS_FILE)
+        print(f"⏱️ Metryki zapisane do: {METRICS_FILE}")
+    if METRICS_PROM_FILE:
+        metrics.save_prometheus(METRICS_PROM_FILE)
 
 def extract_title_from_content(content):
     """Wyciąga tytuł z zawartości markdown"""
@@ -126,309 +652,200 @@ def extract_title_from_content(content):
             return line[2:].strip()
     return "Bez tytułu"
 
-def find_related_links(links, base_url):
-    """Znajduje powiązane linki na stronie"""
+def find_related_links(links, base_url, contexts=None):
+    """Znajduje powiązane linki na stronie
+
+    Linki są kanonizowane (crawl_urls.canonicalize_url) i porównywane po
+    kluczu, więc warianty z fragmentem, parametrami śledzącymi czy końcowym
+    ukośnikiem nie są duplikatami. Za tę samą domenę uznawany jest tylko
+    host strony bazowej i jego subdomeny - nie adres zawierający nazwę
+    domeny w ścieżce czy zapytaniu.
+
+    `contexts` ({href: linia treści}, crawl_relevance.link_contexts) dodaje
+    do linków pole `context` używane przy ocenie trafności.
+    """
     if not links:
         return []
     
-    base_domain = urlparse(base_url).netloc
+    base_host = urlparse(base_url).hostname
+    seen = {url_key(base_url)}
     related_links = []
     
     for link in links:
         if isinstance(link, dict):
-            link_url = link.get('href', '')
+            href = link.get('href', '')
             link_text = link.get('text', '')
         else:
-            link_url = str(link)
-            link_text = link_url
+            href = str(link)
+            link_text = href
+        
+        link_url = canonicalize_url(href, base_url, keep_params=QUERY_PARAMS_KEEP, drop_params=QUERY_PARAMS_DROP)
+        if link_url is None or not same_site(canonical_host(link_url), base_host):
+            continue
         
-        # Sprawdź czy link jest z tej samej domeny
-        if link_url and base_domain in link_url:
-            # Unikaj duplikatów i linków do głównej strony
-            if link_url != base_url and link_url not in [l['url'] for l in related_links]:
-                related_links.append({
-                    'url': link_url,
-                    'text': link_text[:100] if link_text else link_url
-                })
+        # Unikaj duplikatów i linków do głównej strony
+        key = url_key(link_url, canonical=True)
+        if key in seen:
+            continue
+        seen.add(key)
+        related_links.append({
+            'url': link_url,
+            'text': link_text[:100] if link_text else link_url,
+            'context': contexts.get(href, '') if contexts else ''
+        })
     
     return related_links
 
-def generate_markdown_report(content_list, source_url):
-    """Generuje raport markdown z pobranej zawartości"""
-    
-    domain = urlparse(source_url).netloc.replace('www.', '')
-    
-    report = f"""# Zawartość strony - {domain.title()}
+def create_anchor(title):
+    """Tworzy kotwicę dla spisu treści"""
+    anchor = title.lower().replace(' ', '-').replace(':', '').replace('?', '').replace('!', '')
+    return re.sub(r'[^\w\-]', '', anchor)
+
+class WebsiteReport(StreamingReportWriter):
+    """Raport markdown zapisywany strona po stronie w trakcie crawlowania"""
+
+    def __init__(self, output_file, source_url):
+        super().__init__(output_file)
+        self.source_url = source_url
+        self.links = FirstUniqueLinks(10)
+        self.has_links = False
+
+    def add_page(self, page):
+        """Zapisuje sekcję strony i zapamiętuje jej linki do dodatku"""
+        i = self.sections
+        title = page['title']
+        
+        section = "---\n\n" if i > 0 else ""
+        section += f"## {i+1}. {title}\n\n"
+        section += f"**URL:** {page['url']}\n\n"
+        section += f"{page['content']}\n\n"
+        self.add_section(f"- [{i+1}. {title}](#{create_anchor(title)})\n", section)
+        
+        for link in page.get('links') or []:
+            self.has_links = True
+            if isinstance(link, dict):
+                self.links.add(link)
+
+    def finish(self):
+        """Dopisuje nagłówek, spis treści i dodatkowe zasoby"""
+        domain = urlparse(self.source_url).netloc.replace('www.', '')
+        
+        header = f"""# Zawartość strony - {domain.title()}
 
 *Wygenerowano: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
 
-**Źródło:** [{domain}]({source_url})
+**Źródło:** [{domain}]({self.source_url})
 
 ---
 
 ## 📋 Spis Treści
 
 """
-    
-    # Generuj spis treści
-    for i, page in enumerate(content_list):
-        title = page['title']
-        anchor = title.lower().replace(' ', '-').replace(':', '').replace('?', '').replace('!', '')
-        anchor = re.sub(r'[^\w\-]', '', anchor)
-        report += f"- [{i+1}. {title}](#{anchor})\n"
-    
-    report += "\n---\n\n"
-    
-    # Dodaj zawartość każdej strony
-    for i, page in enumerate(content_list):
-        title = page['title']
-        url = page['url']
-        content = page['content']
         
-        report += f"## {i+1}. {title}\n\n"
-        report += f"**URL:** {url}\n\n"
-        report += f"{content}\n\n"
+        # Dodaj dodatkowe zasoby
+        footer = "\n## 📚 Dodatkowe Zasoby\n\n"
+        if self.has_links:
+            footer += "### 🔗 Powiązane Linki\n\n"
+            for link in self.links:
+                if link.get('text') and link.get('href'):
+                    footer += f"- [{link['text']}]({link['href']})\n"
         
-        if i < len(content_list) - 1:
-            report += "---\n\n"
-    
-    # Dodaj dodatkowe zasoby
-    report += "\n## 📚 Dodatkowe Zasoby\n\n"
-    
-    all_links = []
-    
+        self.close(header, toc_separator="\n---\n\n", footer=footer)
+
+def generate_markdown_report(content_list, source_url, output_file):
+    """Zapisuje raport markdown z pobranej zawartości do pliku
+
+    `content_list` może być dowolnym iterowalnym źródłem stron - strony są
+    zapisywane po kolei, bez składania całego raportu w pamięci.
+    """
+    report = WebsiteReport(output_file, source_url)
     for page in content_list:
-        if page.get('links'):
-            all_links.extend(page['links'])
-    
-    if all_links:
-        report += "### 🔗 Powiązane Linki\n\n"
-        unique_links = list({link['href']: link for link in all_links if isinstance(link, dict)}.values())[:10]
-        for link in unique_links:
-            if link.get('text') and link.get('href'):
-                report += f"- [{link['text']}]({link['href']})\n"
-    
-    return report
+        report.add_page(page)
+    report.finish()
+    return output_file
 
-def clean_markdown_content(content):
-    """Czyści zawartość markdown z niepotrzebnych elementów"""
+def clean_markdown_content(content, cleaner=None, url=None):
+    """Czyści zawartość markdown z niepotrzebnych elementów
+
+    `cleaner` wybiera implementację: "regex" (wzorce) lub "blocks"
+    (blokowa, liniowa); domyślnie używana jest wartość CLEANER.
+    `url` strony decyduje o pakietach reguł (domyślnie DEFAULT_PAGE_URL).
+    """
     if not content:
         return ""
     
-    # Usuwamy elementy nawigacyjne i menu
-    content = remove_navigation_elements(content)
-    
-    # Usuwamy elementy moderacyjne i zgłaszania
-    content = remove_moderation_elements(content)
-    
-    # Usuwamy elementy stopki i kontaktu
-    content = remove_footer_elements(content)
-    
-    # Usuwamy powtarzające się elementy UI
-    content = remove_ui_elements(content)
-    
-    # Usuwamy nadmiarowe puste linie
-    content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)
-    
-    # Usuwamy długie ciągi spacji
-    content = re.sub(r' {3,}', ' ', content)
+    if (cleaner or CLEANER) == "blocks":
+        return clean_markdown_blocks(content, GENERIC_BLOCK_RULES)
     
-    # Usuwamy znaki kontrolne
-    content = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
+    # Usuwamy elementy nawigacyjne, moderacyjne, stopki i UI - pakietami reguł
+    # dobranymi do hosta strony i języka treści (rule_packs/)
+    content = apply_rule_packs(content, url or DEFAULT_PAGE_URL)
     
-    return content.strip()
+    # Usuwamy nadmiarowe puste linie, długie ciągi spacji i znaki kontrolne
+    return finalize_markdown(content)
 
-def remove_navigation_elements(content):
+def cleaner_fingerprint(cleaner=None):
+    """Sposób czyszczenia z odciskiem aktywnych reguł, np. "regex:3f2a9c..."
+
+    Sekcje zapisane z innym odciskiem (po edycji rule_packs/*.json albo
+    reguł blokowych) są czyszczone ponownie.
+    """
+    cleaner = cleaner or CLEANER
+    rules = GENERIC_BLOCK_RULES.fingerprint() if cleaner == "blocks" else rule_packs_fingerprint()
+    return f"{cleaner}:{rules[:16]}"
+
+def remove_navigation_elements(content, url=None):
     """Usuwa elementy nawigacyjne i menu"""
-    
-    # Wzorce do usunięcia - elementy nawigacyjne
-    nav_patterns = [
-        # Menu główne i nawigacja
-        r'Search:\s*\*\s*\[.*?\]\(.*?\).*?(?=\n##|\n\[|$)',
-        r'\*\s*\[Home\].*?\n',
-        r'\*\s*\[About\].*?\n',
-        r'\*\s*\[Contact\].*?\n',
-        r'\*\s*\[Login\].*?\n',
-        r'\*\s*\[Register\].*?\n',
-        r'\*\s*\[Sign Up\].*?\n',
-        r'\*\s*\[Menu\].*?\n',
-        
-        # Breadcrumbs
-        r'\[.*?\]\(.*?\) / \[.*?\]\(.*?\) / .*?\n',
-        r'Home > .*?\n',
-        r'Strona główna > .*?\n',
-        
-        # Nawigacja między artykułami
-        r'## Post navigation.*?(?=\n##|\n\[|$)',
-        r'\[\s*Prev\s*\]\(.*?\).*?\[\s*Next\s*\]\(.*?\)',
-        r'\[\s*Previous\s*\]\(.*?\).*?\[\s*Next\s*\]\(.*?\)',
-        r'\[\s*Poprzedni\s*\]\(.*?\).*?\[\s*Następny\s*\]\(.*?\)',
-        
-        # Logo i nagłówki strony
-        r'\[\s*!\[.*?\].*?\]\(.*?\)',
-        
-        # Przyciski udostępniania
-        r'\*\s*\[\]\(https://www\.facebook\.com/sharer.*?\)\n',
-        r'\*\s*\[\]\(https://x\.com/share.*?\)\n',
-        r'\*\s*\[\]\(https://twitter\.com/share.*?\)\n',
-        r'\*\s*\[\]\(mailto:.*?\)\n',
-        r'\*\s*\[\]\(.*?facebook.*?\)\n',
-        r'\*\s*\[\]\(.*?twitter.*?\)\n',
-    ]
-    
-    for pattern in nav_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(NAVIGATION,))
 
-def remove_moderation_elements(content):
+def remove_moderation_elements(content, url=None):
     """Usuwa elementy moderacyjne i zgłaszania"""
-    
-    # Wzorce elementów moderacyjnych
-    moderation_patterns = [
-        # Zgłaszanie postów
-        r'Report\s+There was a problem reporting this post\..*?Report note\s+Report',
-        r'####\s*Report.*?Report note.*?Report',
-        r'Zgłoś.*?Problem z zgłoszeniem.*?Zgłoś',
-        
-        # Blokowanie użytkowników  
-        r'Block Member\?.*?Please allow a few minutes for this process to complete\.\s*Confirm',
-        r'####\s*Block Member\?.*?Confirm',
-        r'Zablokuj użytkownika\?.*?Potwierdź',
-        
-        # Powiadomienia o zgłoszeniach
-        r'####\s*Report\s+You have already reported this\s*\.',
-        r'You have already reported this\s*\.',
-        r'Już zgłosiłeś.*?\.',
-        
-        # Harassment i inne kategorie zgłoszeń
-        r'Harassment\s+Harassment or bullying behavior.*?Other',
-        r'Inappropriate\s+Contains mature or sensitive content',
-        r'Offensive\s+Contains abusive or derogatory content', 
-        r'Suspicious\s+Contains spam, fake content or potential malware',
-        r'Molestowanie.*?Inne',
-        r'Nieodpowiednie.*?Obraźliwe',
-        
-        # Elementy moderacyjne
-        r'You will no longer be able to:\s*\*\s*See blocked member.*?\*\s*Mention this member.*?(?=\n\n|\n#|$)',
-        r'Nie będziesz już mógł.*?(?=\n\n|\n#|$)',
-    ]
-    
-    for pattern in moderation_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE | re.IGNORECASE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(MODERATION,))
 
-def remove_footer_elements(content):
+def remove_footer_elements(content, url=None):
     """Usuwa elementy stopki i kontaktu"""
-    
-    # Wzorce elementów stopki
-    footer_patterns = [
-        # Informacje o produkcie/firmie
-        r'##### Our Products.*?(?=\n##|\n##### |$)',
-        r'##### Nasze Produkty.*?(?=\n##|\n##### |$)',
-        
-        # Informacje kontaktowe
-        r'##### Contact.*?This field is for validation purposes.*?(?=\n##|\n##### |$)',
-        r'##### Stay In Touch.*?This field is for validation purposes.*?(?=\n##|\n##### |$)',
-        r'##### Kontakt.*?To pole służy do walidacji.*?(?=\n##|\n##### |$)',
-        
-        # Informacje o firmie
-        r'##### About.*?About .*?\n',
-        r'##### O nas.*?O firmie.*?\n',
-        
-        # Status i linki społecznościowe
-        r'.*?Uptime Status.*?\n',
-        r'\*\s*\[\]\(https://www\.facebook\.com/.*?\).*?\n',
-        r'\*\s*\[\]\(https://x\.com/.*?\).*?\n',
-        r'\*\s*\[\]\(https://twitter\.com/.*?\).*?\n',
-        r'\*\s*\[\]\(https://www\.linkedin\.com.*?\).*?\n',
-        r'\*\s*\[\]\(https://.*?/press/\).*?\n',
-        
-        # Copyright
-        r'© \d{4}.*?Terms of Use.*?\n',
-        r'© \d{4}.*?Regulamin.*?\n',
-        r'Copyright \d{4}.*?\n',
-        
-        # Telefon i adres
-        r'\*\s*\[\s*\(\d{3}\)\s*\d{3}-\d{4}\].*?\n',
-        r'\*\s*\[\s*\+\d+.*?\].*?\n',
-        r'\*\s*\[\s*\d+\s+.*?\].*?\n',
-        
-        # Pola formularza
-        r'"?\*"?\s*indicates required fields.*?\n',
-        r'"?\*"?\s*oznacza pola wymagane.*?\n',
-        r'Email\*.*?First Name\*.*?Phone.*?This field is for validation.*?\n',
-        r'E-mail\*.*?Imię\*.*?Telefon.*?To pole służy do walidacji.*?\n',
-    ]
-    
-    for pattern in footer_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(FOOTER,))
 
-def remove_ui_elements(content):
+def remove_ui_elements(content, url=None):
     """Usuwa powtarzające się elementy interfejsu użytkownika"""
-    
-    # Wzorce elementów UI
-    ui_patterns = [
-        # Membership i paywall
-        r'### Member Content.*?Need more information about our memberships.*?(?=\n##|\n### |$)',
-        r'Sorry\.\.\. the rest of this content is for members only\..*?Membership options.*?\n',
-        r'##### Member Login.*?Remember me.*?\n',
-        r'## Membership Required.*?Join Today.*?Close.*?\n',
-        r'\*\*Bonus\*\*\s*:.*?Join Today.*?\n',
-        r'### Treść dla członków.*?(?=\n##|\n### |$)',
-        r'Przepraszamy.*?reszta treści jest tylko dla członków.*?\n',
-        
-        # Playlist i dodawanie
-        r'×.*?## Add to Playlist.*?Add to New Playlist.*?\n',
-        r'##### Adding to Playlist\.\.\..*?Add to New Playlist.*?\n',
-        r'×.*?## Dodaj do playlisty.*?Dodaj do nowej playlisty.*?\n',
-        
-        # Powiadomienia push
-        r'Notifications.*?Subscribe to push notifications.*?Yes, please\.No Thanks',
-        r'!\[notification icon\].*?Yes, please\.No Thanks',
-        r'Powiadomienia.*?Subskrybuj powiadomienia.*?Tak.*?Nie, dziękuję',
-        
-        # Informacje o kosztach
-        r'Did you know\?.*?## Maintaining.*?Check out our membership options.*?\n',
-        r'Czy wiesz\?.*?## Utrzymanie.*?Sprawdź nasze opcje członkostwa.*?\n',
-        
-        # Tracking i analytics
-        r'!\[\]\(https://cdn\.usefathom\.com.*?\)',
-        r'!\[\]\(https://app\.monstercampaigns\.com.*?\)',
-        r'!\[\]\(https://.*?analytics.*?\)',
-        r'!\[\]\(https://.*?tracking.*?\)',
-        
-        # Loading i inne elementy dynamiczne
-        r'!\[\]\(data:image/svg\+xml.*?\)\s*Loading\.\.\.',
-        r'Ładowanie\.\.\.',
-        
-        # Metadane artykułu (czasem niepotrzebne)
-        r'Type\s+(Article|Video).*?\n',
-        r'Duration\s+\d+:\d+.*?\n',
-        r'Skill Level\s+(Beginner|Intermediate|Advanced).*?\n',
-        r'Typ\s+(Artykuł|Wideo).*?\n',
-        r'Czas trwania\s+\d+:\d+.*?\n',
-        r'Poziom\s+(Początkujący|Średni|Zaawansowany).*?\n',
-        
-        # Inne powtarzające się elementy
-        r'Other .*? in this Series.*?View All.*?\n',
-        r'Username\s*\|\s*---\s*\|\s*---.*?Password.*?\|.*?\n',
-        r'Nazwa użytkownika\s*\|\s*---\s*\|\s*---.*?Hasło.*?\|.*?\n',
-        
-        # Cookies i GDPR
-        r'This website uses cookies.*?Accept.*?\n',
-        r'Ta strona używa plików cookie.*?Akceptuj.*?\n',
-        r'We use cookies.*?(?=\n##|\n### |$)',
-        r'Używamy plików cookie.*?(?=\n##|\n### |$)',
-    ]
-    
-    for pattern in ui_patterns:
-        content = re.sub(pattern, '', content, flags=re.DOTALL | re.MULTILINE)
-    
-    return content
+    return apply_rule_packs(content, url or DEFAULT_PAGE_URL, stages=(UI,))
 
 if __name__ == "__main__":
-    asyncio.run(crawl_website()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crawler strony internetowej do raportu markdown")
+    parser.add_argument('--resume', action='store_true', help="wznów przerwany przebieg z dziennika")
+    parser.add_argument('--rule-stats', action='store_true', help="zbieraj statystyki reguł czyszczenia")
+    parser.add_argument('--weights', type=parse_weights, default=None,
+                        help="wagi oceny trafności linków, np. text=1,nav=-5 (zob. crawl_relevance.DEFAULT_WEIGHTS)")
+    parser.add_argument('--seeds', metavar='PLIK',
+                        help="tryb wsadowy: plik z adresami startowymi, po jednym w linii (\"-\" = stdin)")
+    parser.add_argument('--seed-concurrency', type=int, default=SEED_CONCURRENCY,
+                        help="tryb wsadowy: liczba serwisów crawlowanych jednocześnie")
+    parser.add_argument('--manifest', default=MANIFEST_FILE, help="tryb wsadowy: plik manifestu (JSONL)")
+    parser.add_argument('--output', choices=('markdown', 'sqlite', 'both'), default=None,
+                        help=f"wynik: raport markdown, baza stron {PAGE_STORE_FILE} (SQLite + FTS5) lub oba (domyślnie {OUTPUT})")
+    parser.add_argument('--report-from-store', nargs='?', const='', metavar='SERWIS',
+                        help="wygeneruj raport markdown z bazy stron bez crawlowania (domyślnie serwis TARGET_URL)")
+    parser.add_argument('--search', metavar='ZAPYTANIE', help="wyszukaj w bazie stron (składnia FTS5) i zakończ")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=('cprofile', 'sample'),
+                        help="profiluj przebieg: cprofile (domyślnie, plik .prof) lub sample (stosy .folded)")
+    args = parser.parse_args()
+    
+    def main():
+        if args.search:
+            return search_store(args.search)
+        if args.report_from_store is not None:
+            return report_from_store(args.report_from_store or site_name(TARGET_URL))
+        if args.seeds:
+            return asyncio.run(crawl_seeds(
+                read_seeds(args.seeds), resume=args.resume, rule_stats=args.rule_stats or RULE_STATS,
+                weights=args.weights, seed_concurrency=args.seed_concurrency, manifest_file=args.manifest,
+                output=args.output
+            ))
+        return asyncio.run(crawl_website(
+            resume=args.resume, rule_stats=args.rule_stats or RULE_STATS, weights=args.weights, output=args.output
+        ))
+    
+    if args.profile:
+        run_profiled(main, args.profile, f"{PROFILE_FILE}.{'prof' if args.profile == 'cprofile' else 'folded'}")
+    else:
+        main()
\ No newline at end of file